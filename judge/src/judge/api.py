@@ -3,7 +3,10 @@
 from __future__ import annotations
 
 import logging
+import os
+import threading
 import time
+from collections.abc import Callable
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from pathlib import Path
@@ -29,6 +32,7 @@ from judge.models import (
     ReadinessChecks,
     ReadinessResponse,
     RunRequest,
+    SubmitBatchRequest,
     SubmitRequest,
 )
 from judge.services import (
@@ -70,7 +74,11 @@ def build_api_dependencies(
     from judge.results import ResultsStore
 
     resolved_settings = settings or load_settings()
-    queue = RedisQueue(resolved_settings.redis_url)
+    queue = RedisQueue(
+        resolved_settings.redis_url,
+        max_connections=resolved_settings.redis_max_connections,
+        client_name=f"judge-api-{os.getpid()}",
+    )
     results = ResultsStore(resolved_settings.results_db)
     problems = ProblemRepository(resolved_settings.problems_root)
     submission = SubmissionService(
@@ -91,31 +99,51 @@ def build_api_dependencies(
     )
 
 
+_PUBLIC_ERROR_KINDS = frozenset({"user", "internal"})
+_RESULT_KEYS = frozenset({"status", "summary", "tests"})
+_INTERNAL_ERROR_MESSAGE = "Internal judge error. Please retry."
+
+
 def _sanitize_job(job: dict[str, Any]) -> dict[str, Any]:
-    sanitized = dict(job)
-    error_kind = sanitized.get("error_kind")
-    if error_kind not in {"user", "internal"}:
+    """Sanitize a job row for the API, in place; ``get_job`` builds a fresh dict per call."""
+    error_kind = job.get("error_kind")
+    if error_kind not in _PUBLIC_ERROR_KINDS:
         error_kind = None
-        sanitized["error_kind"] = None
+        job["error_kind"] = None
 
-    result = sanitized.get("result")
+    result = job.get("result")
     if isinstance(result, dict):
-        result = dict(result)
         # Keep error kind at the top-level response only.
         result.pop("error_kind", None)
-        if {"status", "summary", "tests"}.issubset(result.keys()):
-            sanitized["result"] = result
-        else:
+        if not _RESULT_KEYS <= result.keys():
             result = None
-            sanitized["result"] = None
+            job["result"] = None
 
     if error_kind == "internal":
-        if sanitized.get("error"):
-            sanitized["error"] = "Internal judge error. Please retry."
-        if isinstance(result, dict) and result.get("error"):
-            result["error"] = "Internal judge error. Please retry."
-            sanitized["result"] = result
-    return sanitized
+        if job.get("error"):
+            job["error"] = _INTERNAL_ERROR_MESSAGE
+        if result is not None and result.get("error"):
+            result["error"] = _INTERNAL_ERROR_MESSAGE
+    return job
+
+
+class _TtlCheck:
+    """Memoize a readiness check so probes hit each dependency at most once per ``ttl_s``."""
+
+    def __init__(self, check: Callable[[], ReadinessCheck], ttl_s: float = 1.0) -> None:
+        self._check = check
+        self._ttl_s = ttl_s
+        self._expires_at = 0.0
+        self._result: ReadinessCheck | None = None
+        self._lock = threading.Lock()
+
+    def __call__(self) -> ReadinessCheck:
+        with self._lock:
+            now = time.monotonic()
+            if self._result is None or now >= self._expires_at:
+                self._result = self._check()
+                self._expires_at = now + self._ttl_s
+            return self._result
 
 
 def _check_redis_ready(dependencies: ApiDependencies) -> ReadinessCheck:
@@ -136,21 +164,55 @@ def _check_db_ready(dependencies: ApiDependencies) -> ReadinessCheck:
     return ReadinessCheck(ok=True, detail="ok")
 
 
-def _canonical_problems_available(root: Path) -> bool:
-    try:
-        return any(root.rglob("problem.json"))
-    except OSError:
-        logger.exception("Readiness check failed: problem repository scan failed")
-        return False
+def _contains_problem_file(root: Path) -> bool:
+    # Depth-first scandir walk that stops at the first problem.json.
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.name == "problem.json" and entry.is_file():
+                    return True
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(Path(entry.path))
+    return False
+
+
+class _ProblemsScan:
+    """Per-app scan for canonical problem files that remembers a positive result for ``ttl_s``.
 
+    Only positive results are cached, so an emptied corpus is reported within the TTL and a
+    freshly populated one immediately.
+    """
 
-def _check_problems_ready(dependencies: ApiDependencies) -> ReadinessCheck:
+    def __init__(self, ttl_s: float = 5.0) -> None:
+        self._ttl_s = ttl_s
+        self._ok_at: dict[Path, float] = {}
+
+    def __call__(self, root: Path) -> bool:
+        now = time.monotonic()
+        last_ok = self._ok_at.get(root)
+        if last_ok is not None and now - last_ok < self._ttl_s:
+            return True
+        try:
+            found = _contains_problem_file(root)
+        except OSError:
+            logger.exception("Readiness check failed: problem repository scan failed")
+            return False
+        if found:
+            self._ok_at[root] = now
+        return found
+
+
+def _check_problems_ready(
+    dependencies: ApiDependencies,
+    problems_scan: _ProblemsScan,
+) -> ReadinessCheck:
     root = dependencies.problems.root
     if not root.exists():
         return ReadinessCheck(ok=False, detail="missing")
     if not root.is_dir():
         return ReadinessCheck(ok=False, detail="invalid")
-    if not _canonical_problems_available(root):
+    if not problems_scan(root):
         return ReadinessCheck(ok=False, detail="empty")
     return ReadinessCheck(ok=True, detail="ok")
 
@@ -224,13 +286,17 @@ def create_app(
     async def health() -> dict[str, str]:
         return {"status": "ok"}
 
+    redis_ready = _TtlCheck(lambda: _check_redis_ready(_deps()))
+    db_ready = _TtlCheck(lambda: _check_db_ready(_deps()))
+    problems_scan = _ProblemsScan()
+
     @app.get("/ready", response_model=ReadinessResponse)
     def ready() -> ReadinessResponse | JSONResponse:
         deps = _deps()
         checks = ReadinessChecks(
-            redis=_check_redis_ready(deps),
-            db=_check_db_ready(deps),
-            problems=_check_problems_ready(deps),
+            redis=redis_ready(),
+            db=db_ready(),
+            problems=_check_problems_ready(deps, problems_scan),
         )
         is_ready = checks.redis.ok and checks.db.ok and checks.problems.ok
         payload = ReadinessResponse(
@@ -288,6 +354,22 @@ def create_app(
 
         return AcceptedResponse(job_id=queued.job_id, status=queued.status)
 
+    @app.post("/submit/batch", response_model=list[AcceptedResponse])
+    def submit_batch(request: SubmitBatchRequest) -> list[AcceptedResponse]:
+        deps = _deps()
+        try:
+            queued = deps.submission.enqueue_submit_batch(request.submissions)
+        except ProblemNotFoundError:
+            raise HTTPException(status_code=404, detail="Problem not found")
+        except InvalidProblemError:
+            raise HTTPException(status_code=400, detail="Invalid problem id")
+        except QueueFullError as exc:
+            raise HTTPException(status_code=503, detail=str(exc))
+        except QueueUnavailableError as exc:
+            raise HTTPException(status_code=503, detail=str(exc))
+
+        return [AcceptedResponse(job_id=item.job_id, status=item.status) for item in queued]
+
     @app.post("/run", response_model=AcceptedResponse)
     def run(request: RunRequest) -> AcceptedResponse:
         deps = _deps()
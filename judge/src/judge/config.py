@@ -9,18 +9,21 @@ from pathlib import Path
 @dataclass(frozen=True)
 class Settings:
     redis_url: str
+    redis_max_connections: int
     results_db: Path
     problems_root: Path
     max_output_chars: int
     queue_maxlen: int
     job_claim_idle_ms: int
     job_claim_count: int
+    worker_read_count: int
     isolate_bin: str
     isolate_use_cgroups: bool
     isolate_process_limit: int
     isolate_wall_time_extra_s: int
     isolate_timeout_grace_s: int
     isolate_fsize_kb: int
+    isolate_reuse_box: bool
     python_bin: str
     torch_execution_mode: str
     warm_fork_enable_no_new_privs: bool
@@ -43,6 +46,7 @@ def load_settings() -> Settings:
     base_dir = _base_dir()
 
     redis_url = os.getenv("JUDGE_REDIS_URL", "redis://localhost:6379/0")
+    redis_max_connections = int(os.getenv("JUDGE_REDIS_MAX_CONNECTIONS", "32"))
     results_db = Path(os.getenv("JUDGE_RESULTS_DB", str(base_dir / "data" / "judge.db")))
     problems_root = Path(
         os.getenv(
@@ -54,6 +58,7 @@ def load_settings() -> Settings:
     queue_maxlen = int(os.getenv("JUDGE_QUEUE_MAXLEN", "10000"))
     job_claim_idle_ms = int(os.getenv("JUDGE_JOB_CLAIM_IDLE_MS", "30000"))
     job_claim_count = int(os.getenv("JUDGE_JOB_CLAIM_COUNT", "10"))
+    worker_read_count = int(os.getenv("JUDGE_WORKER_READ_COUNT", "1"))
     isolate_bin = os.getenv("JUDGE_ISOLATE_BIN", "/usr/bin/isolate").strip()
     if not isolate_bin:
         raise ValueError("JUDGE_ISOLATE_BIN must not be empty")
@@ -64,6 +69,8 @@ def load_settings() -> Settings:
     isolate_wall_time_extra_s = int(os.getenv("JUDGE_ISOLATE_WALL_TIME_EXTRA_S", "2"))
     isolate_timeout_grace_s = int(os.getenv("JUDGE_ISOLATE_TIMEOUT_GRACE_S", "5"))
     isolate_fsize_kb = int(os.getenv("JUDGE_ISOLATE_FSIZE_KB", "1024"))
+    reuse_box_raw = os.getenv("JUDGE_ISOLATE_REUSE_BOX", "0").strip().lower()
+    isolate_reuse_box = reuse_box_raw not in {"0", "false", "no", "off"}
     python_bin = os.getenv("JUDGE_PYTHON_BIN", sys.executable).strip()
     torch_execution_mode = os.getenv("JUDGE_TORCH_EXECUTION_MODE", "warm_fork").strip().lower()
     warm_no_new_privs_raw = os.getenv("JUDGE_WARM_FORK_ENABLE_NO_NEW_PRIVS", "1").strip().lower()
@@ -101,6 +108,10 @@ def load_settings() -> Settings:
         raise ValueError("JUDGE_ISOLATE_FSIZE_KB must be >= 1")
     if not python_bin:
         raise ValueError("JUDGE_PYTHON_BIN must not be empty")
+    if redis_max_connections < 0:
+        raise ValueError("JUDGE_REDIS_MAX_CONNECTIONS must be >= 0")
+    if worker_read_count < 1:
+        raise ValueError("JUDGE_WORKER_READ_COUNT must be >= 1")
     if queue_maxlen < 0:
         raise ValueError("JUDGE_QUEUE_MAXLEN must be >= 0")
     if torch_execution_mode not in {"isolate", "warm_fork"}:
@@ -119,18 +130,21 @@ def load_settings() -> Settings:
 
     return Settings(
         redis_url=redis_url,
+        redis_max_connections=redis_max_connections,
         results_db=results_db,
         problems_root=problems_root,
         max_output_chars=max_output_chars,
         queue_maxlen=queue_maxlen,
         job_claim_idle_ms=job_claim_idle_ms,
         job_claim_count=job_claim_count,
+        worker_read_count=worker_read_count,
         isolate_bin=isolate_bin,
         isolate_use_cgroups=isolate_use_cgroups,
         isolate_process_limit=isolate_process_limit,
         isolate_wall_time_extra_s=isolate_wall_time_extra_s,
         isolate_timeout_grace_s=isolate_timeout_grace_s,
         isolate_fsize_kb=isolate_fsize_kb,
+        isolate_reuse_box=isolate_reuse_box,
         python_bin=python_bin,
         torch_execution_mode=torch_execution_mode,
         warm_fork_enable_no_new_privs=warm_fork_enable_no_new_privs,
@@ -0,0 +1,408 @@
+"""Self-contained test harness executed against user submissions."""
+
+# This module is shipped verbatim into sandboxes (see ``judge.runner.HARNESS_CODE``),
+# so it must only depend on the standard library.
+
+import ast
+import io
+import json
+import linecache
+import math
+import os
+import select
+import signal
+import sys
+import time
+import traceback
+from collections import namedtuple
+from contextlib import redirect_stderr, redirect_stdout
+from functools import lru_cache
+
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+_Case = namedtuple("_Case", "id input_code expected")
+
+
+def _json_loads(data):
+    if _orjson is not None:
+        return _orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(value):
+    return _orjson.dumps(value) if _orjson is not None else json.dumps(value).encode("utf-8")
+
+
+def _emit_json(value):
+    payload = _json_dumps(value)
+    sys.stdout.flush()
+    sys.stdout.buffer.write(payload + b"\n")
+    sys.stdout.buffer.flush()
+
+
+def normalize(value):
+    if hasattr(value, "tolist"):
+        try:
+            return value.tolist()
+        except Exception:
+            return str(value)
+    return value
+
+
+def allclose(a, b, rtol, atol):
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return math.isclose(a, b, rel_tol=rtol, abs_tol=atol)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        if len(a) != len(b):
+            return False
+        return all(allclose(x, y, rtol, atol) for x, y in zip(a, b))
+    if isinstance(a, dict) and isinstance(b, dict):
+        if a.keys() != b.keys():
+            return False
+        return all(allclose(a[k], b[k], rtol, atol) for k in a.keys())
+    return a == b
+
+
+def compare(actual, expected, comparison):
+    cmp_type = comparison.get("type", "exact")
+    rtol = float(comparison.get("rtol", 0.0))
+    atol = float(comparison.get("atol", 0.0))
+    if cmp_type == "allclose":
+        return allclose(actual, expected, rtol, atol)
+    return actual == expected
+
+
+_USER_FILENAMES = ("solution.py", "testcase.py")
+
+
+def _register_source(filename, source):
+    # Compiled sources have no file on disk; seed linecache so tracebacks can show lines.
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+
+
+def format_user_error():
+    exc_type, exc_value, exc_tb = sys.exc_info()
+    if isinstance(exc_value, SyntaxError):
+        lineno = exc_value.lineno or 0
+        text = exc_value.text or ""
+        lines = []
+        if lineno:
+            lines.append(f"Line {lineno}:")
+        if text:
+            lines.append(f"    {text.rstrip()}")
+        msg = exc_value.msg if hasattr(exc_value, "msg") else str(exc_value)
+        lines.append(f"{exc_type.__name__}: {msg}")
+        return "\n".join(lines)
+
+    user_frames = []
+    last = None
+    for frame, lineno in traceback.walk_tb(exc_tb):
+        code = frame.f_code
+        last = (code.co_filename, lineno, code.co_name)
+        if code.co_filename in _USER_FILENAMES:
+            user_frames.append(last)
+
+    if not user_frames:
+        if last:
+            filename, lineno, _ = last
+            line = linecache.getline(filename, lineno).strip()
+            if line:
+                return f"Line {lineno}:\n    {line}\n{exc_type.__name__}: {exc_value}"
+            return f"Line {lineno}:\n{exc_type.__name__}: {exc_value}"
+        return f"{exc_type.__name__}: {exc_value}"
+
+    lines = []
+    for filename, lineno, name in user_frames:
+        if name == "<module>":
+            lines.append(f"Line {lineno}:")
+        else:
+            lines.append(f"Line {lineno}, in {name}:")
+        line = linecache.getline(filename, lineno).strip()
+        if line:
+            lines.append(f"    {line}")
+    lines.append(f"{exc_type.__name__}: {exc_value}")
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=32)
+def _compile_solution(user_code):
+    # Every harness host is a fresh process, so this only pays off inside a batch: the
+    # parent compiles before forking, and children inherit the cached code objects.
+    return compile(user_code, "solution.py", "exec")
+
+
+def _prepare_case(case):
+    if "expected" in case:
+        expected = case["expected"]
+    else:
+        expected = ast.literal_eval(case.get("expected_literal", ""))
+    return _Case(case.get("id", ""), case.get("input_code", ""), expected)
+
+
+_Prepared = namedtuple("_Prepared", "compiled_runner comparison base_globals cases output_cap")
+
+
+class _CappedIO(io.StringIO):
+    """StringIO that keeps only the first ``cap`` characters and drops the rest."""
+
+    def __init__(self, cap):
+        super().__init__()
+        self._room = cap
+
+    def write(self, s):
+        if len(s) <= self._room:
+            written = super().write(s)
+            self._room -= written
+            return written
+        if self._room > 0:
+            super().write(s[: self._room])
+            self._room = 0
+        return len(s)
+
+
+def _capture_buffer(cap):
+    return io.StringIO() if cap is None else _CappedIO(cap)
+
+
+def _cap_text(value, cap):
+    return value if cap is None else value[:cap]
+
+
+def _prepare_config(config):
+    """Compile the runner and cases once; returns (prepared, error_results)."""
+    runner_expression = config.get("runner", "")
+    comparison_default = config.get("comparison", {"type": "exact"})
+
+    _torch_module = None
+    if config.get("execution_profile") == "torch":
+        import torch as _torch_module
+
+    _register_source("runner.py", runner_expression)
+    try:
+        compiled_runner = compile(runner_expression, "runner.py", "eval")
+    except Exception as exc:
+        return None, [{
+            "id": "error",
+            "status": "Runtime Error",
+            "stderr": f"Invalid runner expression: {exc}",
+        }]
+
+    # Set explicit module metadata expected by typical Python submissions.
+    base_globals = {
+        "__builtins__": __builtins__,
+        "__name__": "solution",
+        "__file__": "solution.py",
+        "__package__": None,
+    }
+    if _torch_module is not None:
+        base_globals["torch"] = _torch_module
+
+    # Keep one character beyond the limit so the parent can still tell the text was cut.
+    max_output_chars = config.get("max_output_chars")
+    output_cap = None if max_output_chars is None else max_output_chars + 1
+
+    cases = [_prepare_case(case) for case in config.get("cases", [])]
+    return _Prepared(compiled_runner, comparison_default, base_globals, cases, output_cap), None
+
+
+def run_cases(config, user_code):
+    prepared, error_results = _prepare_config(config)
+    if prepared is None:
+        return error_results
+    return _run_solution(prepared, user_code)
+
+
+def run_batch(config, user_codes):
+    """Run several submissions against one config, preparing the config only once.
+
+    Every submission runs in its own forked child, so one cannot change how another is
+    graded, and is killed once it runs past ``config["time_limit_s"]``. The entry for a
+    submission that was killed or did not exit cleanly is None.
+    """
+    prepared, error_results = _prepare_config(config)
+    if prepared is None:
+        return [[dict(item) for item in error_results] for _ in user_codes]
+    time_limit_s = config.get("time_limit_s")
+    results = []
+    for user_code in user_codes:
+        try:
+            _compile_solution(user_code)
+        except Exception:
+            # Failures are not cached; the child recompiles and reports the Syntax Error.
+            pass
+        results.append(_run_solution_forked(prepared, user_code, time_limit_s))
+    return results
+
+
+def _run_solution_forked(prepared, user_code, time_limit_s):
+    read_fd, write_fd = os.pipe()
+    sys.stdout.flush()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        exit_code = 1
+        try:
+            # Stray writes to the real stdout must not corrupt the batch output.
+            os.dup2(os.open(os.devnull, os.O_WRONLY), 1)
+            with os.fdopen(write_fd, "wb") as out:
+                out.write(_json_dumps(_run_solution(prepared, user_code)))
+            exit_code = 0
+        finally:
+            os._exit(exit_code)
+
+    os.close(write_fd)
+    deadline = None if time_limit_s is None else time.monotonic() + time_limit_s
+    chunks = []
+    with os.fdopen(read_fd, "rb", buffering=0) as reader:
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if not select.select([reader], [], [], timeout)[0]:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+                return None
+            chunk = reader.read(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    _, status = os.waitpid(pid, 0)
+    if status != 0:
+        return None
+    return _json_loads(b"".join(chunks))
+
+
+def _run_solution(prepared, user_code):
+    compiled_runner, comparison_default, base_globals, cases, output_cap = prepared
+
+    _register_source("solution.py", user_code)
+    try:
+        compiled_solution = _compile_solution(user_code)
+    except Exception:
+        error_msg = format_user_error()
+        return [{"id": "error", "status": "Syntax Error", "stderr": error_msg}]
+
+    results = []
+    for case in cases:
+        stdout_capture = _capture_buffer(output_cap)
+        stderr_capture = _capture_buffer(output_cap)
+
+        input_code = case.input_code
+        expected = case.expected
+        comparison = comparison_default
+
+        status = "Accepted"
+        output_str = ""
+        stdout_val = ""
+        stderr_val = ""
+        case_phase = "solution_exec"
+
+        try:
+            with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
+                # Re-exec user code per case to avoid mutable global state leaking between cases.
+                case_globals = dict(base_globals)
+                case_phase = "solution_exec"
+                exec(compiled_solution, case_globals)
+                case_phase = "testcase_compile"
+                _register_source("testcase.py", input_code)
+                compiled_input = compile(input_code, "testcase.py", "exec")
+                case_phase = "testcase_exec"
+                exec(compiled_input, case_globals)
+                case_phase = "runner_eval"
+                actual_value = eval(compiled_runner, case_globals)
+
+            stdout_val = stdout_capture.getvalue()
+            stderr_val = stderr_capture.getvalue()
+
+            actual_value = normalize(actual_value)
+            if not compare(actual_value, expected, comparison):
+                status = "Wrong Answer"
+            output_str = _cap_text(repr(actual_value), output_cap)
+        except Exception:
+            status = "Syntax Error" if case_phase == "testcase_compile" else "Runtime Error"
+            stdout_val = stdout_capture.getvalue()
+            stderr_val = stderr_capture.getvalue()
+            error_msg = format_user_error()
+            if stderr_val:
+                stderr_val = stderr_val + "\n" + error_msg
+            else:
+                stderr_val = error_msg
+            stderr_val = _cap_text(stderr_val, output_cap)
+
+        results.append({
+            "id": case.id,
+            "status": status,
+            "input": input_code,
+            "stdout": stdout_val,
+            "output": output_str,
+            "expected": _cap_text(repr(expected), output_cap),
+            "stderr": stderr_val,
+        })
+
+    return results
+
+
+def _print_error(message):
+    _emit_json([{"id": "error", "status": "Runtime Error", "stderr": message}])
+
+
+def _read_block(stream):
+    size = int.from_bytes(stream.read(4), "big")
+    return stream.read(size)
+
+
+def _read_stdin_payload():
+    # Length-prefixed blocks: 4-byte big-endian size + UTF-8 user code, then the same
+    # for the JSON test config (see judge.runner._encode_harness_input).
+    stream = sys.stdin.buffer
+    user_code = _read_block(stream).decode("utf-8")
+    config = _json_loads(_read_block(stream))
+    return config, user_code
+
+
+def _read_stdin_batch():
+    # The JSON config block comes first, followed by one block per submission until EOF.
+    stream = sys.stdin.buffer
+    config = _json_loads(_read_block(stream))
+    user_codes = []
+    while True:
+        header = stream.read(4)
+        if not header:
+            break
+        user_codes.append(stream.read(int.from_bytes(header, "big")).decode("utf-8"))
+    return config, user_codes
+
+
+def main():
+    if "--stdin-batch" in sys.argv[1:]:
+        config, user_codes = _read_stdin_batch()
+        _emit_json(run_batch(config, user_codes))
+        return
+
+    config = globals().get("__judge_test_config__")
+    user_code = globals().get("__judge_user_code__")
+    if (config is None or user_code is None) and "--stdin" in sys.argv[1:]:
+        config, user_code = _read_stdin_payload()
+
+    if config is None:
+        try:
+            with open("test_config.json", "rb") as f:
+                config = _json_loads(f.read())
+        except FileNotFoundError:
+            _print_error("test_config.json not found")
+            return
+
+    if user_code is None:
+        try:
+            with open("main.py") as f:
+                user_code = f.read()
+        except FileNotFoundError:
+            _print_error("main.py not found")
+            return
+
+    _emit_json(run_cases(config, user_code))
+
+
+if __name__ == "__main__":
+    main()
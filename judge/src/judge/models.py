@@ -10,6 +10,7 @@ from pydantic import BaseModel, ConfigDict, Field, model_validator
 MAX_CODE_CHARS = 100_000
 MAX_RUN_CASES = 10
 MAX_RUN_CASES_PAYLOAD_BYTES = 256 * 1024
+MAX_SUBMIT_BATCH = 20
 JobOperation = Literal["submit", "run"]
 
 
@@ -30,6 +31,17 @@ class SubmitRequest(BaseModel):
     )
 
 
+class SubmitBatchRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    submissions: list[SubmitRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_SUBMIT_BATCH,
+        description="Submit jobs admitted together",
+    )
+
+
 class ApiTestCase(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
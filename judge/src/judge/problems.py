@@ -7,6 +7,7 @@ import copy
 import json
 import math
 from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
 from typing import Any, Literal
 
@@ -97,6 +98,18 @@ class CompiledTestCase:
     input_code: str
     expected_literal: str
 
+    @cached_property
+    def config_payload(self) -> dict[str, Any]:
+        payload: dict[str, Any] = {
+            "id": self.id,
+            "input_code": self.input_code,
+            "expected_literal": self.expected_literal,
+        }
+        expected = ast.literal_eval(self.expected_literal)
+        if _survives_json_roundtrip(expected):
+            payload["expected"] = expected
+        return payload
+
 
 @dataclass(frozen=True)
 class ExecutionPlan:
@@ -117,8 +130,12 @@ class _ProblemBundle:
     hidden_cases: tuple[CompiledTestCase, ...]
 
 
+def _is_safe_problem_id(problem_id: str) -> bool:
+    return not (problem_id.startswith("/") or ".." in problem_id.split("/"))
+
+
 def _safe_problem_path(root: Path, problem_id: str) -> Path:
-    if problem_id.startswith("/") or ".." in problem_id.split("/"):
+    if not _is_safe_problem_id(problem_id):
         raise ValueError("Invalid problem id")
     return root / problem_id
 
@@ -128,16 +145,27 @@ def _file_signature(path: Path) -> tuple[int, int]:
     return (stat.st_mtime_ns, stat.st_size)
 
 
-def _bundle_signature(problem_dir: Path) -> tuple[tuple[int, int], tuple[int, int], tuple[int, int]]:
-    return (
-        _file_signature(problem_dir / "problem.json"),
-        _file_signature(problem_dir / "public_cases.json"),
-        _file_signature(problem_dir / "hidden_tests.json"),
-    )
+_BUNDLE_FILES = ("problem.json", "public_cases.json", "hidden_tests.json")
+
+
+def _bundle_signature(
+    problem_dir: Path,
+) -> tuple[tuple[int, int], tuple[int, int], tuple[int, int]] | str:
+    """Return the bundle's file signatures, or the name of the first missing file.
+
+    One stat per file doubles as the existence check, so a cache hit costs three syscalls.
+    """
+    signatures = []
+    for name in _BUNDLE_FILES:
+        try:
+            signatures.append(_file_signature(problem_dir / name))
+        except (FileNotFoundError, NotADirectoryError):
+            return name
+    return tuple(signatures)
 
 
 def _load_json_dict(path: Path) -> dict[str, Any]:
-    raw = json.loads(path.read_text())
+    raw = json.loads(path.read_bytes())
     if not isinstance(raw, dict):
         raise ValueError(f"{path.name} must contain a JSON object")
     return raw
@@ -166,6 +194,30 @@ def _parse_expected_literal(value: Any, *, context: str) -> str:
     return value
 
 
+def _within_int64(value: Any) -> bool:
+    if isinstance(value, bool):
+        return True
+    if isinstance(value, int):
+        return -(2**63) <= value < 2**63
+    if isinstance(value, list):
+        return all(_within_int64(item) for item in value)
+    if isinstance(value, dict):
+        return all(_within_int64(item) for item in value.values())
+    return True
+
+
+def _survives_json_roundtrip(value: Any) -> bool:
+    # Tuples, sets, and non-string dict keys do not survive JSON; those cases keep
+    # shipping only the literal so the harness reconstructs the exact Python value.
+    # Integers beyond 64 bits are excluded because orjson cannot round-trip them, and
+    # non-finite floats because orjson serializes them as null.
+    try:
+        roundtrip = json.loads(json.dumps(value, allow_nan=False))
+    except (TypeError, ValueError):
+        return False
+    return repr(roundtrip) == repr(value) and _within_int64(value)
+
+
 def runner_input_names(runner: str) -> list[str]:
     expr = ast.parse(runner, mode="eval").body
     if isinstance(expr, ast.Call):
@@ -641,20 +693,29 @@ class ProblemRepository:
     def _problem_dir(self, problem_id: str) -> Path:
         return _safe_problem_path(self.root, problem_id)
 
+    def reload(self) -> None:
+        """Drop every cached bundle so the next lookup re-reads problem files."""
+        self._bundle_cache.clear()
+
     def _load_bundle(self, problem_id: str) -> _ProblemBundle:
-        problem_dir = self._problem_dir(problem_id)
-        problem_path = problem_dir / "problem.json"
-        public_path = problem_dir / "public_cases.json"
-        hidden_path = problem_dir / "hidden_tests.json"
-        for required_path in (problem_path, public_path, hidden_path):
-            if not required_path.exists():
-                raise FileNotFoundError(f"missing canonical problem file: {required_path.name}")
+        found = self._find_bundle(problem_id)
+        if isinstance(found, str):
+            raise FileNotFoundError(f"missing canonical problem file: {found}")
+        return found
 
+    def _find_bundle(self, problem_id: str) -> _ProblemBundle | str:
+        problem_dir = self._problem_dir(problem_id)
         signature = _bundle_signature(problem_dir)
+        if isinstance(signature, str):
+            return signature
         cached = self._bundle_cache.get(problem_id)
         if cached and cached[0] == signature:
             return cached[1]
 
+        problem_path = problem_dir / "problem.json"
+        public_path = problem_dir / "public_cases.json"
+        hidden_path = problem_dir / "hidden_tests.json"
+
         spec = load_problem_spec_file(problem_id, problem_path)
         public_cases = load_public_cases_file(public_path, spec, self.compiler)
         compiled_public = tuple(self.compiler.compile_cases(spec, list(public_cases)))
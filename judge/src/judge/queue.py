@@ -1,5 +1,8 @@
 """Redis Streams queue helpers."""
 
+from __future__ import annotations
+
+from collections.abc import Sequence
 from typing import Any
 
 import redis
@@ -15,9 +18,82 @@ def _require_non_empty_str(payload: dict[str, Any], key: str) -> str:
     return value.strip()
 
 
+def _build_fields(payload: dict[str, Any]) -> dict[str, str]:
+    job_id = _require_non_empty_str(payload, "job_id")
+    problem_id = _require_non_empty_str(payload, "problem_id")
+    profile = _require_non_empty_str(payload, "profile")
+    operation = payload.get("operation")
+    if not isinstance(operation, str) or operation not in _ALLOWED_OPERATIONS:
+        raise ValueError(
+            "Queue payload field 'operation' must be one of: run, submit"
+        )
+    code = payload.get("code", "")
+    if not isinstance(code, str):
+        raise ValueError("Queue payload field 'code' must be a string")
+    cases_json = payload.get("cases_json")
+    if operation == "run":
+        if not isinstance(cases_json, str) or not cases_json.strip():
+            raise ValueError("Queue payload field 'cases_json' must be a non-empty string for run jobs")
+        serialized_cases = cases_json
+    else:
+        if cases_json is not None and not isinstance(cases_json, str):
+            raise ValueError("Queue payload field 'cases_json' must be a string when provided")
+        serialized_cases = cases_json or ""
+
+    created_at = payload.get("created_at")
+    if created_at is None:
+        created_at_field = ""
+    elif isinstance(created_at, int) and not isinstance(created_at, bool):
+        created_at_field = str(created_at)
+    elif isinstance(created_at, str) and created_at.strip().isdigit():
+        created_at_field = created_at.strip()
+    else:
+        raise ValueError(
+            "Queue payload field 'created_at' must be an integer unix timestamp"
+        )
+
+    return {
+        "job_id": job_id,
+        "problem_id": problem_id,
+        "profile": profile,
+        "operation": operation,
+        "code": code,
+        "cases_json": serialized_cases,
+        "created_at": created_at_field,
+    }
+
+
 class RedisQueue:
-    def __init__(self, redis_url: str) -> None:
-        self.client = redis.Redis.from_url(redis_url, decode_responses=True)
+    def __init__(
+        self,
+        redis_url: str,
+        *,
+        max_connections: int = 0,
+        client_name: str | None = None,
+    ) -> None:
+        if max_connections > 0:
+            # Callers block for a free connection instead of opening one per thread.
+            pool = redis.BlockingConnectionPool.from_url(
+                redis_url,
+                max_connections=max_connections,
+                timeout=10,
+                decode_responses=True,
+                client_name=client_name,
+            )
+            self.client = redis.Redis(connection_pool=pool)
+        else:
+            self.client = redis.Redis.from_url(
+                redis_url,
+                decode_responses=True,
+                client_name=client_name,
+            )
+
+    @classmethod
+    def from_client(cls, client: redis.Redis) -> RedisQueue:
+        """Wrap an already configured client instead of building a pool from a URL."""
+        queue = cls.__new__(cls)
+        queue.client = client
+        return queue
 
     def ensure_group(self, stream: str, group: str) -> None:
         try:
@@ -27,71 +103,75 @@ class RedisQueue:
                 raise
 
     def enqueue(self, stream: str, payload: dict[str, Any]) -> str:
-        job_id = _require_non_empty_str(payload, "job_id")
-        problem_id = _require_non_empty_str(payload, "problem_id")
-        profile = _require_non_empty_str(payload, "profile")
-        operation = payload.get("operation")
-        if not isinstance(operation, str) or operation not in _ALLOWED_OPERATIONS:
-            raise ValueError(
-                "Queue payload field 'operation' must be one of: run, submit"
-            )
-        code = payload.get("code", "")
-        if not isinstance(code, str):
-            raise ValueError("Queue payload field 'code' must be a string")
-        cases_json = payload.get("cases_json")
-        if operation == "run":
-            if not isinstance(cases_json, str) or not cases_json.strip():
-                raise ValueError("Queue payload field 'cases_json' must be a non-empty string for run jobs")
-            serialized_cases = cases_json
-        else:
-            if cases_json is not None and not isinstance(cases_json, str):
-                raise ValueError("Queue payload field 'cases_json' must be a string when provided")
-            serialized_cases = cases_json or ""
-
-        created_at = payload.get("created_at")
-        if created_at is None:
-            created_at_field = ""
-        elif isinstance(created_at, int) and not isinstance(created_at, bool):
-            created_at_field = str(created_at)
-        elif isinstance(created_at, str) and created_at.strip().isdigit():
-            created_at_field = created_at.strip()
-        else:
-            raise ValueError(
-                "Queue payload field 'created_at' must be an integer unix timestamp"
-            )
+        return self.client.xadd(stream, _build_fields(payload))
 
-        fields = {
-            "job_id": job_id,
-            "problem_id": problem_id,
-            "profile": profile,
-            "operation": operation,
-            "code": code,
-            "cases_json": serialized_cases,
-            "created_at": created_at_field,
-        }
-        return self.client.xadd(stream, fields)
+    def enqueue_pipeline(
+        self,
+        entries: Sequence[tuple[str, dict[str, Any]]],
+    ) -> list[str | Exception]:
+        """XADD every (stream, payload) entry in one pipelined round trip.
+
+        Every payload is validated before anything is sent. Per-entry Redis errors are
+        returned in place of the message id; connection failures raise.
+        """
+        prepared = [(stream, _build_fields(payload)) for stream, payload in entries]
+        if not prepared:
+            return []
+        pipe = self.client.pipeline(transaction=False)
+        for stream, fields in prepared:
+            pipe.xadd(stream, fields)
+        return pipe.execute(raise_on_error=False)
 
     def read(self, stream: str, group: str, consumer: str, block_ms: int = 5000) -> tuple[str, dict[str, str]] | None:
+        messages = self.read_many(stream, group, consumer, count=1, block_ms=block_ms)
+        return messages[0] if messages else None
+
+    def read_many(
+        self,
+        stream: str,
+        group: str,
+        consumer: str,
+        *,
+        count: int,
+        block_ms: int = 5000,
+    ) -> list[tuple[str, dict[str, str]]]:
         entries = self.client.xreadgroup(
             group,
             consumer,
             streams={stream: ">"},
-            count=1,
+            count=count,
             block=block_ms,
         )
         if not entries:
-            return None
+            return []
         _, messages = entries[0]
-        msg_id, fields = messages[0]
-        return msg_id, fields
+        return list(messages)
 
     def ack(self, stream: str, group: str, msg_id: str) -> None:
         self.client.xack(stream, group, msg_id)
 
     def ack_and_delete(self, stream: str, group: str, msg_id: str) -> tuple[int, int]:
-        acked = int(self.client.xack(stream, group, msg_id))
-        deleted = int(self.client.xdel(stream, msg_id))
-        return acked, deleted
+        # XACK and XDEL share one round trip; both are idempotent, so no MULTI is needed.
+        pipe = self.client.pipeline(transaction=False)
+        pipe.xack(stream, group, msg_id)
+        pipe.xdel(stream, msg_id)
+        acked, deleted = pipe.execute()
+        return int(acked), int(deleted)
+
+    def ack_and_delete_many(
+        self,
+        stream: str,
+        group: str,
+        msg_ids: Sequence[str],
+    ) -> tuple[int, int]:
+        """Ack and delete a batch with one variadic XACK and XDEL in a single round trip."""
+        if not msg_ids:
+            return 0, 0
+        pipe = self.client.pipeline(transaction=False)
+        pipe.xack(stream, group, *msg_ids)
+        pipe.xdel(stream, *msg_ids)
+        acked, deleted = pipe.execute()
+        return int(acked), int(deleted)
 
     def backlog(self, stream: str, group: str) -> int:
         try:
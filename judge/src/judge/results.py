@@ -1,26 +1,52 @@
 """SQLite results store."""
 
+from __future__ import annotations
+
 import json
 import sqlite3
 import threading
 import time
+import uuid
 from pathlib import Path
 from typing import Any
 
+# Statuses a job may be finalized from, keyed by the terminal status being written.
+_FINALIZE_FROM = {
+    "done": ("running",),
+    "error": ("queued", "running"),
+}
+
 
 class ResultsStore:
-    def __init__(self, db_path: Path) -> None:
+    def __init__(self, db_path: Path, *, _shared_memory_uri: str | None = None) -> None:
         self.db_path = Path(db_path)
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self._thread_local = threading.local()
+        self._keepalive: sqlite3.Connection | None = None
+        if _shared_memory_uri is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._database = str(self.db_path)
+            self._uri = False
+        else:
+            self._database = _shared_memory_uri
+            self._uri = True
+            # A shared-cache memory database lives only while a connection to it is open.
+            self._keepalive = self._connect()
         self._init_db()
 
+    @classmethod
+    def in_memory(cls) -> ResultsStore:
+        """Open a private in-memory store that every thread shares; meant for tests."""
+        return cls(
+            Path(":memory:"),
+            _shared_memory_uri=f"file:judge-{uuid.uuid4().hex}?mode=memory&cache=shared",
+        )
+
     def _connect(self) -> sqlite3.Connection:
         conn = getattr(self._thread_local, "conn", None)
         if conn is not None:
             return conn
 
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(self._database, uri=self._uri)
         conn.row_factory = sqlite3.Row
         conn.execute("PRAGMA journal_mode=WAL")
         conn.execute("PRAGMA synchronous=NORMAL")
@@ -91,18 +117,7 @@ class ResultsStore:
         return cursor.rowcount > 0
 
     def mark_done(self, job_id: str, result: dict[str, Any]) -> bool:
-        now = int(time.time())
-        with self._connect() as conn:
-            cursor = conn.execute(
-                """
-                UPDATE jobs
-                SET status = ?, finished_at = ?, result_json = ?, error = NULL, error_kind = NULL
-                WHERE id = ?
-                  AND status = 'running'
-                """,
-                ("done", now, json.dumps(result), job_id),
-            )
-        return cursor.rowcount > 0
+        return self.finalize(job_id, "done", result)
 
     def mark_error(
         self,
@@ -111,6 +126,28 @@ class ResultsStore:
         result: dict[str, Any] | None = None,
         error_kind: str | None = None,
     ) -> bool:
+        return self.finalize(job_id, "error", result, error=error, error_kind=error_kind)
+
+    def finalize(
+        self,
+        job_id: str,
+        status: str,
+        result: dict[str, Any] | None,
+        *,
+        error: str | None = None,
+        error_kind: str | None = None,
+    ) -> bool:
+        """Move a job to a terminal status in one compare-and-set UPDATE.
+
+        A "done" result only lands on a running job; an "error" may also close a job
+        that never left the queue (e.g. enqueue failures). Terminal rows are never
+        overwritten, so the return value tells whether this call won.
+        """
+        from_statuses = _FINALIZE_FROM.get(status)
+        if from_statuses is None:
+            raise ValueError(f"Invalid terminal job status: {status}")
+        # Pad to a fixed width so the statement text never depends on the status.
+        first, second = (from_statuses * 2)[:2]
         now = int(time.time())
         result_json = json.dumps(result) if result is not None else None
         with self._connect() as conn:
@@ -119,9 +156,9 @@ class ResultsStore:
                 UPDATE jobs
                 SET status = ?, finished_at = ?, result_json = ?, error = ?, error_kind = ?
                 WHERE id = ?
-                  AND status IN ('queued', 'running')
+                  AND status IN (?, ?)
                 """,
-                ("error", now, result_json, error, error_kind, job_id),
+                (status, now, result_json, error, error_kind, job_id, first, second),
             )
         return cursor.rowcount > 0
 
@@ -2,211 +2,29 @@
 
 import hashlib
 import json
+import multiprocessing
+import multiprocessing.connection
 import os
 import py_compile
+import shutil
 import subprocess
 import sys
 import tempfile
-from dataclasses import dataclass
+from collections.abc import Sequence
+from dataclasses import dataclass, replace
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
+from judge import harness as _harness_module
 from judge.problems import ExecutionPlan
 
-HARNESS_CODE = '''
-import json
-import io
-import math
-import ast
-import traceback
-import sys
-from contextlib import redirect_stdout, redirect_stderr
-
-def normalize(value):
-    if hasattr(value, "tolist"):
-        try:
-            return value.tolist()
-        except Exception:
-            return str(value)
-    return value
-
-
-def allclose(a, b, rtol, atol):
-    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
-        return math.isclose(a, b, rel_tol=rtol, abs_tol=atol)
-    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
-        if len(a) != len(b):
-            return False
-        return all(allclose(x, y, rtol, atol) for x, y in zip(a, b))
-    if isinstance(a, dict) and isinstance(b, dict):
-        if a.keys() != b.keys():
-            return False
-        return all(allclose(a[k], b[k], rtol, atol) for k in a.keys())
-    return a == b
-
-
-def compare(actual, expected, comparison):
-    cmp_type = comparison.get("type", "exact")
-    rtol = float(comparison.get("rtol", 0.0))
-    atol = float(comparison.get("atol", 0.0))
-    if cmp_type == "allclose":
-        return allclose(actual, expected, rtol, atol)
-    return actual == expected
-
-
-def _is_user_frame(frame):
-    return frame.filename in ("solution.py", "testcase.py")
-
-
-def format_user_error():
-    exc_type, exc_value, exc_tb = sys.exc_info()
-    if isinstance(exc_value, SyntaxError):
-        lineno = exc_value.lineno or 0
-        text = exc_value.text or ""
-        lines = []
-        if lineno:
-            lines.append(f"Line {lineno}:")
-        if text:
-            lines.append(f"    {text.rstrip()}")
-        msg = exc_value.msg if hasattr(exc_value, "msg") else str(exc_value)
-        lines.append(f"{exc_type.__name__}: {msg}")
-        return "\\n".join(lines)
-
-    frames = traceback.extract_tb(exc_tb)
-    user_frames = [frame for frame in frames if _is_user_frame(frame)]
-    if not user_frames:
-        last = frames[-1] if frames else None
-        if last:
-            line = last.line or ""
-            if line:
-                return f"Line {last.lineno}:\\n    {line}\\n{exc_type.__name__}: {exc_value}"
-            return f"Line {last.lineno}:\\n{exc_type.__name__}: {exc_value}"
-        return f"{exc_type.__name__}: {exc_value}"
-
-    lines = []
-    for frame in user_frames:
-        if frame.name == "<module>":
-            lines.append(f"Line {frame.lineno}:")
-        else:
-            lines.append(f"Line {frame.lineno}, in {frame.name}:")
-        if frame.line:
-            lines.append(f"    {frame.line}")
-    lines.append(f"{exc_type.__name__}: {exc_value}")
-    return "\\n".join(lines)
-
-
-def run_cases():
-    config = globals().get("__judge_test_config__")
-    if config is None:
-        try:
-            with open("test_config.json", "r") as f:
-                config = json.load(f)
-        except FileNotFoundError:
-            print(json.dumps([{"id": "error", "status": "Runtime Error", "stderr": "test_config.json not found"}]))
-            return
-
-    user_code = globals().get("__judge_user_code__")
-    if user_code is None:
-        try:
-            with open("main.py", "r") as f:
-                user_code = f.read()
-        except FileNotFoundError:
-            print(json.dumps([{"id": "error", "status": "Runtime Error", "stderr": "main.py not found"}]))
-            return
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
 
-    runner_expression = config.get("runner", "")
-    comparison_default = config.get("comparison", {"type": "exact"})
-
-    _torch_module = None
-    if config.get("execution_profile") == "torch":
-        import torch as _torch_module
-
-    try:
-        compiled_runner = compile(runner_expression, "runner.py", "eval")
-    except Exception as exc:
-        print(json.dumps([{
-            "id": "error",
-            "status": "Runtime Error",
-            "stderr": f"Invalid runner expression: {exc}",
-        }]))
-        return
-
-    try:
-        compiled_solution = compile(user_code, "solution.py", "exec")
-    except Exception:
-        error_msg = format_user_error()
-        print(json.dumps([{"id": "error", "status": "Syntax Error", "stderr": error_msg}]))
-        return
-
-    results = []
-    for case in config.get("cases", []):
-        stdout_capture = io.StringIO()
-        stderr_capture = io.StringIO()
-
-        input_code = case.get("input_code", "")
-        expected_literal = case.get("expected_literal", "")
-        comparison = comparison_default
-
-        status = "Accepted"
-        output_str = ""
-        expected = ast.literal_eval(expected_literal)
-        stdout_val = ""
-        stderr_val = ""
-        case_phase = "solution_exec"
-
-        try:
-            with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
-                # Re-exec user code per case to avoid mutable global state leaking between cases.
-                # Set explicit module metadata expected by typical Python submissions.
-                case_globals = {
-                    "__builtins__": __builtins__,
-                    "__name__": "solution",
-                    "__file__": "solution.py",
-                    "__package__": None,
-                }
-                if _torch_module is not None:
-                    case_globals["torch"] = _torch_module
-                case_phase = "solution_exec"
-                exec(compiled_solution, case_globals)
-                case_phase = "testcase_compile"
-                compiled_input = compile(input_code, "testcase.py", "exec")
-                case_phase = "testcase_exec"
-                exec(compiled_input, case_globals)
-                case_phase = "runner_eval"
-                actual_value = eval(compiled_runner, case_globals)
-
-            stdout_val = stdout_capture.getvalue()
-            stderr_val = stderr_capture.getvalue()
-
-            actual_value = normalize(actual_value)
-            if not compare(actual_value, expected, comparison):
-                status = "Wrong Answer"
-            output_str = repr(actual_value)
-        except Exception:
-            status = "Syntax Error" if case_phase == "testcase_compile" else "Runtime Error"
-            stdout_val = stdout_capture.getvalue()
-            stderr_val = stderr_capture.getvalue()
-            error_msg = format_user_error()
-            if stderr_val:
-                stderr_val = stderr_val + "\\n" + error_msg
-            else:
-                stderr_val = error_msg
-
-        results.append({
-            "id": case.get("id", ""),
-            "status": status,
-            "input": input_code,
-            "stdout": stdout_val,
-            "output": output_str,
-            "expected": repr(expected),
-            "stderr": stderr_val,
-        })
-
-    print(json.dumps(results))
-
-if __name__ == "__main__":
-    run_cases()
-'''
+HARNESS_CODE = Path(_harness_module.__file__).read_text()
 _HARNESS_DIGEST = hashlib.sha256(HARNESS_CODE.encode("utf-8")).hexdigest()[:12]
 _RUNTIME_DIR = Path(tempfile.gettempdir()) / "judge-runtime"
 _HARNESS_HOST_PATH = _RUNTIME_DIR / f"harness-{_HARNESS_DIGEST}.py"
@@ -223,6 +41,12 @@ _OPTIONAL_SANDBOX_ENV_VARS = (
     "PYTORCH_JIT",
     "CUDA_VISIBLE_DEVICES",
 )
+# Modules imported once by the fork server so unsandboxed harness children start warm.
+_FORKSERVER_PRELOAD = ("judge.runner", "numpy", "orjson")
+# Upper bound on fork server start-up before an unsandboxed run counts as an internal failure.
+_HARNESS_START_TIMEOUT_S = 30.0
+# Initialized isolate boxes kept across runs when IsolateConfig.reuse_box is set.
+_READY_ISOLATE_BOXES: dict[int, Path] = {}
 
 
 @dataclass(frozen=True)
@@ -235,23 +59,23 @@ class IsolateConfig:
     timeout_grace_s: int = 5
     fsize_kb: int = 1024
     python_bin: str = sys.executable
+    reuse_box: bool = False
 
 
-def _build_test_config(plan: ExecutionPlan) -> dict[str, Any]:
-    cases = [
-        {
-            "id": case.id,
-            "input_code": case.input_code,
-            "expected_literal": case.expected_literal,
-        }
-        for case in plan.cases
-    ]
-    return {
+@lru_cache(maxsize=64)
+def _build_test_config(plan: ExecutionPlan, max_output_chars: int | None = None) -> dict[str, Any]:
+    # Submit plans reuse the repository's cached cases, so identical plans hit this cache.
+    # Callers must treat the returned config as read-only.
+    config = {
         "runner": plan.runner,
         "comparison": plan.comparison.as_payload(),
         "execution_profile": plan.execution_profile,
-        "cases": cases,
+        "cases": [case.config_payload for case in plan.cases],
     }
+    if max_output_chars is not None:
+        # Lets the harness bound captured output at the source instead of shipping it whole.
+        config["max_output_chars"] = max_output_chars
+    return config
 
 
 def _truncate(value: str, max_chars: int) -> str:
@@ -260,51 +84,86 @@ def _truncate(value: str, max_chars: int) -> str:
     return value[: max_chars - 3] + "..."
 
 
+# (field, truncate) pairs in response order; every field defaults to "".
+_SANITIZED_FIELDS = (
+    ("id", False),
+    ("status", False),
+    ("input", False),
+    ("stdout", True),
+    ("output", True),
+    ("expected", True),
+    ("stderr", True),
+)
+
+
 def _sanitize_item(item: dict[str, Any], max_output_chars: int) -> dict[str, Any]:
+    get = item.get
     return {
-        "id": item.get("id", ""),
-        "status": item.get("status", ""),
-        "input": item.get("input", ""),
-        "stdout": _truncate(item.get("stdout", ""), max_output_chars),
-        "output": _truncate(item.get("output", ""), max_output_chars),
-        "expected": _truncate(item.get("expected", ""), max_output_chars),
-        "stderr": _truncate(item.get("stderr", ""), max_output_chars),
+        key: _truncate(get(key, ""), max_output_chars) if truncate else get(key, "")
+        for key, truncate in _SANITIZED_FIELDS
     }
 
 
-def _summarize_results(
-    results: list[dict[str, Any]],
-) -> tuple[dict[str, int], dict[str, Any] | None]:
-    total = 0
-    passed = 0
-    first_failed: dict[str, Any] | None = None
+def _build_error_summary(total_cases: int) -> dict[str, int]:
+    return {
+        "total": total_cases,
+        "passed": 0,
+        "failed": total_cases,
+    }
 
-    for item in results:
-        total += 1
-        status = item.get("status", "")
 
-        if status == "Accepted":
-            passed += 1
-        elif first_failed is None:
-            first_failed = item
+def _error_response(
+    status: str,
+    total_cases: int,
+    error: str,
+    error_kind: str,
+) -> dict[str, Any]:
+    return {
+        "status": status,
+        "summary": _build_error_summary(total_cases),
+        "tests": [],
+        "error": error,
+        "error_kind": error_kind,
+    }
 
-    failed = total - passed
 
-    summary = {
-        "total": total,
-        "passed": passed,
-        "failed": failed,
-    }
+def _time_limit_response(plan: ExecutionPlan, total_cases: int) -> dict[str, Any]:
+    return _error_response(
+        "Time Limit Exceeded",
+        total_cases,
+        f"Time Limit Exceeded ({plan.time_limit_s}s)",
+        "user",
+    )
 
-    return summary, first_failed
 
+def _memory_limit_response(plan: ExecutionPlan, total_cases: int) -> dict[str, Any]:
+    return _error_response(
+        "Memory Limit Exceeded",
+        total_cases,
+        f"Memory Limit Exceeded ({plan.memory_mb}MB)",
+        "user",
+    )
 
-def _build_error_summary(total_cases: int) -> dict[str, int]:
-    return {
-        "total": total_cases,
-        "passed": 0,
-        "failed": total_cases,
-    }
+
+def _harness_output_response(
+    plan: ExecutionPlan,
+    total_cases: int,
+    stdout: bytes | str,
+    stderr: str,
+    max_output_chars: int,
+) -> dict[str, Any]:
+    try:
+        tests_raw = _json_loads(stdout)
+    except json.JSONDecodeError:
+        if isinstance(stdout, bytes):
+            stdout = _decode_output(stdout)
+        return _error_response(
+            "Runtime Error",
+            total_cases,
+            f"Invalid runner output. Stdout: {stdout}\nStderr: {stderr}",
+            "internal",
+        )
+    return _build_success_response(plan, tests_raw, max_output_chars)
 
 
 def _isolate_base_cmd(isolate: IsolateConfig) -> list[str]:
@@ -350,6 +209,42 @@ def _init_isolate_box(isolate: IsolateConfig) -> Path:
     raise RuntimeError(f"isolate init failed for box {isolate.box_id}: {init.stderr.strip()}")
 
 
+def _acquire_isolate_box(isolate: IsolateConfig) -> Path:
+    if isolate.reuse_box:
+        box_path = _READY_ISOLATE_BOXES.get(isolate.box_id)
+        if box_path is not None:
+            return box_path
+    box_path = _init_isolate_box(isolate)
+    if isolate.reuse_box:
+        _READY_ISOLATE_BOXES[isolate.box_id] = box_path
+    return box_path
+
+
+def prewarm_isolate_box(isolate: IsolateConfig) -> None:
+    """Initialize a reusable box ahead of its first job; a no-op without ``reuse_box``."""
+    if isolate.reuse_box:
+        _acquire_isolate_box(isolate)
+
+
+def _reset_isolate_box(box_path: Path) -> None:
+    for entry in os.scandir(box_path):
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path)
+        else:
+            os.unlink(entry.path)
+
+
+def _release_isolate_box(isolate: IsolateConfig, box_path: Path) -> None:
+    if isolate.reuse_box:
+        # Wipe everything the submission left behind so nothing leaks into the next run.
+        try:
+            _reset_isolate_box(box_path)
+            return
+        except OSError:
+            _READY_ISOLATE_BOXES.pop(isolate.box_id, None)
+    _cleanup_isolate_box(isolate)
+
+
 def _parse_isolate_meta(meta_path: Path) -> dict[str, str]:
     if not meta_path.exists():
         return {}
@@ -388,6 +283,37 @@ def _harness_entrypoint() -> str:
     return f"/runtime/{_HARNESS_BYTECODE_PATH.name}"
 
 
+def _encode_block(data: bytes) -> bytes:
+    return len(data).to_bytes(4, "big") + data
+
+
+def _encode_harness_batch_input(user_codes: list[str], config: dict[str, Any]) -> bytes:
+    blocks = [_encode_block(_json_dumps(config))]
+    blocks.extend(_encode_block(user_code.encode("utf-8")) for user_code in user_codes)
+    return b"".join(blocks)
+
+
+def _encode_harness_input(user_code: str, config: dict[str, Any]) -> bytes:
+    return _encode_block(user_code.encode("utf-8")) + _encode_block(_json_dumps(config))
+
+
+def _json_dumps(value: Any) -> bytes:
+    if _orjson is not None:
+        return _orjson.dumps(value)
+    return json.dumps(value).encode("utf-8")
+
+
+def _json_loads(data: bytes | str) -> Any:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch the latter.
+    if _orjson is not None:
+        return _orjson.loads(data)
+    return json.loads(data)
+
+
+def _decode_output(raw: bytes | None) -> str:
+    return (raw or b"").decode("utf-8", errors="replace")
+
+
 def _isolate_meta_path(box_id: int) -> Path:
     return _RUNTIME_DIR / f"isolate-meta-{box_id}.txt"
 
@@ -408,60 +334,96 @@ def _run_in_isolate(
     user_code: str,
     config: dict[str, Any],
     isolate: IsolateConfig,
-) -> tuple[int, str, str, dict[str, str]]:
-    box_path = _init_isolate_box(isolate)
-    meta_path = _isolate_meta_path(isolate.box_id)
+) -> tuple[int, bytes, str, dict[str, str]]:
+    return _run_harness_in_isolate(
+        plan,
+        _encode_harness_input(user_code, config),
+        "--stdin",
+        isolate,
+    )
+
+
+def _isolate_run_command(
+    plan: ExecutionPlan,
+    harness_mode: str,
+    isolate: IsolateConfig,
+    meta_path: Path,
+) -> tuple[list[str], int]:
+    _RUNTIME_DIR.mkdir(parents=True, exist_ok=True)
+    if meta_path.exists():
+        meta_path.unlink()
+
     harness_entrypoint = _harness_entrypoint()
-    try:
-        _RUNTIME_DIR.mkdir(parents=True, exist_ok=True)
-        if meta_path.exists():
-            meta_path.unlink()
-        (box_path / "main.py").write_text(user_code)
-        (box_path / "test_config.json").write_text(json.dumps(config))
-
-        wall_time = max(plan.time_limit_s + isolate.wall_time_extra_s, plan.time_limit_s + 1)
-        python_bin, dir_mounts = _resolve_python_for_isolate(isolate)
-        run_cmd = _isolate_base_cmd(isolate) + [
-            f"--time={plan.time_limit_s}",
-            f"--wall-time={wall_time}",
-            f"--mem={max(plan.memory_mb, 1) * 1024}",
-            f"--fsize={max(isolate.fsize_kb, 1)}",
-            f"--processes={max(isolate.process_limit, 1)}",
-            f"--meta={meta_path}",
-            "--stdout=stdout.txt",
-            "--stderr=stderr.txt",
-            f"--dir=/runtime={_RUNTIME_DIR}",
+    wall_time = max(plan.time_limit_s + isolate.wall_time_extra_s, plan.time_limit_s + 1)
+    python_bin, dir_mounts = _resolve_python_for_isolate(isolate)
+    run_cmd = _isolate_base_cmd(isolate) + [
+        f"--time={plan.time_limit_s}",
+        f"--wall-time={wall_time}",
+        f"--mem={max(plan.memory_mb, 1) * 1024}",
+        f"--fsize={max(isolate.fsize_kb, 1)}",
+        f"--processes={max(isolate.process_limit, 1)}",
+        f"--meta={meta_path}",
+        "--stdout=stdout.txt",
+        "--stderr=stderr.txt",
+        f"--dir=/runtime={_RUNTIME_DIR}",
+    ]
+    if isolate.use_cgroups:
+        run_cmd.append(f"--cg-mem={max(plan.memory_mb, 1) * 1024}")
+    run_cmd.extend(dir_mounts)
+    run_cmd.extend(_isolate_env_flags())
+    run_cmd.extend(
+        [
+            "--run",
+            "--",
+            python_bin,
+            "-I",
+            harness_entrypoint,
+            harness_mode,
         ]
-        if isolate.use_cgroups:
-            run_cmd.append(f"--cg-mem={max(plan.memory_mb, 1) * 1024}")
-        run_cmd.extend(dir_mounts)
-        run_cmd.extend(_isolate_env_flags())
-        run_cmd.extend(
-            [
-                "--run",
-                "--",
-                python_bin,
-                "-I",
-                harness_entrypoint,
-            ]
-        )
+    )
+    return run_cmd, wall_time + isolate.timeout_grace_s
+
+
+def _collect_isolate_outputs(
+    box_path: Path,
+    meta_path: Path,
+    raw_stdout: bytes | None,
+    raw_stderr: bytes | None,
+) -> tuple[bytes, str, dict[str, str]]:
+    stdout_path = box_path / "stdout.txt"
+    stderr_path = box_path / "stderr.txt"
+    stdout = stdout_path.read_bytes() if stdout_path.exists() else (raw_stdout or b"")
+    stderr = stderr_path.read_text() if stderr_path.exists() else _decode_output(raw_stderr)
+    return stdout, stderr, _parse_isolate_meta(meta_path)
+
+
+def _run_harness_in_isolate(
+    plan: ExecutionPlan,
+    harness_input: bytes,
+    harness_mode: str,
+    isolate: IsolateConfig,
+) -> tuple[int, bytes, str, dict[str, str]]:
+    box_path = _acquire_isolate_box(isolate)
+    meta_path = _isolate_meta_path(isolate.box_id)
+    try:
+        run_cmd, timeout_s = _isolate_run_command(plan, harness_mode, isolate, meta_path)
         result = subprocess.run(
             run_cmd,
             cwd=box_path,
+            input=harness_input,
             capture_output=True,
-            text=True,
-            timeout=wall_time + isolate.timeout_grace_s,
+            timeout=timeout_s,
             check=False,
         )
-
-        stdout_path = box_path / "stdout.txt"
-        stderr_path = box_path / "stderr.txt"
-        stdout = stdout_path.read_text() if stdout_path.exists() else result.stdout
-        stderr = stderr_path.read_text() if stderr_path.exists() else result.stderr
-        isolate_meta = _parse_isolate_meta(meta_path)
+        stdout, stderr, isolate_meta = _collect_isolate_outputs(
+            box_path,
+            meta_path,
+            result.stdout,
+            result.stderr,
+        )
         return result.returncode, stdout, stderr, isolate_meta
     finally:
-        _cleanup_isolate_box(isolate)
+        _release_isolate_box(isolate, box_path)
 
 
 def _isolate_failed_with_tle(meta: dict[str, str]) -> bool:
@@ -478,90 +440,240 @@ def _isolate_failed_with_internal_error(meta: dict[str, str]) -> bool:
     return status == "XX" or status is None
 
 
+def _harness_process_context() -> multiprocessing.context.BaseContext:
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    # Missing modules are skipped by the fork server, so optional ones are safe to list.
+    context.set_forkserver_preload(list(_FORKSERVER_PRELOAD))
+    return context
+
+
+def _forked_harness_entry(
+    conn: multiprocessing.connection.Connection,
+    user_code: str,
+    config: dict[str, Any],
+) -> None:
+    try:
+        # An empty message tells the parent start-up is over and the time limit starts now.
+        conn.send_bytes(b"")
+        conn.send_bytes(_json_dumps(_harness_module.run_cases(config, user_code)))
+    finally:
+        conn.close()
+
+
+def _run_forked_harness(
+    plan: ExecutionPlan,
+    user_code: str,
+    config: dict[str, Any],
+) -> tuple[int, bytes, str]:
+    context = _harness_process_context()
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_forked_harness_entry,
+        args=(sender, user_code, config),
+        daemon=True,
+    )
+    try:
+        try:
+            process.start()
+        finally:
+            sender.close()
+        # Fork server start-up and module preloading do not count against the time limit.
+        try:
+            ready = receiver.poll(_HARNESS_START_TIMEOUT_S) and receiver.recv_bytes() == b""
+        except EOFError:
+            ready = False
+        if not ready:
+            raise RuntimeError("harness process exited before it was ready")
+        if not receiver.poll(plan.time_limit_s):
+            raise subprocess.TimeoutExpired("harness", plan.time_limit_s)
+        try:
+            stdout = receiver.recv_bytes()
+        except EOFError:
+            stdout = b""
+        process.join()
+        returncode = process.exitcode or 0
+        stderr = f"Harness exited with code {process.exitcode}" if returncode else ""
+        return returncode, stdout, stderr
+    finally:
+        receiver.close()
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+
+def _run_unsandboxed(
+    plan: ExecutionPlan,
+    user_code: str,
+    config: dict[str, Any],
+    max_output_chars: int,
+) -> dict[str, Any]:
+    # User code never runs in the judge process: it could patch judge modules for later
+    # runs or terminate the host with os._exit().
+    total_cases = len(config["cases"])
+    try:
+        returncode, stdout, stderr = _run_forked_harness(plan, user_code, config)
+    except subprocess.TimeoutExpired:
+        return _time_limit_response(plan, total_cases)
+    except Exception as exc:
+        # The child never reported in, or the pipe failed; the submission is not at fault.
+        return _error_response("Runtime Error", total_cases, f"Runner failed: {exc}", "internal")
+    if returncode != 0:
+        return _error_response("Runtime Error", total_cases, stderr.strip() or "Runner failed", "user")
+    return _harness_output_response(plan, total_cases, stdout, stderr, max_output_chars)
+
+
+def _build_success_response(
+    plan: ExecutionPlan,
+    tests_raw: list[dict[str, Any]],
+    max_output_chars: int,
+) -> dict[str, Any]:
+    # Single pass: count, find the first failure, and only sanitize what will be returned.
+    include_all = plan.detail_mode != "first_failure"
+    passed = 0
+    first_failed: dict[str, Any] | None = None
+    tests: list[dict[str, Any]] = []
+    for item in tests_raw:
+        if item.get("status", "") == "Accepted":
+            passed += 1
+        elif first_failed is None:
+            first_failed = item
+        if include_all:
+            tests.append(_sanitize_item(item, max_output_chars))
+
+    total = len(tests_raw)
+    status = "Accepted"
+    if first_failed is not None:
+        status = first_failed.get("status", "Wrong Answer")
+        if not include_all:
+            tests = [_sanitize_item(first_failed, max_output_chars)]
+
+    return {
+        "status": status,
+        "summary": {
+            "total": total,
+            "passed": passed,
+            "failed": total - passed,
+        },
+        "tests": tests,
+        "error": None,
+    }
+
+
 def run_execution_plan(
     plan: ExecutionPlan,
     user_code: str,
     max_output_chars: int,
     isolate: IsolateConfig | None = None,
 ) -> dict[str, Any]:
-    if isolate is None:
-        raise ValueError("isolate configuration is required")
+    """Execute ``plan`` against ``user_code``.
 
-    config = _build_test_config(plan)
+    Without an ``isolate`` configuration the harness runs unsandboxed in a child forked from
+    a preloaded fork server. That path is meant for local development and CI against trusted
+    code only.
+    """
+    config = _build_test_config(plan, max_output_chars)
     total_cases = len(config["cases"])
 
+    if isolate is None:
+        return _run_unsandboxed(plan, user_code, config, max_output_chars)
+
     try:
-        returncode, stdout, stderr, isolate_meta = _run_in_isolate(plan, user_code, config, isolate)
-    except subprocess.TimeoutExpired:
-        return {
-            "status": "Time Limit Exceeded",
-            "summary": _build_error_summary(total_cases),
-            "tests": [],
-            "error": f"Time Limit Exceeded ({plan.time_limit_s}s)",
-            "error_kind": "user",
-        }
+        outcome = _run_in_isolate(plan, user_code, config, isolate)
     except Exception as exc:
-        return {
-            "status": "Runtime Error",
-            "summary": _build_error_summary(total_cases),
-            "tests": [],
-            "error": f"Runner failed: {exc}",
-            "error_kind": "internal",
-        }
+        return _isolate_failure_response(plan, total_cases, exc)
+    return _isolate_response(plan, total_cases, outcome, max_output_chars)
+
 
+def _isolate_failure_response(
+    plan: ExecutionPlan,
+    total_cases: int,
+    exc: Exception,
+) -> dict[str, Any]:
+    if isinstance(exc, subprocess.TimeoutExpired):
+        return _time_limit_response(plan, total_cases)
+    return _error_response("Runtime Error", total_cases, f"Runner failed: {exc}", "internal")
+
+
+def _isolate_response(
+    plan: ExecutionPlan,
+    total_cases: int,
+    outcome: tuple[int, bytes, str, dict[str, str]],
+    max_output_chars: int,
+) -> dict[str, Any]:
+    returncode, stdout, stderr, isolate_meta = outcome
     if returncode != 0:
         if _isolate_failed_with_tle(isolate_meta):
-            return {
-                "status": "Time Limit Exceeded",
-                "summary": _build_error_summary(total_cases),
-                "tests": [],
-                "error": f"Time Limit Exceeded ({plan.time_limit_s}s)",
-                "error_kind": "user",
-            }
+            return _time_limit_response(plan, total_cases)
         if _isolate_failed_with_mle(isolate_meta):
-            return {
-                "status": "Memory Limit Exceeded",
-                "summary": _build_error_summary(total_cases),
-                "tests": [],
-                "error": f"Memory Limit Exceeded ({plan.memory_mb}MB)",
-                "error_kind": "user",
-            }
-        return {
-            "status": "Runtime Error",
-            "summary": _build_error_summary(total_cases),
-            "tests": [],
-            "error": stderr.strip() or "Runner failed",
-            "error_kind": "internal" if _isolate_failed_with_internal_error(isolate_meta) else "user",
-        }
+            return _memory_limit_response(plan, total_cases)
+        error_kind = "internal" if _isolate_failed_with_internal_error(isolate_meta) else "user"
+        return _error_response("Runtime Error", total_cases, stderr.strip() or "Runner failed", error_kind)
+    return _harness_output_response(plan, total_cases, stdout, stderr, max_output_chars)
 
-    try:
-        tests_raw = json.loads(stdout)
-    except json.JSONDecodeError:
-        return {
-            "status": "Runtime Error",
-            "summary": _build_error_summary(total_cases),
-            "tests": [],
-            "error": f"Invalid runner output. Stdout: {stdout}\nStderr: {stderr}",
-            "error_kind": "internal",
-        }
-
-    summary, first_failed = _summarize_results(tests_raw)
-    status = "Accepted"
-    if summary["failed"] > 0 and first_failed is not None:
-        status = first_failed.get("status", "Wrong Answer")
 
-    if plan.detail_mode == "first_failure":
-        tests = (
-            [_sanitize_item(first_failed, max_output_chars)]
-            if first_failed is not None
-            else []
+def _run_batch_group(
+    plan: ExecutionPlan,
+    user_codes: list[str],
+    max_output_chars: int,
+    isolate: IsolateConfig | None,
+) -> list[dict[str, Any] | None]:
+    """Grade one plan's submissions in a single harness run; None entries need a single run."""
+    unfinished: list[dict[str, Any] | None] = [None] * len(user_codes)
+    if isolate is None or len(user_codes) < 2:
+        # Unsandboxed submissions each get their own forked harness child.
+        return unfinished
+    # The harness enforces the time limit per submission; the sandbox gets the whole budget.
+    config = dict(_build_test_config(plan, max_output_chars), time_limit_s=plan.time_limit_s)
+    batch_plan = replace(plan, time_limit_s=plan.time_limit_s * len(user_codes))
+    try:
+        returncode, stdout, _, _ = _run_harness_in_isolate(
+            batch_plan,
+            _encode_harness_batch_input(user_codes, config),
+            "--stdin-batch",
+            isolate,
         )
-    else:
-        tests = [_sanitize_item(item, max_output_chars) for item in tests_raw]
+        if returncode != 0:
+            return unfinished
+        batch_raw = _json_loads(stdout)
+    except Exception:
+        # Individual reruns produce the precise verdict (and error) for each submission.
+        return unfinished
+
+    if not isinstance(batch_raw, list) or len(batch_raw) != len(user_codes):
+        return unfinished
+    return [
+        None if tests_raw is None else _build_success_response(plan, tests_raw, max_output_chars)
+        for tests_raw in batch_raw
+    ]
 
-    return {
-        "status": status,
-        "summary": summary,
-        "tests": tests,
-        "error": None,
-    }
+
+def run_execution_plan_batch(
+    items: Sequence[tuple[ExecutionPlan, str]],
+    max_output_chars: int,
+    isolate: IsolateConfig | None = None,
+) -> list[dict[str, Any]]:
+    """Grade many ``(plan, user_code)`` pairs, e.g. for regrades.
+
+    With an ``isolate`` configuration, submissions for the same plan share one sandboxed
+    harness run, so sandbox set-up and config preparation are paid once per plan. Inside it
+    every submission runs in its own forked child under the plan's time limit, so one
+    submission cannot change another's grading. Submissions that time out or crash there,
+    and every submission of a group run that fails, are graded again by
+    ``run_execution_plan``, which then decides their verdict. Without ``isolate`` each
+    submission is simply graded by ``run_execution_plan``.
+    """
+    groups: dict[ExecutionPlan, list[int]] = {}
+    for index, (plan, _) in enumerate(items):
+        groups.setdefault(plan, []).append(index)
+
+    responses: list[dict[str, Any]] = [{} for _ in items]
+    for plan, indices in groups.items():
+        user_codes = [items[index][1] for index in indices]
+        group_responses = _run_batch_group(plan, user_codes, max_output_chars, isolate)
+        for index, user_code, response in zip(indices, user_codes, group_responses):
+            if response is None:
+                response = run_execution_plan(plan, user_code, max_output_chars, isolate)
+            responses[index] = response
+    return responses
@@ -2,18 +2,27 @@
 
 from __future__ import annotations
 
+import base64
 import json
 import logging
+import secrets
+import sys
+import threading
 import time
-import uuid
-from collections.abc import Callable, Mapping
+from collections import deque
+from collections.abc import Callable, Mapping, Sequence
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any
 
-from judge.models import JobOperation
+from judge.models import JobOperation, SubmitRequest
 from judge.problems import ExecutionPlanFactory, TestCase, load_compiled_test_cases
 from judge.runner import IsolateConfig, run_execution_plan
 
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
 logger = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
@@ -22,22 +31,49 @@ if TYPE_CHECKING:
     from judge.results import ResultsStore
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class StreamRouting:
     by_profile: Mapping[str, str]
     by_stream_group: Mapping[str, str]
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "by_profile", _interned_dict(self.by_profile))
+        object.__setattr__(self, "by_stream_group", _interned_dict(self.by_stream_group))
+
     def stream_for_profile(self, profile: str) -> str:
-        stream = self.by_profile.get(profile)
-        if stream is None:
-            raise ValueError(f"Unknown worker profile: {profile}")
-        return stream
+        try:
+            return self.by_profile[profile]
+        except KeyError:
+            raise ValueError(f"Unknown worker profile: {profile}") from None
 
     def group_for_stream(self, stream: str) -> str:
-        group = self.by_stream_group.get(stream)
-        if group is None:
-            raise ValueError(f"Unknown queue stream: {stream}")
-        return group
+        try:
+            return self.by_stream_group[stream]
+        except KeyError:
+            raise ValueError(f"Unknown queue stream: {stream}") from None
+
+    def compile(self) -> Callable[[str], tuple[str, str]]:
+        """Return a profile -> (stream, group) lookup backed by one precomputed dict."""
+        # Keys and values were interned in __post_init__.
+        routes = {
+            profile: (stream, self.by_stream_group[stream])
+            for profile, stream in self.by_profile.items()
+            if stream in self.by_stream_group
+        }
+
+        def route(profile: str) -> tuple[str, str]:
+            found = routes.get(profile)
+            if found is None:
+                # Unroutable profile: let the uncompiled lookups raise their usual errors.
+                stream = self.stream_for_profile(profile)
+                return stream, self.group_for_stream(stream)
+            return found
+
+        return route
+
+
+def _interned_dict(mapping: Mapping[str, str]) -> dict[str, str]:
+    return {sys.intern(key): sys.intern(value) for key, value in mapping.items()}
 
 
 DEFAULT_STREAM_ROUTING = StreamRouting(
@@ -76,7 +112,76 @@ class QueueFullError(SubmissionError):
     """Raised when queue admission rejects new submissions."""
 
 
-@dataclass(frozen=True)
+def _now() -> int:
+    return int(time.time())
+
+
+class _IdPool:
+    """Thread-safe source of random 128-bit job ids, drawn from the OS in bursts."""
+
+    def __init__(self, burst: int = 512) -> None:
+        self._burst = burst
+        self._ids: deque[str] = deque()
+        self._lock = threading.Lock()
+
+    def next(self) -> str:
+        try:
+            return self._ids.popleft()
+        except IndexError:
+            pass
+        with self._lock:
+            if not self._ids:
+                raw = secrets.token_bytes(16 * self._burst)
+                self._ids.extend(
+                    base64.b32encode(raw[offset:offset + 16]).decode("ascii").rstrip("=").lower()
+                    for offset in range(0, len(raw), 16)
+                )
+            return self._ids.popleft()
+
+
+class BacklogEstimator:
+    """Per-stream backlog estimate that lets admission skip most backlog round trips.
+
+    A backlog reading from Redis is trusted for ``refresh_interval_s``, with jobs this
+    process enqueues in the meantime added on top. Enqueues from other API processes are
+    not seen, which is why admission only trusts the estimate below ``headroom * maxlen``.
+    """
+
+    def __init__(
+        self,
+        *,
+        refresh_interval_s: float = 0.25,
+        headroom: float = 0.9,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.refresh_interval_s = refresh_interval_s
+        self.headroom = headroom
+        self.clock = clock
+        self._readings: dict[str, tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def admits(self, stream: str, incoming: int, maxlen: int) -> bool:
+        with self._lock:
+            reading = self._readings.get(stream)
+        if reading is None:
+            return False
+        observed_at, estimate = reading
+        if self.clock() - observed_at > self.refresh_interval_s:
+            return False
+        return estimate + incoming < self.headroom * maxlen
+
+    def observe(self, stream: str, backlog: int) -> None:
+        with self._lock:
+            self._readings[stream] = (self.clock(), backlog)
+
+    def record_enqueued(self, stream: str, count: int = 1) -> None:
+        with self._lock:
+            reading = self._readings.get(stream)
+            if reading is not None:
+                self._readings[stream] = (reading[0], reading[1] + count)
+
+
+@dataclass(frozen=True, slots=True)
 class SubmissionAccepted:
     job_id: str
     status: str
@@ -95,6 +200,7 @@ class SubmissionService:
         stream_routing: StreamRouting = DEFAULT_STREAM_ROUTING,
         job_id_factory: Callable[[], str] | None = None,
         now_factory: Callable[[], int] | None = None,
+        backlog_estimator: BacklogEstimator | None = None,
         log: logging.Logger | None = None,
     ) -> None:
         self.queue = queue
@@ -102,9 +208,11 @@ class SubmissionService:
         self.problems = problems
         self.queue_maxlen = queue_maxlen
         self.stream_routing = stream_routing
-        self.job_id_factory = job_id_factory or (lambda: str(uuid.uuid4()))
-        self.now_factory = now_factory or (lambda: int(time.time()))
+        self.job_id_factory = job_id_factory or _IdPool().next
+        self.now_factory = now_factory or _now
+        self.backlog_estimator = backlog_estimator or BacklogEstimator()
         self.log = log or logger
+        self._route_profile = stream_routing.compile()
 
     def enqueue_submit(self, *, problem_id: str, code: str) -> SubmissionAccepted:
         spec = self._resolve_problem_spec(problem_id)
@@ -134,6 +242,62 @@ class SubmissionService:
             cases_json=_serialize_compiled_cases(compiled_cases),
         )
 
+    def enqueue_submit_batch(
+        self,
+        submissions: Sequence[SubmitRequest],
+    ) -> list[SubmissionAccepted]:
+        """Admit several submit jobs with one backlog check per stream and one XADD pipeline.
+
+        Admission is all-or-nothing: every problem id is resolved and every stream's
+        capacity checked before any job row is created. Jobs whose XADD fails are
+        persisted as errors and reported with status "error".
+        """
+        specs = [self._resolve_problem_spec(item.problem_id) for item in submissions]
+        routes = [self._route(spec) for spec in specs]
+
+        incoming: dict[tuple[str, str], int] = {}
+        for route in routes:
+            incoming[route] = incoming.get(route, 0) + 1
+        for (stream, group), count in incoming.items():
+            self._check_capacity(stream, group, incoming=count)
+
+        created_at = self.now_factory()
+        entries: list[tuple[str, dict[str, Any]]] = []
+        for item, spec, (stream, _) in zip(submissions, specs, routes):
+            payload = self._create_job(
+                spec=spec,
+                operation="submit",
+                code=item.code,
+                cases_json=None,
+                created_at=created_at,
+            )
+            entries.append((stream, payload))
+
+        try:
+            outcomes = self.queue.enqueue_pipeline(entries)
+        except Exception as exc:
+            for stream, payload in entries:
+                self._persist_enqueue_failure(job_id=payload["job_id"], stream=stream)
+            raise QueueUnavailableError("Judge queue unavailable") from exc
+
+        accepted = []
+        for (stream, payload), outcome in zip(entries, outcomes):
+            if not isinstance(outcome, Exception):
+                self.backlog_estimator.record_enqueued(stream)
+            job_id = payload["job_id"]
+            if isinstance(outcome, Exception):
+                self.log.error(
+                    "Failed to enqueue batched job: job_id=%s stream=%s error=%s",
+                    job_id,
+                    stream,
+                    outcome,
+                )
+                self._persist_enqueue_failure(job_id=job_id, stream=stream)
+                accepted.append(SubmissionAccepted(job_id=job_id, status="error"))
+            else:
+                accepted.append(SubmissionAccepted(job_id=job_id, status="queued"))
+        return accepted
+
     def _enqueue_job(
         self,
         *,
@@ -142,23 +306,55 @@ class SubmissionService:
         code: str,
         cases_json: str | None,
     ) -> SubmissionAccepted:
-        profile = spec.execution_profile
-        stream = self.stream_routing.stream_for_profile(profile)
-        group = self.stream_routing.group_for_stream(stream)
+        stream, group = self._route(spec)
+        self._check_capacity(stream, group, incoming=1)
+        payload = self._create_job(
+            spec=spec,
+            operation=operation,
+            code=code,
+            cases_json=cases_json,
+            created_at=self.now_factory(),
+        )
 
-        if self.queue_maxlen > 0:
-            try:
-                stream_backlog = self.queue.backlog(stream, group)
-            except Exception as exc:
-                raise QueueUnavailableError("Judge queue unavailable") from exc
-            if stream_backlog >= self.queue_maxlen:
-                raise QueueFullError("Judge queue is full. Please retry.")
+        try:
+            self.queue.enqueue(stream, payload)
+        except Exception as exc:
+            self._persist_enqueue_failure(job_id=payload["job_id"], stream=stream)
+            raise QueueUnavailableError("Judge queue unavailable") from exc
 
+        self.backlog_estimator.record_enqueued(stream)
+        return SubmissionAccepted(job_id=payload["job_id"], status="queued")
+
+    def _route(self, spec: ProblemSpec) -> tuple[str, str]:
+        return self._route_profile(spec.execution_profile)
+
+    def _check_capacity(self, stream: str, group: str, *, incoming: int) -> None:
+        if self.queue_maxlen <= 0:
+            return
+        if self.backlog_estimator.admits(stream, incoming, self.queue_maxlen):
+            return
+        try:
+            stream_backlog = self.queue.backlog(stream, group)
+        except Exception as exc:
+            raise QueueUnavailableError("Judge queue unavailable") from exc
+        self.backlog_estimator.observe(stream, stream_backlog)
+        if stream_backlog + incoming > self.queue_maxlen:
+            raise QueueFullError("Judge queue is full. Please retry.")
+
+    def _create_job(
+        self,
+        *,
+        spec: ProblemSpec,
+        operation: JobOperation,
+        code: str,
+        cases_json: str | None,
+        created_at: int,
+    ) -> dict[str, Any]:
         job_id = self.job_id_factory()
-        created_at = self.now_factory()
+        profile = spec.execution_profile
         self.results.create_job(job_id, spec.problem_id, profile, operation, created_at=created_at)
 
-        payload = {
+        payload: dict[str, Any] = {
             "job_id": job_id,
             "problem_id": spec.problem_id,
             "profile": profile,
@@ -168,14 +364,7 @@ class SubmissionService:
         }
         if cases_json is not None:
             payload["cases_json"] = cases_json
-
-        try:
-            self.queue.enqueue(stream, payload)
-        except Exception as exc:
-            self._persist_enqueue_failure(job_id=job_id, stream=stream)
-            raise QueueUnavailableError("Judge queue unavailable") from exc
-
-        return SubmissionAccepted(job_id=job_id, status="queued")
+        return payload
 
     def _resolve_problem_spec(self, problem_id: str) -> ProblemSpec:
         try:
@@ -206,7 +395,7 @@ class SubmissionService:
             )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class WorkerJob:
     job_id: str
     problem_id: str
@@ -215,7 +404,7 @@ class WorkerJob:
     cases_payload: list[dict[str, Any]] | None = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class WorkerExecutionOutcome:
     executed: bool
     status: str
@@ -362,4 +551,7 @@ def _serialize_compiled_cases(cases: list[CompiledTestCase]) -> str:
         }
         for case in cases
     ]
+    if _orjson is not None:
+        # Same compact, non-ASCII-escaping output as the json fallback below.
+        return _orjson.dumps(payload).decode("utf-8")
     return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
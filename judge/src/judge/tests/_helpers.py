@@ -0,0 +1,56 @@
+"""Shared fixtures for the services test modules."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from judge.models import JobOperation
+from judge.services import WorkerJob
+
+PROBLEM_ID = "sample/01-basics/01-add"
+ADD_CODE = "def add(a, b):\n    return a + b\n"
+BAD_CODE = "def add(a, b):\n    raise RuntimeError('bad')\n"
+
+# Runner results are built per call, so a service or store that mutates one cannot
+# leak state into another test.
+def accepted_result() -> dict[str, Any]:
+    return {
+        "status": "Accepted",
+        "summary": {
+            "total": 2,
+            "passed": 2,
+            "failed": 0,
+        },
+        "tests": [],
+        "error": None,
+    }
+
+
+def runtime_error_result() -> dict[str, Any]:
+    return {
+        "status": "Runtime Error",
+        "summary": {
+            "total": 2,
+            "passed": 0,
+            "failed": 2,
+        },
+        "tests": [],
+        "error": "Line 2: RuntimeError: bad",
+        "error_kind": "user",
+    }
+
+
+def make_job(
+    job_id: str,
+    *,
+    operation: JobOperation = "submit",
+    code: str = ADD_CODE,
+    cases_payload: list[dict[str, Any]] | None = None,
+) -> WorkerJob:
+    return WorkerJob(
+        job_id=job_id,
+        problem_id=PROBLEM_ID,
+        operation=operation,
+        code=code,
+        cases_payload=cases_payload,
+    )
@@ -6,18 +6,16 @@ import importlib.util
 import tempfile
 from pathlib import Path
 from types import SimpleNamespace
-from unittest import TestCase
+from unittest import TestCase, skipUnless
 from unittest.mock import Mock
 
 HAS_FASTAPI = importlib.util.find_spec("fastapi") is not None
 HAS_HTTPX = importlib.util.find_spec("httpx") is not None
 
 
+@skipUnless(HAS_FASTAPI and HAS_HTTPX, "fastapi/httpx dependencies not installed")
 class ReadinessEndpointTests(TestCase):
     def setUp(self) -> None:
-        if not HAS_FASTAPI or not HAS_HTTPX:
-            self.skipTest("fastapi/httpx dependencies not installed")
-
         from fastapi.testclient import TestClient
 
         from judge.api import ApiDependencies, create_app
@@ -152,3 +150,57 @@ class ReadinessEndpointTests(TestCase):
         body = response.json()
         self.assertEqual(body.get("status"), "not_ready")
         self.assertEqual(body["checks"]["problems"], {"ok": False, "detail": "empty"})
+
+    def test_problem_scan_finds_nested_file_and_caches_positive_result(self) -> None:
+        from judge.api import _ProblemsScan
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            (root / "a" / "empty").mkdir(parents=True)
+            problems_scan = _ProblemsScan()
+            self.assertFalse(problems_scan(root))
+
+            self._problems_with_canonical_files(root)
+            self.assertTrue(problems_scan(root))
+
+            (root / "sample" / "01-basics" / "01-add" / "problem.json").unlink()
+            self.assertTrue(problems_scan(root))
+            self.assertFalse(_ProblemsScan()(root))
+
+    def test_cached_problem_scan_is_not_shared_between_apps(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            problems = self._problems_with_canonical_files(root)
+            first = self._build_client(
+                queue=self._healthy_queue(),
+                results=self._healthy_results(),
+                problems=problems,
+            )
+            self.assertEqual(first.get("/ready").status_code, 200)
+
+            (root / "sample" / "01-basics" / "01-add" / "problem.json").unlink()
+            second = self._build_client(
+                queue=self._healthy_queue(),
+                results=self._healthy_results(),
+                problems=problems,
+            )
+            response = second.get("/ready")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["checks"]["problems"], {"ok": False, "detail": "empty"})
+
+    def test_ready_pings_dependencies_at_most_once_per_ttl(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            queue = self._healthy_queue()
+            results = self._healthy_results()
+            client = self._build_client(
+                queue=queue,
+                results=results,
+                problems=self._problems_with_canonical_files(Path(tmp_dir)),
+            )
+
+            responses = [client.get("/ready") for _ in range(3)]
+
+        self.assertEqual([response.status_code for response in responses], [200, 200, 200])
+        queue.client.ping.assert_called_once_with()
+        results.ping.assert_called_once_with()
@@ -3,17 +3,16 @@
 from __future__ import annotations
 
 import importlib.util
-from unittest import TestCase
+from unittest import TestCase, skipUnless
 
 HAS_FASTAPI = importlib.util.find_spec("fastapi") is not None
 
 _INTERNAL_ERROR_MSG = "Internal judge error. Please retry."
 
 
+@skipUnless(HAS_FASTAPI, "fastapi dependency not installed")
 class ApiResultContractTests(TestCase):
     def setUp(self) -> None:
-        if not HAS_FASTAPI:
-            self.skipTest("fastapi dependency not installed")
         from judge.api import _sanitize_job
 
         self.sanitize_job = _sanitize_job
@@ -5,18 +5,16 @@ from __future__ import annotations
 import importlib.util
 import json
 from types import SimpleNamespace
-from unittest import TestCase
+from unittest import TestCase, skipUnless
 from unittest.mock import Mock
 
 HAS_FASTAPI = importlib.util.find_spec("fastapi") is not None
 HAS_HTTPX = importlib.util.find_spec("httpx") is not None
 
 
+@skipUnless(HAS_FASTAPI and HAS_HTTPX, "fastapi/httpx dependencies not installed")
 class RunEndpointTests(TestCase):
     def setUp(self) -> None:
-        if not HAS_FASTAPI or not HAS_HTTPX:
-            self.skipTest("fastapi/httpx dependencies not installed")
-
         from fastapi.testclient import TestClient
 
         from judge.api import ApiDependencies, create_app
@@ -2,154 +2,190 @@
 
 from __future__ import annotations
 
+import asyncio
 import importlib.util
 from types import SimpleNamespace
-from unittest import TestCase
-from unittest.mock import Mock
+from typing import Any
+from unittest import IsolatedAsyncioTestCase, skipUnless
+
+from judge.problems import ArgumentSpec, Comparison, ProblemSpec
+from judge.services import DEFAULT_STREAM_ROUTING, BacklogEstimator, SubmissionService
 
 HAS_FASTAPI = importlib.util.find_spec("fastapi") is not None
 HAS_HTTPX = importlib.util.find_spec("httpx") is not None
 
-
-class SubmitQueueCapacityTests(TestCase):
-    def setUp(self) -> None:
-        if not HAS_FASTAPI or not HAS_HTTPX:
-            self.skipTest("fastapi/httpx dependencies not installed")
-
-        from fastapi.testclient import TestClient
-
-        from judge.api import ApiDependencies, create_app
-        from judge.problems import ArgumentSpec, Comparison, ProblemSpec
-        from judge.services import DEFAULT_STREAM_ROUTING, SubmissionService
-
-        self.TestClient = TestClient
-        self.ApiDependencies = ApiDependencies
-        self.create_app = create_app
-        self.ArgumentSpec = ArgumentSpec
-        self.Comparison = Comparison
-        self.ProblemSpec = ProblemSpec
-        self.DEFAULT_STREAM_ROUTING = DEFAULT_STREAM_ROUTING
-        self.SubmissionService = SubmissionService
-
-    def _problem(self) -> object:
-        return self.ProblemSpec(
-            problem_id="sample/01-basics/01-add",
-            arguments=(self.ArgumentSpec("a"), self.ArgumentSpec("b")),
-            runner="add(a, b)",
-            execution_profile="light",
-            comparison=self.Comparison(type="exact"),
-            time_limit_s=10,
-            memory_mb=1024,
-        )
-
-    def _build_client(
+if HAS_FASTAPI and HAS_HTTPX:
+    import httpx
+
+    from judge.api import ApiDependencies, create_app
+
+_PROBLEM = ProblemSpec(
+    problem_id="sample/01-basics/01-add",
+    arguments=(ArgumentSpec("a"), ArgumentSpec("b")),
+    runner="add(a, b)",
+    execution_profile="light",
+    comparison=Comparison(type="exact"),
+    time_limit_s=10,
+    memory_mb=1024,
+)
+_SUBMIT_BODY = {
+    "problem_id": "sample/01-basics/01-add",
+    "code": "def add(a, b):\n    return a + b\n",
+}
+
+# (scenario, queue_maxlen, queue backlog or error, status code, 503 detail or None when queued)
+_CAPACITY_CASES: tuple[tuple[str, int, int | Exception, int, str | None], ...] = (
+    ("rejects when queue is full", 10000, 10000, 503, "Judge queue is full. Please retry."),
+    (
+        "rejects when queue length check fails",
+        10000,
+        RuntimeError("redis unavailable"),
+        503,
+        "Judge queue unavailable",
+    ),
+    ("skips capacity check when limit disabled", 0, 0, 200, None),
+)
+
+
+class _QueueStub:
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self, *, backlog: int | Exception = 0) -> None:
+        self.backlog_result = backlog
+        self.backlog_calls: list[tuple[str, str]] = []
+        self.enqueued: list[tuple[str, dict[str, Any]]] = []
+
+    def backlog(self, stream: str, group: str) -> int:
+        self.backlog_calls.append((stream, group))
+        if isinstance(self.backlog_result, Exception):
+            raise self.backlog_result
+        return self.backlog_result
+
+    def enqueue(self, stream: str, payload: dict[str, Any]) -> str:
+        self.enqueued.append((stream, dict(payload)))
+        return "1-0"
+
+    def enqueue_pipeline(self, entries: list[tuple[str, dict[str, Any]]]) -> list[str]:
+        return [self.enqueue(stream, payload) for stream, payload in entries]
+
+
+class _ResultsStub:
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.created_job_ids: list[str] = []
+        self.mark_error_calls: list[tuple[str, str, str | None]] = []
+
+    def create_job(
         self,
-        *,
-        queue_maxlen: int,
-        queue: Mock,
-        results: Mock,
-        problems: Mock,
-    ):
-        submission = self.SubmissionService(
-            queue=queue,
-            results=results,
-            problems=problems,
-            queue_maxlen=queue_maxlen,
-            stream_routing=self.DEFAULT_STREAM_ROUTING,
-        )
-        dependencies = self.ApiDependencies(
-            settings=SimpleNamespace(allowed_origins=[], queue_maxlen=queue_maxlen),
-            queue=queue,
-            results=results,
-            problems=problems,
-            submission=submission,
-            stream_routing=self.DEFAULT_STREAM_ROUTING,
-        )
-        app = self.create_app(dependencies)
-        return self.TestClient(app)
-
-    def test_submit_rejects_when_queue_is_full(self) -> None:
-        queue = Mock()
-        queue.backlog.return_value = 10000
-        problems = Mock()
-        problems.get_problem_spec.return_value = self._problem()
-        results = Mock()
-
-        client = self._build_client(
-            queue_maxlen=10000,
-            queue=queue,
-            results=results,
-            problems=problems,
-        )
-
-        response = client.post(
-            "/submit",
-            json={
-                "problem_id": "sample/01-basics/01-add",
-                "code": "def add(a, b):\n    return a + b\n",
-            },
-        )
-
-        self.assertEqual(response.status_code, 503)
-        self.assertEqual(response.json().get("detail"), "Judge queue is full. Please retry.")
-        queue.backlog.assert_called_once_with("queue:light", "workers-light")
-        results.create_job.assert_not_called()
-        queue.enqueue.assert_not_called()
-
-    def test_submit_rejects_when_queue_length_check_fails(self) -> None:
-        queue = Mock()
-        queue.backlog.side_effect = RuntimeError("redis unavailable")
-        problems = Mock()
-        problems.get_problem_spec.return_value = self._problem()
-        results = Mock()
-
-        client = self._build_client(
-            queue_maxlen=10000,
-            queue=queue,
-            results=results,
-            problems=problems,
-        )
-
-        response = client.post(
-            "/submit",
-            json={
-                "problem_id": "sample/01-basics/01-add",
-                "code": "def add(a, b):\n    return a + b\n",
-            },
-        )
-
-        self.assertEqual(response.status_code, 503)
-        self.assertEqual(response.json().get("detail"), "Judge queue unavailable")
-        queue.backlog.assert_called_once_with("queue:light", "workers-light")
-        results.create_job.assert_not_called()
-        queue.enqueue.assert_not_called()
-
-    def test_submit_skips_capacity_check_when_limit_disabled(self) -> None:
-        queue = Mock()
-        queue.enqueue.return_value = "1-0"
-        problems = Mock()
-        problems.get_problem_spec.return_value = self._problem()
-        results = Mock()
-
-        client = self._build_client(
+        job_id: str,
+        problem_id: str,
+        profile: str,
+        operation: str,
+        created_at: int | None = None,
+    ) -> None:
+        self.created_job_ids.append(job_id)
+
+    def mark_error(
+        self,
+        job_id: str,
+        error: str,
+        result: dict[str, Any] | None = None,
+        error_kind: str | None = None,
+    ) -> bool:
+        self.mark_error_calls.append((job_id, error, error_kind))
+        return True
+
+
+class _ProblemsStub:
+    compiler = None
+
+    def get_problem_spec(self, problem_id: str) -> ProblemSpec:
+        return _PROBLEM
+
+
+@skipUnless(HAS_FASTAPI and HAS_HTTPX, "fastapi/httpx dependencies not installed")
+class SubmitQueueCapacityTests(IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        # One app serves the whole class; scenarios reset the shared stubs and
+        # the submission service's capacity limit.
+        cls.queue = _QueueStub()
+        cls.results = _ResultsStub()
+        cls.problems = _ProblemsStub()
+        cls.submission = SubmissionService(
+            queue=cls.queue,
+            results=cls.results,
+            problems=cls.problems,
             queue_maxlen=0,
-            queue=queue,
-            results=results,
-            problems=problems,
+            stream_routing=DEFAULT_STREAM_ROUTING,
         )
-
-        response = client.post(
-            "/submit",
-            json={
-                "problem_id": "sample/01-basics/01-add",
-                "code": "def add(a, b):\n    return a + b\n",
-            },
+        dependencies = ApiDependencies(
+            settings=SimpleNamespace(allowed_origins=[], queue_maxlen=0),
+            queue=cls.queue,
+            results=cls.results,
+            problems=cls.problems,
+            submission=cls.submission,
+            stream_routing=DEFAULT_STREAM_ROUTING,
+        )
+        cls.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=create_app(dependencies)),
+            base_url="http://test",
         )
 
-        self.assertEqual(response.status_code, 200)
-        payload = response.json()
-        self.assertEqual(payload.get("status"), "queued")
-        self.assertTrue(payload.get("job_id"))
-        queue.backlog.assert_not_called()
-        results.create_job.assert_called_once()
-        queue.enqueue.assert_called_once()
+    @classmethod
+    def tearDownClass(cls) -> None:
+        asyncio.run(cls.client.aclose())
+
+    def _reset(self, *, queue_maxlen: int, backlog: int | Exception) -> None:
+        self.queue.reset(backlog=backlog)
+        self.results.reset()
+        self.submission.queue_maxlen = queue_maxlen
+        self.submission.backlog_estimator = BacklogEstimator()
+
+    async def _submit(self):
+        return await self.client.post("/submit", json=_SUBMIT_BODY)
+
+    async def test_submit_capacity_scenarios(self) -> None:
+        for name, queue_maxlen, backlog, status_code, detail in _CAPACITY_CASES:
+            with self.subTest(name):
+                self._reset(queue_maxlen=queue_maxlen, backlog=backlog)
+
+                response = await self._submit()
+
+                self.assertEqual(response.status_code, status_code)
+                if detail is not None:
+                    self.assertEqual(response.json().get("detail"), detail)
+                    self.assertEqual(self.queue.backlog_calls, [("queue:light", "workers-light")])
+                    self.assertEqual(self.results.created_job_ids, [])
+                    self.assertEqual(self.queue.enqueued, [])
+                else:
+                    payload = response.json()
+                    self.assertEqual(payload.get("status"), "queued")
+                    self.assertTrue(payload.get("job_id"))
+                    self.assertEqual(self.queue.backlog_calls, [])
+                    self.assertEqual(self.results.created_job_ids, [payload["job_id"]])
+                    self.assertEqual([stream for stream, _ in self.queue.enqueued], ["queue:light"])
+
+    async def test_submit_batch_checks_capacity_once_for_the_whole_batch(self) -> None:
+        body = {"submissions": [_SUBMIT_BODY, _SUBMIT_BODY, _SUBMIT_BODY]}
+
+        self._reset(queue_maxlen=10000, backlog=9998)
+        rejected = await self.client.post("/submit/batch", json=body)
+
+        self.assertEqual(rejected.status_code, 503)
+        self.assertEqual(rejected.json().get("detail"), "Judge queue is full. Please retry.")
+        self.assertEqual(self.queue.backlog_calls, [("queue:light", "workers-light")])
+        self.assertEqual(self.queue.enqueued, [])
+
+        self._reset(queue_maxlen=10000, backlog=0)
+        accepted = await self.client.post("/submit/batch", json=body)
+
+        self.assertEqual(accepted.status_code, 200)
+        payload = accepted.json()
+        self.assertEqual([item["status"] for item in payload], ["queued"] * 3)
+        self.assertEqual(self.results.created_job_ids, [item["job_id"] for item in payload])
+        self.assertEqual(self.queue.backlog_calls, [("queue:light", "workers-light")])
+        self.assertEqual(len(self.queue.enqueued), 3)
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import os
 import sqlite3
 import tempfile
 from pathlib import Path
@@ -9,25 +10,27 @@ from unittest import TestCase
 
 from judge.backup import _copy_db
 
+# Keep scratch databases in RAM when the host offers a writable tmpfs.
+_TMP_ROOT = "/dev/shm" if os.access("/dev/shm", os.W_OK) else None
+
 
 class BackupTests(TestCase):
     def test_copy_db_fails_for_missing_source(self) -> None:
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            src = Path(tmp_dir) / "missing.db"
-            dest = Path(tmp_dir) / "backup.db"
-
-            with self.assertRaises(FileNotFoundError):
-                _copy_db(src, dest)
+        with self.assertRaises(FileNotFoundError):
+            _copy_db(Path("/nonexistent/missing.db"), Path("/nonexistent/backup.db"))
 
     def test_copy_db_creates_valid_copy(self) -> None:
-        with tempfile.TemporaryDirectory() as tmp_dir:
+        with tempfile.TemporaryDirectory(dir=_TMP_ROOT) as tmp_dir:
             src = Path(tmp_dir) / "source.db"
             dest = Path(tmp_dir) / "backup.db"
 
-            with sqlite3.connect(src) as conn:
+            conn = sqlite3.connect(src, isolation_level=None)
+            try:
+                conn.execute("PRAGMA journal_mode=MEMORY")
                 conn.execute("CREATE TABLE jobs (id TEXT PRIMARY KEY)")
                 conn.execute("INSERT INTO jobs (id) VALUES ('job-1')")
-                conn.commit()
+            finally:
+                conn.close()
 
             _copy_db(src, dest)
 
@@ -8,53 +8,74 @@ from unittest.mock import patch
 
 from judge.config import load_settings
 
+_EXPECTED_DEFAULTS: dict[str, object] = {
+    "torch_execution_mode": "warm_fork",
+    "warm_fork_enable_no_new_privs": True,
+    "warm_fork_enable_seccomp": True,
+    "warm_fork_seccomp_fail_closed": True,
+    "warm_fork_clear_env": True,
+    "warm_fork_deny_filesystem": True,
+    "warm_fork_allow_root": False,
+    "warm_fork_child_nofile": 64,
+    "warm_fork_enable_cgroup": True,
+    "warm_fork_max_jobs": 0,
+}
+
+# env var -> (raw value, expected Settings attribute, expected parsed value)
+_EXPLICIT_WARM_FORK_SETTINGS: tuple[tuple[str, str, str, object], ...] = (
+    ("JUDGE_TORCH_EXECUTION_MODE", "warm_fork", "torch_execution_mode", "warm_fork"),
+    ("JUDGE_WARM_FORK_ENABLE_NO_NEW_PRIVS", "0", "warm_fork_enable_no_new_privs", False),
+    ("JUDGE_WARM_FORK_ENABLE_SECCOMP", "0", "warm_fork_enable_seccomp", False),
+    ("JUDGE_WARM_FORK_SECCOMP_FAIL_CLOSED", "0", "warm_fork_seccomp_fail_closed", False),
+    ("JUDGE_WARM_FORK_CLEAR_ENV", "0", "warm_fork_clear_env", False),
+    ("JUDGE_WARM_FORK_DENY_FILESYSTEM", "0", "warm_fork_deny_filesystem", False),
+    ("JUDGE_WARM_FORK_ALLOW_ROOT", "1", "warm_fork_allow_root", True),
+    ("JUDGE_WARM_FORK_CHILD_NOFILE", "128", "warm_fork_child_nofile", 128),
+    ("JUDGE_WARM_FORK_ENABLE_CGROUP", "0", "warm_fork_enable_cgroup", False),
+    ("JUDGE_WARM_FORK_MAX_JOBS", "500", "warm_fork_max_jobs", 500),
+)
+
+_REJECTED_ENVIRONMENTS: tuple[tuple[dict[str, str], str], ...] = (
+    (
+        {"JUDGE_TORCH_EXECUTION_MODE": "fork_magic"},
+        "JUDGE_TORCH_EXECUTION_MODE must be one of: isolate, warm_fork",
+    ),
+    (
+        {"JUDGE_WARM_FORK_CHILD_NOFILE": "8"},
+        "JUDGE_WARM_FORK_CHILD_NOFILE must be >= 16",
+    ),
+    (
+        {
+            "JUDGE_WARM_FORK_ENABLE_SECCOMP": "1",
+            "JUDGE_WARM_FORK_ENABLE_NO_NEW_PRIVS": "0",
+        },
+        "JUDGE_WARM_FORK_ENABLE_NO_NEW_PRIVS must be enabled when JUDGE_WARM_FORK_ENABLE_SECCOMP=1",
+    ),
+)
+
 
 class WarmForkSettingsTests(TestCase):
+    def _assert_settings(self, settings: object, expected: dict[str, object]) -> None:
+        for name, value in expected.items():
+            with self.subTest(setting=name):
+                self.assertEqual(getattr(settings, name), value)
+
     def test_defaults_use_warm_fork_mode(self) -> None:
         with patch.dict(os.environ, {}, clear=True):
             settings = load_settings()
 
-        self.assertEqual(settings.torch_execution_mode, "warm_fork")
         self.assertEqual(settings.problems_root.name, "current")
-        self.assertTrue(settings.warm_fork_enable_no_new_privs)
-        self.assertTrue(settings.warm_fork_enable_seccomp)
-        self.assertTrue(settings.warm_fork_seccomp_fail_closed)
-        self.assertTrue(settings.warm_fork_clear_env)
-        self.assertTrue(settings.warm_fork_deny_filesystem)
-        self.assertFalse(settings.warm_fork_allow_root)
-        self.assertEqual(settings.warm_fork_child_nofile, 64)
-        self.assertTrue(settings.warm_fork_enable_cgroup)
-        self.assertEqual(settings.warm_fork_max_jobs, 0)
+        self._assert_settings(settings, _EXPECTED_DEFAULTS)
 
     def test_explicit_warm_fork_settings_parse(self) -> None:
-        with patch.dict(
-            os.environ,
-            {
-                "JUDGE_TORCH_EXECUTION_MODE": "warm_fork",
-                "JUDGE_WARM_FORK_ENABLE_NO_NEW_PRIVS": "0",
-                "JUDGE_WARM_FORK_ENABLE_SECCOMP": "0",
-                "JUDGE_WARM_FORK_SECCOMP_FAIL_CLOSED": "0",
-                "JUDGE_WARM_FORK_CLEAR_ENV": "0",
-                "JUDGE_WARM_FORK_DENY_FILESYSTEM": "0",
-                "JUDGE_WARM_FORK_ALLOW_ROOT": "1",
-                "JUDGE_WARM_FORK_CHILD_NOFILE": "128",
-                "JUDGE_WARM_FORK_ENABLE_CGROUP": "0",
-                "JUDGE_WARM_FORK_MAX_JOBS": "500",
-            },
-            clear=True,
-        ):
+        env = {key: raw for key, raw, _, _ in _EXPLICIT_WARM_FORK_SETTINGS}
+        with patch.dict(os.environ, env, clear=True):
             settings = load_settings()
 
-        self.assertEqual(settings.torch_execution_mode, "warm_fork")
-        self.assertFalse(settings.warm_fork_enable_no_new_privs)
-        self.assertFalse(settings.warm_fork_enable_seccomp)
-        self.assertFalse(settings.warm_fork_seccomp_fail_closed)
-        self.assertFalse(settings.warm_fork_clear_env)
-        self.assertFalse(settings.warm_fork_deny_filesystem)
-        self.assertTrue(settings.warm_fork_allow_root)
-        self.assertEqual(settings.warm_fork_child_nofile, 128)
-        self.assertFalse(settings.warm_fork_enable_cgroup)
-        self.assertEqual(settings.warm_fork_max_jobs, 500)
+        self._assert_settings(
+            settings,
+            {name: value for _, _, name, value in _EXPLICIT_WARM_FORK_SETTINGS},
+        )
 
     def test_explicit_isolate_mode_is_supported(self) -> None:
         with patch.dict(
@@ -66,41 +87,8 @@ class WarmForkSettingsTests(TestCase):
 
         self.assertEqual(settings.torch_execution_mode, "isolate")
 
-    def test_invalid_torch_execution_mode_is_rejected(self) -> None:
-        with patch.dict(
-            os.environ,
-            {"JUDGE_TORCH_EXECUTION_MODE": "fork_magic"},
-            clear=True,
-        ):
-            with self.assertRaisesRegex(
-                ValueError,
-                "JUDGE_TORCH_EXECUTION_MODE must be one of: isolate, warm_fork",
-            ):
-                load_settings()
-
-    def test_invalid_warm_fork_nofile_limit_is_rejected(self) -> None:
-        with patch.dict(
-            os.environ,
-            {"JUDGE_WARM_FORK_CHILD_NOFILE": "8"},
-            clear=True,
-        ):
-            with self.assertRaisesRegex(
-                ValueError,
-                "JUDGE_WARM_FORK_CHILD_NOFILE must be >= 16",
-            ):
-                load_settings()
-
-    def test_seccomp_requires_no_new_privs(self) -> None:
-        with patch.dict(
-            os.environ,
-            {
-                "JUDGE_WARM_FORK_ENABLE_SECCOMP": "1",
-                "JUDGE_WARM_FORK_ENABLE_NO_NEW_PRIVS": "0",
-            },
-            clear=True,
-        ):
-            with self.assertRaisesRegex(
-                ValueError,
-                "JUDGE_WARM_FORK_ENABLE_NO_NEW_PRIVS must be enabled when JUDGE_WARM_FORK_ENABLE_SECCOMP=1",
-            ):
-                load_settings()
+    def test_invalid_settings_are_rejected(self) -> None:
+        for env, message in _REJECTED_ENVIRONMENTS:
+            with self.subTest(env=env), patch.dict(os.environ, env, clear=True):
+                with self.assertRaisesRegex(ValueError, message):
+                    load_settings()
@@ -2,10 +2,17 @@
 
 from __future__ import annotations
 
+import os
 import re
 from pathlib import Path
 from unittest import TestCase
 
+# Env keys read by runtime code; bytes so source files are scanned undecoded.
+_RUNTIME_KEY_RE = re.compile(
+    rb'(?:os\.getenv|os\.environ\.get|_env_int)\(\s*"(JUDGE_[A-Z0-9_]+)"'
+)
+_ENV_LINE_RE = re.compile(r"^([A-Z0-9_]+)=", re.MULTILINE)
+
 
 class DeployEnvExampleContractTests(TestCase):
     def test_runtime_and_deploy_keys_exist_in_env_example(self) -> None:
@@ -16,21 +23,14 @@ class DeployEnvExampleContractTests(TestCase):
         env_example_text = env_example_path.read_text()
 
         runtime_keys: set[str] = set()
-        patterns = (
-            r'os\.getenv\("([A-Z0-9_]+)"',
-            r'os\.environ\.get\("([A-Z0-9_]+)"',
-            r'_env_int\("([A-Z0-9_]+)"',
-        )
-        for path in src_root.rglob("*.py"):
-            if "tests" in path.parts:
-                continue
-            text = path.read_text()
-            for pattern in patterns:
-                runtime_keys.update(
-                    key
-                    for key in re.findall(pattern, text)
-                    if key.startswith("JUDGE_")
-                )
+        for root, dirs, files in os.walk(src_root):
+            if "tests" in dirs:
+                dirs.remove("tests")
+            for name in files:
+                if not name.endswith(".py"):
+                    continue
+                data = Path(root, name).read_bytes()
+                runtime_keys.update(key.decode("ascii") for key in _RUNTIME_KEY_RE.findall(data))
 
         deploy_keys = {
             "JUDGE_API_WORKERS",
@@ -39,7 +39,7 @@ class DeployEnvExampleContractTests(TestCase):
         }
 
         expected_keys = runtime_keys | deploy_keys
-        example_keys = set(re.findall(r"^([A-Z0-9_]+)=", env_example_text, flags=re.MULTILINE))
+        example_keys = set(_ENV_LINE_RE.findall(env_example_text))
         missing = sorted(expected_keys - example_keys)
 
         self.assertFalse(
@@ -2,11 +2,11 @@
 
 from __future__ import annotations
 
+import asyncio
 import importlib.util
-import tempfile
-from pathlib import Path
+import json
 from types import SimpleNamespace
-from unittest import TestCase
+from unittest import IsolatedAsyncioTestCase, skipUnless
 
 from judge.problems import (
     ArgumentSpec,
@@ -24,9 +24,38 @@ from judge.services import (
     WorkerJob,
 )
 
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
 HAS_FASTAPI = importlib.util.find_spec("fastapi") is not None
 HAS_HTTPX = importlib.util.find_spec("httpx") is not None
 
+if HAS_FASTAPI and HAS_HTTPX:
+    import httpx
+
+    from judge.api import ApiDependencies, create_app
+
+
+def _json_bytes(value: object) -> bytes:
+    return _orjson.dumps(value) if _orjson is not None else json.dumps(value).encode("utf-8")
+
+
+# Submit bodies are serialized once and posted as raw content.
+_JSON_HEADERS = {"content-type": "application/json"}
+_SUBMIT_OK_BODY = _json_bytes(
+    {
+        "problem_id": "sample/01-basics/01-add",
+        "code": "def add(a, b):\n    return a + b\n",
+    }
+)
+_SUBMIT_USER_ERROR_BODY = _json_bytes(
+    {
+        "problem_id": "sample/01-basics/01-add",
+        "code": "def add(a, b):\n    raise RuntimeError('bad')\n",
+    }
+)
 
 class _InMemoryQueue:
     def __init__(self) -> None:
@@ -45,12 +74,9 @@ class _ProblemRepositoryStub:
     def __init__(self, problem_id: str) -> None:
         self.problem_id = problem_id
         self.compiler = TestCaseCompiler()
-
-    def get_problem_spec(self, problem_id: str) -> ProblemSpec:
-        if problem_id != self.problem_id:
-            raise FileNotFoundError(problem_id)
-        return ProblemSpec(
-            problem_id=self.problem_id,
+        # Built once; the spec and cases are frozen dataclasses and callers only read them.
+        self._spec = ProblemSpec(
+            problem_id=problem_id,
             arguments=(ArgumentSpec("a"), ArgumentSpec("b")),
             runner="add(a, b)",
             execution_profile="light",
@@ -58,22 +84,14 @@ class _ProblemRepositoryStub:
             time_limit_s=5,
             memory_mb=1024,
         )
-
-    def get_compiled_public_cases(self, problem_id: str) -> list[CompiledTestCase]:
-        if problem_id != self.problem_id:
-            raise FileNotFoundError(problem_id)
-        return [
+        self._public_cases = [
             CompiledTestCase(
                 id="case-public",
                 input_code="a = 1\nb = 2\n",
                 expected_literal="3",
             )
         ]
-
-    def get_hidden_cases(self, problem_id: str) -> list[CompiledTestCase]:
-        if problem_id != self.problem_id:
-            raise FileNotFoundError(problem_id)
-        return [
+        self._hidden_cases = [
             CompiledTestCase(
                 id="case-hidden",
                 input_code="a = 5\nb = 6\n",
@@ -81,153 +99,151 @@ class _ProblemRepositoryStub:
             )
         ]
 
+    def get_problem_spec(self, problem_id: str) -> ProblemSpec:
+        if problem_id != self.problem_id:
+            raise FileNotFoundError(problem_id)
+        return self._spec
 
-class EndToEndSubmitResultFlowTests(TestCase):
-    def setUp(self) -> None:
-        if not HAS_FASTAPI or not HAS_HTTPX:
-            self.skipTest("fastapi/httpx dependencies not installed")
-
-        from fastapi.testclient import TestClient
+    def get_compiled_public_cases(self, problem_id: str) -> list[CompiledTestCase]:
+        if problem_id != self.problem_id:
+            raise FileNotFoundError(problem_id)
+        return self._public_cases
 
-        from judge.api import ApiDependencies, create_app
+    def get_hidden_cases(self, problem_id: str) -> list[CompiledTestCase]:
+        if problem_id != self.problem_id:
+            raise FileNotFoundError(problem_id)
+        return self._hidden_cases
 
-        self.TestClient = TestClient
-        self.ApiDependencies = ApiDependencies
-        self.create_app = create_app
 
-    def _build_client(self, *, queue: _InMemoryQueue, store: ResultsStore, problems: _ProblemRepositoryStub):
+@skipUnless(HAS_FASTAPI and HAS_HTTPX, "fastapi/httpx dependencies not installed")
+class EndToEndSubmitResultFlowTests(IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        # One store and app serve the whole class; tearDown empties the jobs table.
+        cls.queue = _InMemoryQueue()
+        cls.store = ResultsStore.in_memory()
+        cls.problems = _ProblemRepositoryStub("sample/01-basics/01-add")
         submission = SubmissionService(
-            queue=queue,
-            results=store,
-            problems=problems,
+            queue=cls.queue,
+            results=cls.store,
+            problems=cls.problems,
             queue_maxlen=100,
             stream_routing=DEFAULT_STREAM_ROUTING,
         )
-        dependencies = self.ApiDependencies(
+        dependencies = ApiDependencies(
             settings=SimpleNamespace(allowed_origins=[], queue_maxlen=100),
-            queue=queue,
-            results=store,
-            problems=problems,
+            queue=cls.queue,
+            results=cls.store,
+            problems=cls.problems,
             submission=submission,
             stream_routing=DEFAULT_STREAM_ROUTING,
         )
-        app = self.create_app(dependencies)
-        return self.TestClient(app)
-
-    def test_submit_then_worker_done_then_result_endpoint(self) -> None:
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            queue = _InMemoryQueue()
-            store = ResultsStore(Path(tmp_dir) / "judge.db")
-            problems = _ProblemRepositoryStub("sample/01-basics/01-add")
-            client = self._build_client(queue=queue, store=store, problems=problems)
-
-            submit_response = client.post(
-                "/submit",
-                json={
-                    "problem_id": "sample/01-basics/01-add",
-                    "code": "def add(a, b):\n    return a + b\n",
-                },
-            )
+        # Tests only swap the execution-plan function; the isolate config is invariant.
+        cls.execution = WorkerExecutionService(
+            results=cls.store,
+            problems=cls.problems,
+            isolate=IsolateConfig(executable="/usr/bin/isolate", box_id=1),
+            max_output_chars=2000,
+        )
+        cls.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=create_app(dependencies)),
+            base_url="http://test",
+        )
 
-            self.assertEqual(submit_response.status_code, 200)
-            job_id = submit_response.json().get("job_id")
-            self.assertTrue(job_id)
-            self.assertEqual(len(queue.enqueued), 1)
-
-            _, payload = queue.enqueued[0]
-
-            def _run_execution_plan_ok(*_args, **_kwargs):
-                return {
-                    "status": "Accepted",
-                    "summary": {
-                        "total": 2,
-                        "passed": 2,
-                        "failed": 0,
-                    },
-                    "tests": [],
-                    "error": None,
-                }
-
-            execution = WorkerExecutionService(
-                results=store,
-                problems=problems,
-                isolate=IsolateConfig(executable="/usr/bin/isolate", box_id=1),
-                max_output_chars=2000,
-                run_execution_plan_fn=_run_execution_plan_ok,
-            )
-            outcome = execution.execute(
-                WorkerJob(
-                    job_id=str(payload["job_id"]),
-                    problem_id=str(payload["problem_id"]),
-                    operation=str(payload["operation"]),
-                    code=str(payload["code"]),
-                )
-            )
-            self.assertEqual(outcome.status, "done")
-
-            result_response = client.get(f"/result/{job_id}")
-            self.assertEqual(result_response.status_code, 200)
-            result_payload = result_response.json()
-            self.assertEqual(result_payload.get("status"), "done")
-            self.assertEqual(result_payload.get("error_kind"), None)
-            self.assertEqual(result_payload.get("result", {}).get("status"), "Accepted")
-
-    def test_submit_then_worker_user_error_then_result_endpoint(self) -> None:
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            queue = _InMemoryQueue()
-            store = ResultsStore(Path(tmp_dir) / "judge.db")
-            problems = _ProblemRepositoryStub("sample/01-basics/01-add")
-            client = self._build_client(queue=queue, store=store, problems=problems)
-
-            submit_response = client.post(
-                "/submit",
-                json={
-                    "problem_id": "sample/01-basics/01-add",
-                    "code": "def add(a, b):\n    raise RuntimeError('bad')\n",
+    @classmethod
+    def tearDownClass(cls) -> None:
+        asyncio.run(cls.client.aclose())
+
+    def setUp(self) -> None:
+        self.queue.enqueued.clear()
+
+    def tearDown(self) -> None:
+        # Wipe rows rather than rebuilding the schema so each test starts from an empty store.
+        with self.store._connect() as conn:
+            conn.execute("DELETE FROM jobs")
+
+    async def test_submit_then_worker_done_then_result_endpoint(self) -> None:
+        submit_response = await self.client.post(
+            "/submit", content=_SUBMIT_OK_BODY, headers=_JSON_HEADERS
+        )
+
+        self.assertEqual(submit_response.status_code, 200)
+        job_id = submit_response.json().get("job_id")
+        self.assertTrue(job_id)
+        self.assertEqual(len(self.queue.enqueued), 1)
+
+        _, payload = self.queue.enqueued[0]
+
+        def _run_execution_plan_ok(*_args, **_kwargs):
+            return {
+                "status": "Accepted",
+                "summary": {
+                    "total": 2,
+                    "passed": 2,
+                    "failed": 0,
                 },
+                "tests": [],
+                "error": None,
+            }
+
+        self.execution.run_execution_plan_fn = _run_execution_plan_ok
+        outcome = self.execution.execute(
+            WorkerJob(
+                job_id=str(payload["job_id"]),
+                problem_id=str(payload["problem_id"]),
+                operation=str(payload["operation"]),
+                code=str(payload["code"]),
             )
+        )
+        self.assertEqual(outcome.status, "done")
+
+        result_response = await self.client.get(f"/result/{job_id}")
+        self.assertEqual(result_response.status_code, 200)
+        result_payload = result_response.json()
+        self.assertEqual(result_payload.get("status"), "done")
+        self.assertEqual(result_payload.get("error_kind"), None)
+        self.assertEqual(result_payload.get("result", {}).get("status"), "Accepted")
+
+    async def test_submit_then_worker_user_error_then_result_endpoint(self) -> None:
+        submit_response = await self.client.post(
+            "/submit", content=_SUBMIT_USER_ERROR_BODY, headers=_JSON_HEADERS
+        )
 
-            self.assertEqual(submit_response.status_code, 200)
-            job_id = submit_response.json().get("job_id")
-            self.assertTrue(job_id)
-            self.assertEqual(len(queue.enqueued), 1)
-
-            _, payload = queue.enqueued[0]
-
-            def _run_execution_plan_error(*_args, **_kwargs):
-                return {
-                    "status": "Runtime Error",
-                    "summary": {
-                        "total": 2,
-                        "passed": 0,
-                        "failed": 2,
-                    },
-                    "tests": [],
-                    "error": "Line 2: RuntimeError: bad",
-                    "error_kind": "user",
-                }
-
-            execution = WorkerExecutionService(
-                results=store,
-                problems=problems,
-                isolate=IsolateConfig(executable="/usr/bin/isolate", box_id=1),
-                max_output_chars=2000,
-                run_execution_plan_fn=_run_execution_plan_error,
-            )
-            outcome = execution.execute(
-                WorkerJob(
-                    job_id=str(payload["job_id"]),
-                    problem_id=str(payload["problem_id"]),
-                    operation=str(payload["operation"]),
-                    code=str(payload["code"]),
-                )
+        self.assertEqual(submit_response.status_code, 200)
+        job_id = submit_response.json().get("job_id")
+        self.assertTrue(job_id)
+        self.assertEqual(len(self.queue.enqueued), 1)
+
+        _, payload = self.queue.enqueued[0]
+
+        def _run_execution_plan_error(*_args, **_kwargs):
+            return {
+                "status": "Runtime Error",
+                "summary": {
+                    "total": 2,
+                    "passed": 0,
+                    "failed": 2,
+                },
+                "tests": [],
+                "error": "Line 2: RuntimeError: bad",
+                "error_kind": "user",
+            }
+
+        self.execution.run_execution_plan_fn = _run_execution_plan_error
+        outcome = self.execution.execute(
+            WorkerJob(
+                job_id=str(payload["job_id"]),
+                problem_id=str(payload["problem_id"]),
+                operation=str(payload["operation"]),
+                code=str(payload["code"]),
             )
-            self.assertEqual(outcome.status, "error")
-            self.assertEqual(outcome.error_kind, "user")
-
-            result_response = client.get(f"/result/{job_id}")
-            self.assertEqual(result_response.status_code, 200)
-            result_payload = result_response.json()
-            self.assertEqual(result_payload.get("status"), "error")
-            self.assertEqual(result_payload.get("error_kind"), "user")
-            self.assertEqual(result_payload.get("error"), "Line 2: RuntimeError: bad")
+        )
+        self.assertEqual(outcome.status, "error")
+        self.assertEqual(outcome.error_kind, "user")
+
+        result_response = await self.client.get(f"/result/{job_id}")
+        self.assertEqual(result_response.status_code, 200)
+        result_payload = result_response.json()
+        self.assertEqual(result_payload.get("status"), "error")
+        self.assertEqual(result_payload.get("error_kind"), "user")
+        self.assertEqual(result_payload.get("error"), "Line 2: RuntimeError: bad")
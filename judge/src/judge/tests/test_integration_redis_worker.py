@@ -2,338 +2,276 @@
 
 from __future__ import annotations
 
+import asyncio
 import importlib.util
+import json
 import os
 import tempfile
 import uuid
+from functools import singledispatch
 from pathlib import Path
 from types import SimpleNamespace
-from unittest import TestCase
+from unittest import IsolatedAsyncioTestCase, SkipTest, skipUnless
 from unittest.mock import Mock
 
+from judge.problems import ProblemRepository
+from judge.results import ResultsStore
+from judge.runner import IsolateConfig
 from judge.runtime_problem_corpus import build_runtime_problem_corpus
+from judge.services import StreamRouting, SubmissionService, WorkerExecutionService
+
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
 
 HAS_FASTAPI = importlib.util.find_spec("fastapi") is not None
 HAS_HTTPX = importlib.util.find_spec("httpx") is not None
 HAS_REDIS = importlib.util.find_spec("redis") is not None
 
+if HAS_FASTAPI and HAS_HTTPX and HAS_REDIS:
+    import httpx
+
+    from judge.api import ApiDependencies, create_app
+    from judge.queue import RedisQueue
+    from judge.worker import _process_queue_entry
+
+_JUDGE_ROOT = Path(__file__).resolve().parents[3]
+
+
+def _json_bytes(value: object) -> bytes:
+    return _orjson.dumps(value) if _orjson is not None else json.dumps(value).encode("utf-8")
+
+
+# The submit body is serialized once and posted as raw content by both tests.
+_JSON_HEADERS = {"content-type": "application/json"}
+_SUBMIT_BODY = _json_bytes(
+    {
+        "problem_id": "build-gpt/01-from-text-to-bytes/01-encoder",
+        "code": "def encode_string(text):\n    return list(text.encode('utf-8'))\n",
+    }
+)
+
+
+def _run_problem_ok(*_args, **_kwargs):
+    return {
+        "status": "Accepted",
+        "summary": {
+            "total": 1,
+            "passed": 1,
+            "failed": 0,
+        },
+        "tests": [],
+        "error": None,
+    }
+
+
+@singledispatch
+def _pending_count(pending_info: object) -> int:
+    return 0
+
+
+@_pending_count.register
+def _(pending_info: dict) -> int:
+    return int(pending_info.get("pending", 0))
+
 
-class RedisWorkerIntegrationTests(TestCase):
+@_pending_count.register(tuple)
+@_pending_count.register(list)
+def _(pending_info: tuple | list) -> int:
+    return int(pending_info[0]) if pending_info else 0
+
+
+@skipUnless(
+    HAS_FASTAPI and HAS_HTTPX and HAS_REDIS, "fastapi/httpx/redis dependencies not installed"
+)
+class RedisWorkerIntegrationTests(IsolatedAsyncioTestCase):
     @classmethod
     def setUpClass(cls) -> None:
         super().setUpClass()
+        # Probe Redis before building anything so an unreachable server skips cheaply.
+        redis_url = os.getenv("JUDGE_TEST_REDIS_URL", "redis://localhost:6379/15")
+        cls.queue = RedisQueue(redis_url)
+        skip_reason: str | None = None
+        try:
+            cls.queue.client.ping()
+        except Exception:
+            skip_reason = "redis server not reachable at JUDGE_TEST_REDIS_URL"
+        else:
+            db_index = int(cls.queue.client.connection_pool.connection_kwargs.get("db", 0))
+            if db_index == 0:
+                skip_reason = "set JUDGE_TEST_REDIS_URL to a dedicated non-zero Redis DB index"
+        if skip_reason is not None:
+            # tearDownClass does not run for a skipped class, so release the pool here.
+            cls.queue.client.close()
+            raise SkipTest(skip_reason)
+
         cls._runtime_problems_tmp = tempfile.TemporaryDirectory()
-        judge_root = Path(__file__).resolve().parents[3]
         cls._runtime_problems_root = Path(cls._runtime_problems_tmp.name) / "problems"
         build_runtime_problem_corpus(
-            source_root=judge_root / "problems",
+            source_root=_JUDGE_ROOT / "problems",
             output_root=cls._runtime_problems_root,
-            generator_script=judge_root / "scripts" / "generate_hidden_tests.py",
+            generator_script=_JUDGE_ROOT / "scripts" / "generate_hidden_tests.py",
+        )
+
+        # One app, store, and worker service serve the whole class. Every Redis key
+        # the tests touch carries this suffix, so cleanup deletes only those streams
+        # and concurrent runs against the same DB do not interfere.
+        suffix = uuid.uuid4().hex[:10]
+        cls.stream_light = f"queue:itest-light:{suffix}"
+        cls.group_light = f"workers-itest-light-{suffix}"
+        cls.stream_torch = f"queue:itest-torch:{suffix}"
+        routing = StreamRouting(
+            by_profile={
+                "light": cls.stream_light,
+                "torch": cls.stream_torch,
+            },
+            by_stream_group={
+                cls.stream_light: cls.group_light,
+                cls.stream_torch: f"workers-itest-torch-{suffix}",
+            },
+        )
+        problems = ProblemRepository(cls._runtime_problems_root)
+        cls.store = ResultsStore.in_memory()
+        submission = SubmissionService(
+            queue=cls.queue,
+            results=cls.store,
+            problems=problems,
+            queue_maxlen=100,
+            stream_routing=routing,
+        )
+        dependencies = ApiDependencies(
+            settings=SimpleNamespace(allowed_origins=[], queue_maxlen=100),
+            queue=cls.queue,
+            results=cls.store,
+            problems=problems,
+            submission=submission,
+            stream_routing=routing,
+        )
+        cls.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=create_app(dependencies)),
+            base_url="http://test",
+        )
+        cls.execution = WorkerExecutionService(
+            results=cls.store,
+            problems=problems,
+            isolate=IsolateConfig(executable="/usr/bin/isolate", box_id=1),
+            max_output_chars=2000,
+            run_execution_plan_fn=_run_problem_ok,
+            log=Mock(),
         )
 
     @classmethod
     def tearDownClass(cls) -> None:
+        asyncio.run(cls.client.aclose())
+        cls.queue.client.close()
         cls._runtime_problems_tmp.cleanup()
         super().tearDownClass()
 
     def setUp(self) -> None:
-        if not HAS_FASTAPI or not HAS_HTTPX or not HAS_REDIS:
-            self.skipTest("fastapi/httpx/redis dependencies not installed")
-
-        from fastapi.testclient import TestClient
-
-        from judge.api import ApiDependencies, create_app
-        from judge.problems import ProblemRepository
-        from judge.queue import RedisQueue
-        from judge.results import ResultsStore
-        from judge.runner import IsolateConfig
-        from judge.services import (
-            StreamRouting,
-            SubmissionService,
-            WorkerExecutionService,
+        # Deleting a stream also drops its consumer groups.
+        self.addCleanup(self.queue.client.delete, self.stream_light, self.stream_torch)
+        self.queue.ensure_group(self.stream_light, self.group_light)
+        self.execution.log.reset_mock()
+
+    def tearDown(self) -> None:
+        with self.store._connect() as conn:
+            conn.execute("DELETE FROM jobs")
+
+    def _stream_state(self) -> tuple[int, int]:
+        pipe = self.queue.client.pipeline(transaction=False)
+        pipe.xlen(self.stream_light)
+        pipe.xpending(self.stream_light, self.group_light)
+        length, pending_info = pipe.execute()
+        return int(length), _pending_count(pending_info)
+
+    def _process(self, *, consumer: str, msg_id: str, fields: dict[str, str]) -> None:
+        _process_queue_entry(
+            stream=self.stream_light,
+            group=self.group_light,
+            consumer=consumer,
+            worker_profile="light",
+            msg_id=msg_id,
+            fields=fields,
+            queue=self.queue,
+            results=self.store,
+            execution=self.execution,
         )
-        from judge.worker import _process_queue_entry
-
-        self.TestClient = TestClient
-        self.ApiDependencies = ApiDependencies
-        self.create_app = create_app
-        self.ProblemRepository = ProblemRepository
-        self.RedisQueue = RedisQueue
-        self.ResultsStore = ResultsStore
-        self.IsolateConfig = IsolateConfig
-        self.StreamRouting = StreamRouting
-        self.SubmissionService = SubmissionService
-        self.WorkerExecutionService = WorkerExecutionService
-        self.process_queue_entry = _process_queue_entry
-
-    def _pending_count(self, pending_info: object) -> int:
-        if isinstance(pending_info, dict):
-            return int(pending_info.get("pending", 0))
-        if isinstance(pending_info, tuple) and pending_info:
-            return int(pending_info[0])
-        if isinstance(pending_info, list) and pending_info:
-            return int(pending_info[0])
-        return 0
-
-    def _redis_url(self) -> str:
-        return os.getenv("JUDGE_TEST_REDIS_URL", "redis://localhost:6379/15")
-
-    def test_submit_process_once_and_result_done(self) -> None:
-        redis_url = self._redis_url()
-        queue = self.RedisQueue(redis_url)
-        try:
-            queue.client.ping()
-        except Exception:
-            self.skipTest("redis server not reachable at JUDGE_TEST_REDIS_URL")
-        db_index = int(queue.client.connection_pool.connection_kwargs.get("db", 0))
-        if db_index == 0:
-            self.skipTest("set JUDGE_TEST_REDIS_URL to a dedicated non-zero Redis DB index")
-        queue.client.flushdb()
-        self.addCleanup(queue.client.flushdb)
 
-        suffix = uuid.uuid4().hex[:10]
-        stream_light = f"queue:itest-light:{suffix}"
-        stream_torch = f"queue:itest-torch:{suffix}"
-        group_light = f"workers-itest-light-{suffix}"
-        group_torch = f"workers-itest-torch-{suffix}"
-        routing = self.StreamRouting(
-            by_profile={
-                "light": stream_light,
-                "torch": stream_torch,
-            },
-            by_stream_group={
-                stream_light: group_light,
-                stream_torch: group_torch,
-            },
+    async def test_submit_process_once_and_result_done(self) -> None:
+        queue = self.queue
+
+        submit_response = await self.client.post(
+            "/submit", content=_SUBMIT_BODY, headers=_JSON_HEADERS
         )
+        self.assertEqual(submit_response.status_code, 200)
+        job_id = submit_response.json().get("job_id")
+        self.assertTrue(job_id)
 
-        problems = self.ProblemRepository(self._runtime_problems_root)
-
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            store = self.ResultsStore(Path(tmp_dir) / "judge.db")
-            submission = self.SubmissionService(
-                queue=queue,
-                results=store,
-                problems=problems,
-                queue_maxlen=100,
-                stream_routing=routing,
-            )
-            dependencies = self.ApiDependencies(
-                settings=SimpleNamespace(allowed_origins=[], queue_maxlen=100),
-                queue=queue,
-                results=store,
-                problems=problems,
-                submission=submission,
-                stream_routing=routing,
-            )
-            app = self.create_app(dependencies)
-            client = self.TestClient(app)
-
-            queue.ensure_group(stream_light, group_light)
-
-            submit_response = client.post(
-                "/submit",
-                json={
-                    "problem_id": "build-gpt/01-from-text-to-bytes/01-encoder",
-                    "code": "def encode_string(text):\n    return list(text.encode('utf-8'))\n",
-                },
-            )
-            self.assertEqual(submit_response.status_code, 200)
-            job_id = submit_response.json().get("job_id")
-            self.assertTrue(job_id)
-
-            queued_result = client.get(f"/result/{job_id}")
-            self.assertEqual(queued_result.status_code, 200)
-            self.assertEqual(queued_result.json().get("status"), "queued")
-
-            entry = queue.read(stream_light, group_light, "itest-1", block_ms=200)
-            self.assertIsNotNone(entry)
-            assert entry is not None
-            msg_id, fields = entry
-            self.assertEqual(int(queue.client.xlen(stream_light)), 1)
-            self.assertEqual(
-                self._pending_count(queue.client.xpending(stream_light, group_light)),
-                1,
-            )
-
-            def _run_problem_ok(*_args, **_kwargs):
-                return {
-                    "status": "Accepted",
-                    "summary": {
-                        "total": 1,
-                        "passed": 1,
-                        "failed": 0,
-                    },
-                    "tests": [],
-                    "error": None,
-                }
-
-            execution = self.WorkerExecutionService(
-                results=store,
-                problems=problems,
-                isolate=self.IsolateConfig(executable="/usr/bin/isolate", box_id=1),
-                max_output_chars=2000,
-                run_execution_plan_fn=_run_problem_ok,
-                log=Mock(),
-            )
-
-            self.process_queue_entry(
-                stream=stream_light,
-                group=group_light,
-                consumer="itest-1",
-                worker_profile="light",
-                msg_id=msg_id,
-                fields=fields,
-                queue=queue,
-                results=store,
-                execution=execution,
-            )
-
-            result_response = client.get(f"/result/{job_id}")
-            self.assertEqual(result_response.status_code, 200)
-            payload = result_response.json()
-            self.assertEqual(payload.get("status"), "done")
-            self.assertEqual(payload.get("error_kind"), None)
-            self.assertEqual(payload.get("result", {}).get("status"), "Accepted")
-
-            # Processed message must be acked and removed from stream.
-            self.assertEqual(int(queue.client.xlen(stream_light)), 0)
-            self.assertEqual(
-                self._pending_count(queue.client.xpending(stream_light, group_light)),
-                0,
-            )
-
-    def test_reclaim_then_process_results_in_single_terminal_completion(self) -> None:
-        redis_url = self._redis_url()
-        queue = self.RedisQueue(redis_url)
-        try:
-            queue.client.ping()
-        except Exception:
-            self.skipTest("redis server not reachable at JUDGE_TEST_REDIS_URL")
-        db_index = int(queue.client.connection_pool.connection_kwargs.get("db", 0))
-        if db_index == 0:
-            self.skipTest("set JUDGE_TEST_REDIS_URL to a dedicated non-zero Redis DB index")
-        queue.client.flushdb()
-        self.addCleanup(queue.client.flushdb)
+        queued_result = await self.client.get(f"/result/{job_id}")
+        self.assertEqual(queued_result.status_code, 200)
+        self.assertEqual(queued_result.json().get("status"), "queued")
 
-        suffix = uuid.uuid4().hex[:10]
-        stream_light = f"queue:itest-light:{suffix}"
-        stream_torch = f"queue:itest-torch:{suffix}"
-        group_light = f"workers-itest-light-{suffix}"
-        group_torch = f"workers-itest-torch-{suffix}"
-        routing = self.StreamRouting(
-            by_profile={
-                "light": stream_light,
-                "torch": stream_torch,
-            },
-            by_stream_group={
-                stream_light: group_light,
-                stream_torch: group_torch,
-            },
+        entry = queue.read(self.stream_light, self.group_light, "itest-1", block_ms=200)
+        self.assertIsNotNone(entry)
+        assert entry is not None
+        msg_id, fields = entry
+        self.assertEqual(self._stream_state(), (1, 1))
+
+        self._process(consumer="itest-1", msg_id=msg_id, fields=fields)
+
+        result_response = await self.client.get(f"/result/{job_id}")
+        self.assertEqual(result_response.status_code, 200)
+        payload = result_response.json()
+        self.assertEqual(payload.get("status"), "done")
+        self.assertEqual(payload.get("error_kind"), None)
+        self.assertEqual(payload.get("result", {}).get("status"), "Accepted")
+
+        # Processed message must be acked and removed from stream.
+        self.assertEqual(self._stream_state(), (0, 0))
+
+    async def test_reclaim_then_process_results_in_single_terminal_completion(self) -> None:
+        queue = self.queue
+
+        submit_response = await self.client.post(
+            "/submit", content=_SUBMIT_BODY, headers=_JSON_HEADERS
+        )
+        self.assertEqual(submit_response.status_code, 200)
+        job_id = submit_response.json().get("job_id")
+        self.assertTrue(job_id)
+
+        first_read = queue.read(self.stream_light, self.group_light, "itest-crashed", block_ms=200)
+        self.assertIsNotNone(first_read)
+        assert first_read is not None
+        first_msg_id, _ = first_read
+        self.assertEqual(self._stream_state(), (1, 1))
+
+        reclaimed = queue.autoclaim(
+            self.stream_light,
+            self.group_light,
+            "itest-reclaimer",
+            min_idle_ms=0,
+            count=10,
         )
+        self.assertEqual(len(reclaimed), 1)
+        reclaimed_msg_id, reclaimed_fields = reclaimed[0]
+        self.assertEqual(reclaimed_msg_id, first_msg_id)
+
+        self._process(
+            consumer="itest-reclaimer",
+            msg_id=reclaimed_msg_id,
+            fields=reclaimed_fields,
+        )
+
+        result_response = await self.client.get(f"/result/{job_id}")
+        self.assertEqual(result_response.status_code, 200)
+        payload = result_response.json()
+        self.assertEqual(payload.get("status"), "done")
+        self.assertEqual(payload.get("error_kind"), None)
+        self.assertEqual(payload.get("result", {}).get("status"), "Accepted")
+
+        job_row = self.store.get_job(job_id)
+        assert job_row is not None
+        self.assertEqual(job_row.get("attempts"), 1)
 
-        problems = self.ProblemRepository(self._runtime_problems_root)
-
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            store = self.ResultsStore(Path(tmp_dir) / "judge.db")
-            submission = self.SubmissionService(
-                queue=queue,
-                results=store,
-                problems=problems,
-                queue_maxlen=100,
-                stream_routing=routing,
-            )
-            dependencies = self.ApiDependencies(
-                settings=SimpleNamespace(allowed_origins=[], queue_maxlen=100),
-                queue=queue,
-                results=store,
-                problems=problems,
-                submission=submission,
-                stream_routing=routing,
-            )
-            app = self.create_app(dependencies)
-            client = self.TestClient(app)
-
-            queue.ensure_group(stream_light, group_light)
-
-            submit_response = client.post(
-                "/submit",
-                json={
-                    "problem_id": "build-gpt/01-from-text-to-bytes/01-encoder",
-                    "code": "def encode_string(text):\n    return list(text.encode('utf-8'))\n",
-                },
-            )
-            self.assertEqual(submit_response.status_code, 200)
-            job_id = submit_response.json().get("job_id")
-            self.assertTrue(job_id)
-
-            first_read = queue.read(stream_light, group_light, "itest-crashed", block_ms=200)
-            self.assertIsNotNone(first_read)
-            assert first_read is not None
-            first_msg_id, _ = first_read
-            self.assertEqual(int(queue.client.xlen(stream_light)), 1)
-            self.assertEqual(
-                self._pending_count(queue.client.xpending(stream_light, group_light)),
-                1,
-            )
-
-            reclaimed = queue.autoclaim(
-                stream_light,
-                group_light,
-                "itest-reclaimer",
-                min_idle_ms=0,
-                count=10,
-            )
-            self.assertEqual(len(reclaimed), 1)
-            reclaimed_msg_id, reclaimed_fields = reclaimed[0]
-            self.assertEqual(reclaimed_msg_id, first_msg_id)
-
-            def _run_problem_ok(*_args, **_kwargs):
-                return {
-                    "status": "Accepted",
-                    "summary": {
-                        "total": 1,
-                        "passed": 1,
-                        "failed": 0,
-                    },
-                    "tests": [],
-                    "error": None,
-                }
-
-            execution = self.WorkerExecutionService(
-                results=store,
-                problems=problems,
-                isolate=self.IsolateConfig(executable="/usr/bin/isolate", box_id=1),
-                max_output_chars=2000,
-                run_execution_plan_fn=_run_problem_ok,
-                log=Mock(),
-            )
-
-            self.process_queue_entry(
-                stream=stream_light,
-                group=group_light,
-                consumer="itest-reclaimer",
-                worker_profile="light",
-                msg_id=reclaimed_msg_id,
-                fields=reclaimed_fields,
-                queue=queue,
-                results=store,
-                execution=execution,
-            )
-
-            result_response = client.get(f"/result/{job_id}")
-            self.assertEqual(result_response.status_code, 200)
-            payload = result_response.json()
-            self.assertEqual(payload.get("status"), "done")
-            self.assertEqual(payload.get("error_kind"), None)
-            self.assertEqual(payload.get("result", {}).get("status"), "Accepted")
-
-            job_row = store.get_job(job_id)
-            assert job_row is not None
-            self.assertEqual(job_row.get("attempts"), 1)
-
-            self.assertEqual(int(queue.client.xlen(stream_light)), 0)
-            self.assertEqual(
-                self._pending_count(queue.client.xpending(stream_light, group_light)),
-                0,
-            )
+        self.assertEqual(self._stream_state(), (0, 0))
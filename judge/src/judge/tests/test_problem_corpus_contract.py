@@ -7,11 +7,12 @@ from unittest import TestCase
 
 from judge.problem_contracts import ProblemCorpusKind, validate_problem_contracts
 
+_PROBLEMS_ROOT = Path(__file__).resolve().parents[3] / "problems"
+
 
 class ProblemCorpusContractTests(TestCase):
     def test_source_problem_corpus_contracts_are_valid(self) -> None:
-        problems_root = Path(__file__).resolve().parents[3] / "problems"
-        issues = validate_problem_contracts(problems_root, kind=ProblemCorpusKind.SOURCE)
+        issues = validate_problem_contracts(_PROBLEMS_ROOT, kind=ProblemCorpusKind.SOURCE)
         if issues:
             rendered = "\n".join(issue.render() for issue in issues[:20])
             if len(issues) > 20:
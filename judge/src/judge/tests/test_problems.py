@@ -500,3 +500,48 @@ class ProblemRepositoryCachingTests(TestCase):
         self.assertEqual([case.id for case in first], ["p1"])
         self.assertEqual([case.id for case in second], ["p1"])
         self.assertEqual(compiler.compile_calls, 1)
+
+    def test_repository_reports_missing_files_and_reloads_on_request(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            problem_dir = root / "sample/01-basics/01-add"
+            problem_dir.mkdir(parents=True)
+            (problem_dir / "problem.json").write_text(
+                """{
+  "schema_version": 1,
+  "arguments": [{"name": "a"}, {"name": "b"}],
+  "runner": "add(a, b)",
+  "execution_profile": "light",
+  "comparison": {"type": "exact"},
+  "time_limit_s": 5,
+  "memory_mb": 512
+}"""
+            )
+            repo = ProblemRepository(root)
+
+            with self.assertRaisesRegex(FileNotFoundError, "public_cases.json"):
+                repo.get_problem_spec("sample/01-basics/01-add")
+            with self.assertRaisesRegex(FileNotFoundError, "problem.json"):
+                repo.get_problem_spec("sample/01-basics/01-add/problem.json")
+
+            (problem_dir / "public_cases.json").write_text('{"schema_version": 1, "cases": []}')
+            (problem_dir / "hidden_tests.json").write_text('{"schema_version": 1, "cases": []}')
+            first = repo.get_problem_spec("sample/01-basics/01-add")
+            self.assertIs(repo.get_problem_spec("sample/01-basics/01-add"), first)
+
+            repo.reload()
+            reloaded = repo.get_problem_spec("sample/01-basics/01-add")
+
+        self.assertEqual(reloaded, first)
+        self.assertIsNot(reloaded, first)
+
+    def test_get_problem_spec_names_the_missing_problem_file(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            problem_dir = root / "sample/01-basics/01-add"
+            problem_dir.mkdir(parents=True)
+            (problem_dir / "problem.json").write_text("{}")
+            repo = ProblemRepository(root)
+
+            with self.assertRaisesRegex(FileNotFoundError, "public_cases.json"):
+                repo.get_problem_spec("sample/01-basics/01-add")
@@ -18,7 +18,7 @@ class RedisQueueEnqueueValidationTests(TestCase):
 
         from judge.queue import RedisQueue
 
-        self.queue = RedisQueue("redis://localhost:6379/0")
+        self.queue = RedisQueue.from_client(Mock())
         self.queue.client.xadd = Mock(return_value="1-0")
         self.queue.client.xack = Mock(return_value=1)
         self.queue.client.xdel = Mock(return_value=1)
@@ -97,13 +97,91 @@ class RedisQueueEnqueueValidationTests(TestCase):
 
         self.queue.client.xadd.assert_not_called()
 
-    def test_ack_and_delete_calls_both_redis_operations(self) -> None:
+    def test_enqueue_pipeline_sends_all_entries_in_one_execute(self) -> None:
+        pipe = Mock()
+        pipe.execute.return_value = ["1-0", "2-0"]
+        self.queue.client.pipeline = Mock(return_value=pipe)
+        second = {**self._payload(), "job_id": "job-2"}
+
+        outcomes = self.queue.enqueue_pipeline(
+            [("queue:light", self._payload()), ("queue:torch", second)]
+        )
+
+        self.assertEqual(outcomes, ["1-0", "2-0"])
+        self.queue.client.pipeline.assert_called_once_with(transaction=False)
+        self.assertEqual(pipe.xadd.call_count, 2)
+        self.assertEqual(pipe.xadd.call_args_list[1].args[0], "queue:torch")
+        self.assertEqual(pipe.xadd.call_args_list[1].args[1]["job_id"], "job-2")
+        pipe.execute.assert_called_once_with(raise_on_error=False)
+        self.queue.client.xadd.assert_not_called()
+
+    def test_enqueue_pipeline_validates_before_sending(self) -> None:
+        self.queue.client.pipeline = Mock()
+        invalid = {**self._payload(), "operation": "bogus"}
+
+        with self.assertRaisesRegex(ValueError, "operation"):
+            self.queue.enqueue_pipeline(
+                [("queue:light", self._payload()), ("queue:light", invalid)]
+            )
+
+        self.queue.client.pipeline.assert_not_called()
+
+    def test_read_many_returns_every_claimed_entry(self) -> None:
+        self.queue.client.xreadgroup = Mock(
+            return_value=[("queue:light", [("1-0", {"job_id": "a"}), ("2-0", {"job_id": "b"})])]
+        )
+
+        entries = self.queue.read_many("queue:light", "workers-light", "c-1", count=16)
+
+        self.assertEqual(entries, [("1-0", {"job_id": "a"}), ("2-0", {"job_id": "b"})])
+        self.queue.client.xreadgroup.assert_called_once_with(
+            "workers-light",
+            "c-1",
+            streams={"queue:light": ">"},
+            count=16,
+            block=5000,
+        )
+
+    def test_read_returns_none_when_nothing_is_claimed(self) -> None:
+        self.queue.client.xreadgroup = Mock(return_value=[])
+
+        self.assertIsNone(self.queue.read("queue:light", "workers-light", "c-1"))
+
+    def test_ack_and_delete_pipelines_both_redis_operations(self) -> None:
+        pipe = Mock()
+        pipe.execute.return_value = [1, 1]
+        self.queue.client.pipeline = Mock(return_value=pipe)
+
         acked, deleted = self.queue.ack_and_delete("queue:light", "workers-light", "1-0")
 
         self.assertEqual(acked, 1)
         self.assertEqual(deleted, 1)
-        self.queue.client.xack.assert_called_once_with("queue:light", "workers-light", "1-0")
-        self.queue.client.xdel.assert_called_once_with("queue:light", "1-0")
+        self.queue.client.pipeline.assert_called_once_with(transaction=False)
+        pipe.xack.assert_called_once_with("queue:light", "workers-light", "1-0")
+        pipe.xdel.assert_called_once_with("queue:light", "1-0")
+        pipe.execute.assert_called_once_with()
+        self.queue.client.xack.assert_not_called()
+        self.queue.client.xdel.assert_not_called()
+
+    def test_ack_and_delete_many_batches_ids(self) -> None:
+        pipe = Mock()
+        pipe.execute.return_value = [3, 2]
+        self.queue.client.pipeline = Mock(return_value=pipe)
+
+        acked, deleted = self.queue.ack_and_delete_many(
+            "queue:light", "workers-light", ["1-0", "1-1", "1-2"]
+        )
+
+        self.assertEqual((acked, deleted), (3, 2))
+        pipe.xack.assert_called_once_with("queue:light", "workers-light", "1-0", "1-1", "1-2")
+        pipe.xdel.assert_called_once_with("queue:light", "1-0", "1-1", "1-2")
+        pipe.execute.assert_called_once_with()
+
+    def test_ack_and_delete_many_skips_empty_batch(self) -> None:
+        self.queue.client.pipeline = Mock()
+
+        self.assertEqual(self.queue.ack_and_delete_many("queue:light", "workers-light", []), (0, 0))
+        self.queue.client.pipeline.assert_not_called()
 
     def test_backlog_reads_pending_plus_lag(self) -> None:
         backlog = self.queue.backlog("queue:light", "workers-light")
@@ -117,3 +195,44 @@ class RedisQueueEnqueueValidationTests(TestCase):
         backlog = self.queue.backlog("queue:light", "workers-light")
 
         self.assertEqual(backlog, 0)
+
+
+class RedisQueueConnectionPoolTests(TestCase):
+    def setUp(self) -> None:
+        if not HAS_REDIS:
+            self.skipTest("redis dependency not installed")
+
+    def test_max_connections_uses_bounded_blocking_pool(self) -> None:
+        import redis
+
+        from judge.queue import RedisQueue
+
+        queue = RedisQueue(
+            "redis://localhost:6379/0",
+            max_connections=4,
+            client_name="judge-api-test",
+        )
+
+        pool = queue.client.connection_pool
+        self.assertIsInstance(pool, redis.BlockingConnectionPool)
+        self.assertEqual(pool.max_connections, 4)
+        self.assertEqual(pool.connection_kwargs["client_name"], "judge-api-test")
+        self.assertTrue(pool.connection_kwargs["decode_responses"])
+
+    def test_default_pool_is_unbounded(self) -> None:
+        import redis
+
+        from judge.queue import RedisQueue
+
+        queue = RedisQueue("redis://localhost:6379/0")
+
+        self.assertNotIsInstance(queue.client.connection_pool, redis.BlockingConnectionPool)
+
+    def test_from_client_wraps_existing_client(self) -> None:
+        from judge.queue import RedisQueue
+
+        client = Mock()
+
+        queue = RedisQueue.from_client(client)
+
+        self.assertIs(queue.client, client)
@@ -2,8 +2,7 @@
 
 from __future__ import annotations
 
-import tempfile
-from pathlib import Path
+import threading
 from unittest import TestCase
 
 from judge.results import ResultsStore
@@ -11,25 +10,23 @@ from judge.results import ResultsStore
 
 class ResultsStoreTests(TestCase):
     def test_mark_error_preserves_empty_result_object(self) -> None:
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            db_path = Path(tmp_dir) / "judge.db"
-            store = ResultsStore(db_path)
-            store.create_job(
-                job_id="job-1",
-                problem_id="sample/01-basics/01-add",
-                profile="light",
-                operation="submit",
-                created_at=1700000000,
-            )
-
-            store.mark_error(
-                "job-1",
-                "failed",
-                result={},
-                error_kind="internal",
-            )
-
-            job = store.get_job("job-1")
+        store = ResultsStore.in_memory()
+        store.create_job(
+            job_id="job-1",
+            problem_id="sample/01-basics/01-add",
+            profile="light",
+            operation="submit",
+            created_at=1700000000,
+        )
+
+        store.mark_error(
+            "job-1",
+            "failed",
+            result={},
+            error_kind="internal",
+        )
+
+        job = store.get_job("job-1")
 
         self.assertIsNotNone(job)
         assert job is not None
@@ -37,9 +34,24 @@ class ResultsStoreTests(TestCase):
         self.assertEqual(job["status"], "error")
 
     def test_ping_executes_simple_query(self) -> None:
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            db_path = Path(tmp_dir) / "judge.db"
-            store = ResultsStore(db_path)
+        store = ResultsStore.in_memory()
 
-            # Should not raise for a healthy sqlite connection.
-            store.ping()
+        # Should not raise for a healthy sqlite connection.
+        store.ping()
+
+    def test_in_memory_store_is_shared_across_threads_but_not_stores(self) -> None:
+        store = ResultsStore.in_memory()
+        other = ResultsStore.in_memory()
+
+        writer = threading.Thread(
+            target=store.create_job,
+            args=("job-1", "sample/01-basics/01-add", "light", "submit"),
+        )
+        writer.start()
+        writer.join()
+
+        job = store.get_job("job-1")
+        self.assertIsNotNone(job)
+        assert job is not None
+        self.assertEqual(job["status"], "queued")
+        self.assertIsNone(other.get_job("job-1"))
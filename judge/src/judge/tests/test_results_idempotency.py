@@ -2,8 +2,6 @@
 
 from __future__ import annotations
 
-import tempfile
-from pathlib import Path
 from unittest import TestCase
 
 from judge.results import ResultsStore
@@ -11,32 +9,30 @@ from judge.results import ResultsStore
 
 class ResultsStoreIdempotencyTests(TestCase):
     def test_terminal_done_job_is_not_overwritten(self) -> None:
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            db_path = Path(tmp_dir) / "judge.db"
-            store = ResultsStore(db_path)
-            store.create_job(
-                job_id="job-1",
-                problem_id="sample/01-basics/01-add",
-                profile="light",
-                operation="submit",
-                created_at=1700000000,
+        store = ResultsStore.in_memory()
+        store.create_job(
+            job_id="job-1",
+            problem_id="sample/01-basics/01-add",
+            profile="light",
+            operation="submit",
+            created_at=1700000000,
+        )
+
+        self.assertTrue(store.mark_running("job-1"))
+        self.assertTrue(store.mark_done("job-1", {"status": "Accepted"}))
+
+        # Duplicate reclaim should not transition a terminal row again.
+        self.assertFalse(store.mark_running("job-1"))
+        self.assertFalse(
+            store.mark_error(
+                "job-1",
+                "late worker error",
+                {"status": "Runtime Error"},
+                error_kind="internal",
             )
+        )
 
-            self.assertTrue(store.mark_running("job-1"))
-            self.assertTrue(store.mark_done("job-1", {"status": "Accepted"}))
-
-            # Duplicate reclaim should not transition a terminal row again.
-            self.assertFalse(store.mark_running("job-1"))
-            self.assertFalse(
-                store.mark_error(
-                    "job-1",
-                    "late worker error",
-                    {"status": "Runtime Error"},
-                    error_kind="internal",
-                )
-            )
-
-            job = store.get_job("job-1")
+        job = store.get_job("job-1")
 
         self.assertIsNotNone(job)
         assert job is not None
@@ -45,22 +41,20 @@ class ResultsStoreIdempotencyTests(TestCase):
         self.assertEqual(job["attempts"], 1)
 
     def test_reclaimed_running_job_can_continue(self) -> None:
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            db_path = Path(tmp_dir) / "judge.db"
-            store = ResultsStore(db_path)
-            store.create_job(
-                job_id="job-2",
-                problem_id="sample/01-basics/01-add",
-                profile="light",
-                operation="submit",
-                created_at=1700000000,
-            )
+        store = ResultsStore.in_memory()
+        store.create_job(
+            job_id="job-2",
+            problem_id="sample/01-basics/01-add",
+            profile="light",
+            operation="submit",
+            created_at=1700000000,
+        )
 
-            self.assertTrue(store.mark_running("job-2"))
-            self.assertTrue(store.mark_running("job-2"))
-            self.assertTrue(store.mark_done("job-2", {"status": "Accepted"}))
+        self.assertTrue(store.mark_running("job-2"))
+        self.assertTrue(store.mark_running("job-2"))
+        self.assertTrue(store.mark_done("job-2", {"status": "Accepted"}))
 
-            job = store.get_job("job-2")
+        job = store.get_job("job-2")
 
         self.assertIsNotNone(job)
         assert job is not None
@@ -68,29 +62,45 @@ class ResultsStoreIdempotencyTests(TestCase):
         self.assertEqual(job["attempts"], 2)
 
     def test_mark_error_allows_enqueue_failure_path(self) -> None:
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            db_path = Path(tmp_dir) / "judge.db"
-            store = ResultsStore(db_path)
-            store.create_job(
-                job_id="job-3",
-                problem_id="sample/01-basics/01-add",
-                profile="light",
-                operation="submit",
-                created_at=1700000000,
+        store = ResultsStore.in_memory()
+        store.create_job(
+            job_id="job-3",
+            problem_id="sample/01-basics/01-add",
+            profile="light",
+            operation="submit",
+            created_at=1700000000,
+        )
+
+        self.assertTrue(
+            store.mark_error(
+                "job-3",
+                "Failed to enqueue job",
+                error_kind="internal",
             )
+        )
+        self.assertFalse(store.mark_done("job-3", {"status": "Accepted"}))
 
-            self.assertTrue(
-                store.mark_error(
-                    "job-3",
-                    "Failed to enqueue job",
-                    error_kind="internal",
-                )
-            )
-            self.assertFalse(store.mark_done("job-3", {"status": "Accepted"}))
-
-            job = store.get_job("job-3")
+        job = store.get_job("job-3")
 
         self.assertIsNotNone(job)
         assert job is not None
         self.assertEqual(job["status"], "error")
         self.assertEqual(job["error"], "Failed to enqueue job")
+
+    def test_finalize_done_requires_running_job(self) -> None:
+        store = ResultsStore.in_memory()
+        store.create_job(
+            job_id="job-1",
+            problem_id="sample/01-basics/01-add",
+            profile="light",
+            operation="submit",
+            created_at=1700000000,
+        )
+
+        self.assertFalse(store.finalize("job-1", "done", {"status": "Accepted"}))
+        self.assertTrue(store.mark_running("job-1"))
+        self.assertTrue(store.finalize("job-1", "done", {"status": "Accepted"}))
+        self.assertEqual(store.get_job("job-1")["status"], "done")
+
+        with self.assertRaises(ValueError):
+            store.finalize("job-1", "running", None)
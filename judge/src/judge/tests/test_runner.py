@@ -3,13 +3,52 @@
 from __future__ import annotations
 
 import json
+import multiprocessing
+import multiprocessing.connection
+import os
 import subprocess
 import sys
 import tempfile
+import threading
+import time
+from dataclasses import replace
 from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
 from unittest import TestCase
+from unittest.mock import Mock, patch
 
-from judge.runner import HARNESS_CODE
+from judge.harness import _compile_solution, run_batch, run_cases
+from judge.problems import Comparison, CompiledTestCase, ExecutionPlan
+from judge.runner import (
+    HARNESS_CODE,
+    IsolateConfig,
+    _build_success_response,
+    _encode_harness_batch_input,
+    _encode_harness_input,
+    _ensure_harness_file,
+    _run_harness_in_isolate,
+    _run_in_isolate,
+    prewarm_isolate_box,
+    run_execution_plan,
+    run_execution_plan_batch,
+)
+
+
+def _plan(*, time_limit_s: int = 1) -> ExecutionPlan:
+    return ExecutionPlan(
+        problem_id="sample/01-basics/01-add",
+        runner="add(a, b)",
+        execution_profile="light",
+        comparison=Comparison(type="exact"),
+        time_limit_s=time_limit_s,
+        memory_mb=256,
+        cases=(
+            CompiledTestCase(id="case1", input_code="a = 1\nb = 2\n", expected_literal="3"),
+            CompiledTestCase(id="case2", input_code="a = 2\nb = 2\n", expected_literal="4"),
+        ),
+        detail_mode="all",
+    )
 
 
 class RunnerHarnessTests(TestCase):
@@ -89,3 +128,545 @@ class RunnerHarnessTests(TestCase):
         self.assertEqual(case.get("expected"), "3")
         self.assertIn("NameError", case.get("stderr", ""))
         self.assertIn("missing_name", case.get("stderr", ""))
+
+    def test_harness_runtime_error_shows_user_source_line(self) -> None:
+        case = self._run_harness_case(
+            main_code="def add(a, b):\n    total = a / b\n    return total\n",
+            input_code="a = 1\nb = 0\n",
+        )
+
+        self.assertEqual(case.get("status"), "Runtime Error")
+        self.assertIn("Line 2, in add:\n    total = a / b", case.get("stderr", ""))
+        self.assertIn("ZeroDivisionError", case.get("stderr", ""))
+
+    def test_harness_reads_user_code_and_config_from_stdin(self) -> None:
+        config = {
+            "runner": "add(a, b)",
+            "comparison": {"type": "exact"},
+            "execution_profile": "light",
+            "cases": [{"id": "case1", "input_code": "a = 1\nb = 2\n", "expected_literal": "3"}],
+        }
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            harness_path = Path(tmp_dir) / "harness.py"
+            harness_path.write_text(HARNESS_CODE)
+
+            result = subprocess.run(
+                [sys.executable, str(harness_path), "--stdin"],
+                cwd=tmp_dir,
+                input=_encode_harness_input("def add(a, b):\n    return a + b\n", config),
+                capture_output=True,
+                check=False,
+            )
+
+        self.assertEqual(result.returncode, 0)
+        payload = json.loads(result.stdout)
+        self.assertEqual(payload[0]["status"], "Accepted")
+
+
+class _SlowStartProcess:
+    """Stands in for a harness child whose start-up takes longer than the time limit."""
+
+    start_delay_s = 1.5
+
+    def __init__(self, *, target: Any, args: tuple[Any, ...], daemon: bool) -> None:
+        conn, *rest = args
+        # The parent closes its end after start(), as it would for a real child.
+        self._args = (multiprocessing.connection.Connection(os.dup(conn.fileno())), *rest)
+        self._target = target
+        self._thread = threading.Thread(target=self._run, daemon=daemon)
+        self.exitcode: int | None = None
+
+    def _run(self) -> None:
+        time.sleep(self.start_delay_s)
+        self._target(*self._args)
+        self.exitcode = 0
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def join(self) -> None:
+        self._thread.join()
+
+    def kill(self) -> None:
+        pass
+
+
+class UnsandboxedRunnerTests(TestCase):
+    def test_run_without_isolate_executes_in_forked_harness(self) -> None:
+        result = run_execution_plan(
+            _plan(),
+            "def add(a, b):\n    print('hi')\n    return a + b\n",
+            max_output_chars=2000,
+        )
+
+        self.assertEqual(result["status"], "Accepted")
+        self.assertEqual(result["summary"], {"total": 2, "passed": 2, "failed": 0})
+        self.assertEqual(result["tests"][0]["stdout"], "hi\n")
+
+    def test_run_without_isolate_reports_wrong_answer(self) -> None:
+        result = run_execution_plan(
+            _plan(),
+            "def add(a, b):\n    return a * b\n",
+            max_output_chars=2000,
+        )
+
+        self.assertEqual(result["status"], "Wrong Answer")
+        self.assertEqual(result["summary"], {"total": 2, "passed": 1, "failed": 1})
+
+    def test_run_without_isolate_enforces_time_limit(self) -> None:
+        result = run_execution_plan(
+            _plan(time_limit_s=1),
+            "def add(a, b):\n    while True:\n        pass\n",
+            max_output_chars=2000,
+        )
+
+        self.assertEqual(result["status"], "Time Limit Exceeded")
+        self.assertEqual(result["error_kind"], "user")
+
+    def test_run_without_isolate_contains_system_exit(self) -> None:
+        result = run_execution_plan(
+            _plan(),
+            "import sys\nsys.exit(3)\n",
+            max_output_chars=2000,
+        )
+
+        self.assertEqual(result["status"], "Runtime Error")
+        self.assertEqual(result["error_kind"], "user")
+
+    def test_run_without_isolate_contains_os_exit(self) -> None:
+        result = run_execution_plan(
+            _plan(),
+            "import os\nos._exit(7)\n",
+            max_output_chars=2000,
+        )
+
+        self.assertEqual(result["status"], "Runtime Error")
+        self.assertEqual(result["error_kind"], "user")
+
+    def test_start_up_time_does_not_count_against_time_limit(self) -> None:
+        context = SimpleNamespace(Pipe=multiprocessing.Pipe, Process=_SlowStartProcess)
+        with patch("judge.runner._harness_process_context", return_value=context):
+            result = run_execution_plan(
+                _plan(time_limit_s=1),
+                "def add(a, b):\n    return a + b\n",
+                max_output_chars=2000,
+            )
+
+        self.assertEqual(result["status"], "Accepted")
+
+    def test_start_failure_is_reported_as_internal_error(self) -> None:
+        context = Mock(Pipe=multiprocessing.Pipe)
+        context.Process.return_value.start.side_effect = OSError("fork failed")
+        context.Process.return_value.is_alive.return_value = False
+        with patch("judge.runner._harness_process_context", return_value=context):
+            result = run_execution_plan(_plan(), "def add(a, b):\n    return a + b\n", max_output_chars=2000)
+
+        self.assertEqual(result["status"], "Runtime Error")
+        self.assertEqual(result["error_kind"], "internal")
+        self.assertIn("fork failed", result["error"])
+
+    def test_child_exit_before_ready_is_reported_as_internal_error(self) -> None:
+        # A child that never reaches the harness entry closes the pipe without reporting in.
+        context = Mock(Pipe=multiprocessing.Pipe)
+        context.Process.return_value.is_alive.return_value = False
+        with patch("judge.runner._harness_process_context", return_value=context):
+            result = run_execution_plan(_plan(), "def add(a, b):\n    return a + b\n", max_output_chars=2000)
+
+        self.assertEqual(result["status"], "Runtime Error")
+        self.assertEqual(result["error_kind"], "internal")
+
+    def test_patched_judge_globals_do_not_leak_into_later_runs(self) -> None:
+        patching = (
+            "import judge.harness\n"
+            "judge.harness.compare = lambda *args: True\n"
+            "def add(a, b):\n    return a + b\n"
+        )
+        run_execution_plan(_plan(), patching, max_output_chars=2000)
+
+        result = run_execution_plan(_plan(), "def add(a, b):\n    return 0\n", max_output_chars=2000)
+
+        self.assertEqual(result["status"], "Wrong Answer")
+
+
+class CompiledCasePayloadTests(TestCase):
+    def test_json_safe_expected_is_shipped_as_native_value(self) -> None:
+        case = CompiledTestCase(id="c", input_code="", expected_literal="[1, 2.5, {'a': None}]")
+
+        self.assertEqual(case.config_payload["expected"], [1, 2.5, {"a": None}])
+
+    def test_json_lossy_expected_is_shipped_as_literal_only(self) -> None:
+        case = CompiledTestCase(id="c", input_code="", expected_literal="(1, 2)")
+
+        self.assertNotIn("expected", case.config_payload)
+        self.assertEqual(case.config_payload["expected_literal"], "(1, 2)")
+
+    def test_expected_beyond_int64_is_shipped_as_literal_only(self) -> None:
+        case = CompiledTestCase(id="c", input_code="", expected_literal=str(2**70))
+
+        self.assertNotIn("expected", case.config_payload)
+
+    def test_non_finite_expected_is_shipped_as_literal_only(self) -> None:
+        for literal in ("1e400", "[-1e400, 0.5]", "{'x': 1e400}"):
+            with self.subTest(literal):
+                case = CompiledTestCase(id="c", input_code="", expected_literal=literal)
+
+                self.assertNotIn("expected", case.config_payload)
+
+    def test_tuple_expected_still_matches_without_isolate(self) -> None:
+        plan = ExecutionPlan(
+            problem_id="sample/01-basics/01-pair",
+            runner="pair(a)",
+            execution_profile="light",
+            comparison=Comparison(type="exact"),
+            time_limit_s=1,
+            memory_mb=256,
+            cases=(CompiledTestCase(id="c", input_code="a = 1\n", expected_literal="(1, 1)"),),
+            detail_mode="all",
+        )
+
+        result = run_execution_plan(plan, "def pair(a):\n    return (a, a)\n", max_output_chars=2000)
+
+        self.assertEqual(result["status"], "Accepted")
+
+
+class IsolateBoxReuseTests(TestCase):
+    def _run_twice(self, *, reuse_box: bool) -> tuple[Mock, Mock, bool]:
+        isolate = IsolateConfig(executable="/usr/bin/isolate", box_id=901, reuse_box=reuse_box)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            box_path = Path(tmp_dir)
+            init = Mock(return_value=box_path)
+            cleanup = Mock()
+
+            def _fake_run(*_args: object, **_kwargs: object) -> Mock:
+                (box_path / "leftover.txt").write_text("from the submission")
+                return Mock(returncode=0, stdout=b"[]", stderr=b"")
+
+            with (
+                patch.dict("judge.runner._READY_ISOLATE_BOXES", clear=True),
+                patch("judge.runner._init_isolate_box", init),
+                patch("judge.runner._cleanup_isolate_box", cleanup),
+                patch("judge.runner._harness_entrypoint", return_value="/runtime/harness.py"),
+                patch("judge.runner.subprocess.run", side_effect=_fake_run),
+            ):
+                for _ in range(2):
+                    _run_in_isolate(_plan(), "pass\n", {"cases": []}, isolate)
+            leftover_exists = (box_path / "leftover.txt").exists()
+        return init, cleanup, leftover_exists
+
+    def test_box_is_initialized_and_cleaned_per_run_by_default(self) -> None:
+        init, cleanup, _ = self._run_twice(reuse_box=False)
+
+        self.assertEqual(init.call_count, 2)
+        self.assertEqual(cleanup.call_count, 2)
+
+    def test_reused_box_is_initialized_once_and_wiped_between_runs(self) -> None:
+        init, cleanup, leftover_exists = self._run_twice(reuse_box=True)
+
+        self.assertEqual(init.call_count, 1)
+        cleanup.assert_not_called()
+        self.assertFalse(leftover_exists)
+
+
+class PrewarmIsolateBoxTests(TestCase):
+    def test_prewarm_initializes_only_reusable_boxes(self) -> None:
+        init = Mock(return_value=Path("/tmp/box"))
+        reusable = IsolateConfig(executable="/usr/bin/isolate", box_id=21, reuse_box=True)
+        with (
+            patch.dict("judge.runner._READY_ISOLATE_BOXES", clear=True),
+            patch("judge.runner._init_isolate_box", init),
+        ):
+            prewarm_isolate_box(reusable)
+            prewarm_isolate_box(replace(reusable, box_id=23, reuse_box=False))
+
+        self.assertEqual([call.args[0].box_id for call in init.call_args_list], [21])
+
+
+class SuccessResponseTests(TestCase):
+    def _tests_raw(self) -> list[dict[str, object]]:
+        return [
+            {"id": "a", "status": "Accepted", "stdout": "x" * 50},
+            {"id": "b", "status": "Wrong Answer", "stdout": "y" * 50},
+            {"id": "c", "status": "Runtime Error"},
+        ]
+
+    def test_first_failure_mode_returns_only_first_failed_case(self) -> None:
+        plan = ExecutionPlan(**{**_plan().__dict__, "detail_mode": "first_failure"})
+
+        response = _build_success_response(plan, self._tests_raw(), max_output_chars=10)
+
+        self.assertEqual(response["status"], "Wrong Answer")
+        self.assertEqual(response["summary"], {"total": 3, "passed": 1, "failed": 2})
+        self.assertEqual([test["id"] for test in response["tests"]], ["b"])
+        self.assertEqual(response["tests"][0]["stdout"], "yyyyyyy...")
+
+    def test_all_mode_returns_every_case_sanitized(self) -> None:
+        response = _build_success_response(_plan(), self._tests_raw(), max_output_chars=10)
+
+        self.assertEqual([test["id"] for test in response["tests"]], ["a", "b", "c"])
+        self.assertEqual(response["tests"][2]["stdout"], "")
+
+
+class PerCaseIsolationTests(TestCase):
+    def _run(self, code: str, input_codes: list[str]) -> list[str]:
+        config = {
+            "runner": "add(a, b)",
+            "cases": [
+                {"id": f"case{index}", "input_code": input_code, "expected_literal": "3"}
+                for index, input_code in enumerate(input_codes)
+            ],
+        }
+        return [item["status"] for item in run_cases(config, code)]
+
+    def test_class_attribute_updates_do_not_leak_between_cases(self) -> None:
+        code = (
+            "class Counter:\n"
+            "    total = 0\n"
+            "    def bump(self):\n"
+            "        self.__class__.total += 1\n"
+            "        return self.__class__.total\n"
+            "def add(a, b):\n"
+            "    return a + b + Counter().bump() - 1\n"
+        )
+
+        self.assertEqual(self._run(code, ["a = 1\nb = 2\n"] * 2), ["Accepted", "Accepted"])
+
+    def test_object_setattr_updates_do_not_leak_between_cases(self) -> None:
+        code = (
+            "def add(a, b):\n"
+            "    calls = getattr(add, 'calls', 0)\n"
+            "    object.__setattr__(add, 'calls', calls + 1)\n"
+            "    return a + b + calls\n"
+        )
+
+        self.assertEqual(self._run(code, ["a = 1\nb = 2\n"] * 2), ["Accepted", "Accepted"])
+
+    def test_testcase_names_do_not_leak_into_later_cases(self) -> None:
+        code = "def add(a, b):\n    return a + b\n"
+
+        self.assertEqual(
+            self._run(code, ["a = 1\nb = 2\n", "a = 1\n"]),
+            ["Accepted", "Runtime Error"],
+        )
+
+    def test_stateful_solution_runs_isolated_per_case(self) -> None:
+        code = "calls = []\ndef add(a, b):\n    calls.append(1)\n    return a + b + len(calls) - 1\n"
+
+        self.assertEqual(self._run(code, ["a = 1\nb = 2\n"] * 2), ["Accepted", "Accepted"])
+
+
+class BatchRunnerTests(TestCase):
+    def test_batch_matches_individual_runs_and_preserves_order(self) -> None:
+        other_plan = ExecutionPlan(**{**_plan().__dict__, "problem_id": "sample/01-basics/02-add"})
+        items = [
+            (_plan(), "def add(a, b):\n    return a + b\n"),
+            (other_plan, "def add(a, b):\n    return a - b\n"),
+            (_plan(), "def add(a, b):\n    return a * b\n"),
+            (_plan(), "def add(a, b)\n"),
+        ]
+
+        responses = run_execution_plan_batch(items, max_output_chars=2000)
+
+        expected = [run_execution_plan(plan, code, max_output_chars=2000) for plan, code in items]
+        self.assertEqual(responses, expected)
+        self.assertEqual(
+            [response["status"] for response in responses],
+            ["Accepted", "Wrong Answer", "Wrong Answer", "Syntax Error"],
+        )
+
+    def test_batch_falls_back_to_individual_runs_on_time_limit(self) -> None:
+        items = [
+            (_plan(), "def add(a, b):\n    return a + b\n"),
+            (_plan(), "def add(a, b):\n    while True:\n        pass\n"),
+        ]
+
+        responses = run_execution_plan_batch(items, max_output_chars=2000)
+
+        self.assertEqual(
+            [response["status"] for response in responses],
+            ["Accepted", "Time Limit Exceeded"],
+        )
+
+    def test_harness_batch_mode_reads_config_then_submissions_from_stdin(self) -> None:
+        config = {
+            "runner": "add(a, b)",
+            "comparison": {"type": "exact"},
+            "execution_profile": "light",
+            "cases": [{"id": "case1", "input_code": "a = 1\nb = 2\n", "expected_literal": "3"}],
+        }
+        codes = ["def add(a, b):\n    return a + b\n", "def add(a, b):\n    return 0\n"]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            harness_path = Path(tmp_dir) / "harness.py"
+            harness_path.write_text(HARNESS_CODE)
+
+            result = subprocess.run(
+                [sys.executable, str(harness_path), "--stdin-batch"],
+                cwd=tmp_dir,
+                input=_encode_harness_batch_input(codes, config),
+                capture_output=True,
+                check=False,
+            )
+
+        self.assertEqual(result.returncode, 0)
+        payload = json.loads(result.stdout)
+        self.assertEqual([items[0]["status"] for items in payload], ["Accepted", "Wrong Answer"])
+
+
+_FAKE_ISOLATE = """import os
+import sys
+
+args = sys.argv[1:]
+if "--run" in args:
+    command = args[args.index("--") + 1:]
+    os.execv(command[0], command)
+"""
+
+
+def _use_fake_isolate(test: TestCase, box_id: int) -> IsolateConfig:
+    """Route isolate runs for ``test`` through a stand-in that just execs the harness."""
+    tmp_dir = tempfile.TemporaryDirectory()
+    test.addCleanup(tmp_dir.cleanup)
+    root = Path(tmp_dir.name)
+    fake_isolate = root / "isolate"
+    fake_isolate.write_text(f"#!{sys.executable}\n{_FAKE_ISOLATE}")
+    fake_isolate.chmod(0o755)
+    box_path = root / "box"
+    box_path.mkdir()
+    for target, kwargs in (
+        ("judge.runner._acquire_isolate_box", {"return_value": box_path}),
+        ("judge.runner._release_isolate_box", {}),
+        ("judge.runner._harness_entrypoint", {"return_value": str(_ensure_harness_file())}),
+    ):
+        patcher = patch(target, **kwargs)
+        patcher.start()
+        test.addCleanup(patcher.stop)
+    return IsolateConfig(
+        executable=str(fake_isolate),
+        box_id=box_id,
+        use_cgroups=False,
+        wall_time_extra_s=0,
+        timeout_grace_s=0,
+    )
+
+
+class IsolateRunnerTests(TestCase):
+    def setUp(self) -> None:
+        self.isolate = _use_fake_isolate(self, box_id=902)
+
+    def test_run_reports_sandboxed_harness_results(self) -> None:
+        result = run_execution_plan(
+            _plan(),
+            "def add(a, b):\n    return a + b\n",
+            max_output_chars=2000,
+            isolate=self.isolate,
+        )
+
+        self.assertEqual(result["status"], "Accepted")
+        self.assertEqual(result["summary"], {"total": 2, "passed": 2, "failed": 0})
+
+    def test_run_kills_process_after_wall_timeout(self) -> None:
+        result = run_execution_plan(
+            _plan(time_limit_s=1),
+            "def add(a, b):\n    while True:\n        pass\n",
+            max_output_chars=2000,
+            isolate=self.isolate,
+        )
+
+        self.assertEqual(result["status"], "Time Limit Exceeded")
+
+
+class IsolateBatchRunnerTests(TestCase):
+    def setUp(self) -> None:
+        self.isolate = _use_fake_isolate(self, box_id=903)
+
+    def _run_batch(self, codes: list[str]) -> list[dict[str, Any]]:
+        return run_execution_plan_batch(
+            [(_plan(time_limit_s=1), code) for code in codes],
+            max_output_chars=2000,
+            isolate=self.isolate,
+        )
+
+    def test_batch_matches_individual_runs_in_one_sandbox_run(self) -> None:
+        codes = [
+            "def add(a, b):\n    return a + b\n",
+            "def add(a, b):\n    return a * b\n",
+            "def add(a, b)\n",
+        ]
+        with patch("judge.runner._run_harness_in_isolate", wraps=_run_harness_in_isolate) as run:
+            responses = self._run_batch(codes)
+
+        self.assertEqual(run.call_count, 1)
+        expected = [
+            run_execution_plan(_plan(time_limit_s=1), code, max_output_chars=2000, isolate=self.isolate)
+            for code in codes
+        ]
+        self.assertEqual(responses, expected)
+
+    def test_each_batched_submission_gets_its_own_time_limit(self) -> None:
+        # Too slow on its own, but well inside the two-submission sandbox budget.
+        responses = self._run_batch(
+            [
+                "def add(a, b):\n    return a + b\n",
+                "import time\ndef add(a, b):\n    time.sleep(1.1)\n    return a + b\n",
+            ]
+        )
+
+        self.assertEqual(
+            [response["status"] for response in responses],
+            ["Accepted", "Time Limit Exceeded"],
+        )
+
+    def test_batched_submission_cannot_change_how_others_are_graded(self) -> None:
+        patching = (
+            "import sys\n"
+            "sys.modules['__main__'].compare = lambda *args: True\n"
+            "def add(a, b):\n    return a + b\n"
+        )
+
+        responses = self._run_batch([patching, "def add(a, b):\n    return 0\n"])
+
+        self.assertEqual(
+            [response["status"] for response in responses],
+            ["Accepted", "Wrong Answer"],
+        )
+
+
+class OutputCapTests(TestCase):
+    def test_harness_caps_captured_output_at_the_source(self) -> None:
+        config = {
+            "runner": "add(a, b)",
+            "comparison": {"type": "exact"},
+            "execution_profile": "light",
+            "max_output_chars": 10,
+            "cases": [{"id": "case1", "input_code": "a = 1\nb = 2\n", "expected_literal": "3"}],
+        }
+
+        results = run_cases(config, "def add(a, b):\n    print('x' * 10_000)\n    return a + b\n")
+
+        self.assertEqual(results[0]["stdout"], "x" * 11)
+
+    def test_capped_output_is_truncated_like_uncapped_output(self) -> None:
+        code = "def add(a, b):\n    print('x' * 10_000)\n    return a + b\n"
+
+        result = run_execution_plan(_plan(), code, max_output_chars=10)
+
+        self.assertEqual(result["tests"][0]["stdout"], "xxxxxxx...")
+
+
+class SolutionCompileCacheTests(TestCase):
+    def test_identical_batch_submissions_compile_once(self) -> None:
+        code = "def add(a, b):\n    return a + b  # compile-cache probe\n"
+        config = {
+            "runner": "add(a, b)",
+            "cases": [{"id": "case1", "input_code": "a = 1\nb = 2\n", "expected_literal": "3"}],
+        }
+        _compile_solution.cache_clear()
+
+        first, second = run_batch(config, [code, code])
+
+        self.assertEqual(first, second)
+        self.assertEqual(first[0]["status"], "Accepted")
+        info = _compile_solution.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 1))
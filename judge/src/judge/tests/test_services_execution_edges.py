@@ -2,124 +2,179 @@
 
 from __future__ import annotations
 
+from typing import Any
 from unittest import TestCase
 from unittest.mock import Mock
 
 from judge.problems import ArgumentSpec, Comparison, ProblemSpec
 from judge.runner import IsolateConfig
-from judge.services import WorkerExecutionService, WorkerJob
+from judge.services import WorkerExecutionService
+from judge.tests._helpers import ADD_CODE, PROBLEM_ID, accepted_result, make_job
+
+# Shared read-only fixtures; IsolateConfig, ProblemSpec, and WorkerJob are frozen dataclasses.
+_ISOLATE = IsolateConfig(executable="/usr/bin/isolate", box_id=1)
+_ADD_SPEC = ProblemSpec(
+    problem_id=PROBLEM_ID,
+    arguments=(ArgumentSpec("a"), ArgumentSpec("b")),
+    runner="add(a, b)",
+    execution_profile="light",
+    comparison=Comparison(type="exact"),
+    time_limit_s=5,
+    memory_mb=512,
+)
+_RUN_JOB = make_job(
+    "job-run",
+    operation="run",
+    cases_payload=[
+        {
+            "id": "case1",
+            "input_code": "a = 1\nb = 2\n",
+            "expected_literal": "3",
+        }
+    ],
+)
+_SUBMIT_JOB = make_job("job-submit")
+
+
+class _ResultsStub:
+    def __init__(self, *, mark_error_exc: Exception | None = None) -> None:
+        self.mark_error_exc = mark_error_exc
+        self.mark_running_calls: list[str] = []
+        self.mark_done_calls: list[tuple[str, dict[str, Any]]] = []
+        self.mark_error_calls: list[tuple[str, str, str | None]] = []
+
+    def mark_running(self, job_id: str) -> bool:
+        self.mark_running_calls.append(job_id)
+        return True
+
+    def mark_done(self, job_id: str, result: dict[str, Any]) -> bool:
+        self.mark_done_calls.append((job_id, result))
+        return True
+
+    def mark_error(
+        self,
+        job_id: str,
+        error: str,
+        result: dict[str, Any] | None = None,
+        error_kind: str | None = None,
+    ) -> bool:
+        if self.mark_error_exc is not None:
+            raise self.mark_error_exc
+        self.mark_error_calls.append((job_id, error, error_kind))
+        return True
+
+
+class _ProblemsStub:
+    compiler = None
+
+    def __init__(self, spec: ProblemSpec | None = None) -> None:
+        self.spec = spec
+        self.get_problem_spec_calls: list[str] = []
+
+    def get_problem_spec(self, problem_id: str) -> ProblemSpec:
+        self.get_problem_spec_calls.append(problem_id)
+        if self.spec is None:
+            raise FileNotFoundError(problem_id)
+        return self.spec
+
+
+class _RunnerStub:
+    def __init__(self, result: dict[str, Any] | None = None) -> None:
+        self.result = result
+        self.calls: list[tuple[Any, str]] = []
+
+    def __call__(
+        self,
+        plan: Any,
+        code: str,
+        max_output_chars: int,
+        *,
+        isolate: IsolateConfig,
+    ) -> dict[str, Any] | None:
+        self.calls.append((plan, code))
+        return self.result
 
 
 class WorkerExecutionServiceEdgeTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.log = Mock()
+
+    def setUp(self) -> None:
+        self.log.reset_mock()
+
     def _service(
         self,
         *,
-        results: Mock,
-        problems: Mock,
+        results: _ResultsStub,
+        problems: _ProblemsStub,
         run_execution_plan_fn,
     ) -> WorkerExecutionService:
         return WorkerExecutionService(
             results=results,
             problems=problems,
-            isolate=IsolateConfig(executable="/usr/bin/isolate", box_id=1),
+            isolate=_ISOLATE,
             max_output_chars=2000,
             run_execution_plan_fn=run_execution_plan_fn,
-            log=Mock(),
+            log=self.log,
         )
 
     def test_run_operation_builds_plan_from_compiled_cases(self) -> None:
-        results = Mock()
-        results.mark_running.return_value = True
-        results.mark_done.return_value = True
-        problems = Mock()
-        problems.get_problem_spec.return_value = ProblemSpec(
-            problem_id="sample/01-basics/01-add",
-            arguments=(ArgumentSpec("a"), ArgumentSpec("b")),
-            runner="add(a, b)",
-            execution_profile="light",
-            comparison=Comparison(type="exact"),
-            time_limit_s=5,
-            memory_mb=512,
-        )
-        run_execution_plan_fn = Mock(return_value={"status": "Accepted", "summary": {}, "tests": [], "error": None})
+        results = _ResultsStub()
+        problems = _ProblemsStub(_ADD_SPEC)
+        run_execution_plan_fn = _RunnerStub(accepted_result())
         service = self._service(results=results, problems=problems, run_execution_plan_fn=run_execution_plan_fn)
         service.plan_factory = Mock()
         service.plan_factory.build_run_plan.return_value = {"id": "run-plan"}
 
-        outcome = service.execute(
-            WorkerJob(
-                job_id="job-run",
-                problem_id="sample/01-basics/01-add",
-                operation="run",
-                code="def add(a, b):\n    return a + b\n",
-                cases_payload=[
-                    {
-                        "id": "case1",
-                        "input_code": "a = 1\nb = 2\n",
-                        "expected_literal": "3",
-                    }
-                ],
-            )
-        )
+        outcome = service.execute(_RUN_JOB)
 
         self.assertTrue(outcome.executed)
         self.assertEqual(outcome.status, "done")
-        problems.get_problem_spec.assert_called_once_with("sample/01-basics/01-add")
+        self.assertEqual(problems.get_problem_spec_calls, [PROBLEM_ID])
+        self.assertEqual(results.mark_done_calls, [("job-run", accepted_result())])
         service.plan_factory.build_run_plan.assert_called_once()
-        run_execution_plan_fn.assert_called_once()
+        self.assertEqual(
+            run_execution_plan_fn.calls,
+            [({"id": "run-plan"}, ADD_CODE)],
+        )
 
     def test_submit_operation_uses_submit_plan(self) -> None:
-        results = Mock()
-        results.mark_running.return_value = True
-        results.mark_done.return_value = True
-        problems = Mock()
-        run_execution_plan_fn = Mock(return_value={"status": "Accepted", "summary": {}, "tests": [], "error": None})
+        results = _ResultsStub()
+        problems = _ProblemsStub()
+        run_execution_plan_fn = _RunnerStub(accepted_result())
         service = self._service(results=results, problems=problems, run_execution_plan_fn=run_execution_plan_fn)
         service.plan_factory = Mock()
         service.plan_factory.build_submit_plan.return_value = {"id": "submit-plan"}
 
-        outcome = service.execute(
-            WorkerJob(
-                job_id="job-submit",
-                problem_id="sample/01-basics/01-add",
-                operation="submit",
-                code="def add(a, b):\n    return a + b\n",
-            )
-        )
+        outcome = service.execute(_SUBMIT_JOB)
 
         self.assertTrue(outcome.executed)
         self.assertEqual(outcome.status, "done")
-        service.plan_factory.build_submit_plan.assert_called_once_with("sample/01-basics/01-add")
-        run_execution_plan_fn.assert_called_once()
+        service.plan_factory.build_submit_plan.assert_called_once_with(PROBLEM_ID)
+        self.assertEqual(len(run_execution_plan_fn.calls), 1)
 
     def test_invalid_operation_is_persisted_as_internal_error(self) -> None:
-        results = Mock()
-        results.mark_running.return_value = True
-        results.mark_error.return_value = True
-        problems = Mock()
-        run_execution_plan_fn = Mock()
+        results = _ResultsStub()
+        problems = _ProblemsStub()
+        run_execution_plan_fn = _RunnerStub()
         service = self._service(results=results, problems=problems, run_execution_plan_fn=run_execution_plan_fn)
 
-        outcome = service.execute(
-            WorkerJob(
-                job_id="job-invalid",
-                problem_id="sample/01-basics/01-add",
-                operation="invalid",
-                code="pass",
-            )
-        )
+        outcome = service.execute(make_job("job-invalid", operation="invalid", code="pass"))
 
         self.assertTrue(outcome.executed)
         self.assertEqual(outcome.status, "error")
         self.assertEqual(outcome.error_kind, "internal")
         self.assertTrue(outcome.should_ack)
-        results.mark_error.assert_called_once()
+        self.assertEqual(len(results.mark_error_calls), 1)
+        job_id, _, error_kind = results.mark_error_calls[0]
+        self.assertEqual((job_id, error_kind), ("job-invalid", "internal"))
+        self.assertEqual(run_execution_plan_fn.calls, [])
 
     def test_unpersistable_worker_exception_disables_ack(self) -> None:
-        results = Mock()
-        results.mark_running.return_value = True
-        results.mark_error.side_effect = RuntimeError("db unavailable")
-        problems = Mock()
+        results = _ResultsStub(mark_error_exc=RuntimeError("db unavailable"))
+        problems = _ProblemsStub()
 
         def _raise(*_args, **_kwargs):
             raise RuntimeError("runner failed")
@@ -128,14 +183,7 @@ class WorkerExecutionServiceEdgeTests(TestCase):
         service.plan_factory = Mock()
         service.plan_factory.build_submit_plan.return_value = {"id": "submit-plan"}
 
-        outcome = service.execute(
-            WorkerJob(
-                job_id="job-no-ack",
-                problem_id="sample/01-basics/01-add",
-                operation="submit",
-                code="pass",
-            )
-        )
+        outcome = service.execute(make_job("job-no-ack", code="pass"))
 
         self.assertTrue(outcome.executed)
         self.assertEqual(outcome.status, "error")
@@ -2,8 +2,6 @@
 
 from __future__ import annotations
 
-import tempfile
-from pathlib import Path
 from unittest import TestCase
 
 from judge.problems import (
@@ -21,6 +19,16 @@ from judge.services import (
     WorkerExecutionService,
     WorkerJob,
 )
+from judge.tests._helpers import (
+    ADD_CODE,
+    BAD_CODE,
+    PROBLEM_ID,
+    accepted_result,
+    make_job,
+    runtime_error_result,
+)
+
+_ISOLATE = IsolateConfig(executable="/usr/bin/isolate", box_id=1)
 
 
 class _InMemoryQueue:
@@ -40,12 +48,9 @@ class _ProblemRepositoryStub:
     def __init__(self, problem_id: str) -> None:
         self.problem_id = problem_id
         self.compiler = TestCaseCompiler()
-
-    def get_problem_spec(self, problem_id: str) -> ProblemSpec:
-        if problem_id != self.problem_id:
-            raise FileNotFoundError(problem_id)
-        return ProblemSpec(
-            problem_id=self.problem_id,
+        # Built once; the spec and cases are frozen dataclasses and callers only read them.
+        self._spec = ProblemSpec(
+            problem_id=problem_id,
             arguments=(ArgumentSpec("a"), ArgumentSpec("b")),
             runner="add(a, b)",
             execution_profile="light",
@@ -53,22 +58,14 @@ class _ProblemRepositoryStub:
             time_limit_s=10,
             memory_mb=1024,
         )
-
-    def get_compiled_public_cases(self, problem_id: str) -> list[CompiledTestCase]:
-        if problem_id != self.problem_id:
-            raise FileNotFoundError(problem_id)
-        return [
+        self._public_cases = [
             CompiledTestCase(
                 id="case-public",
                 input_code="a = 1\nb = 2\n",
                 expected_literal="3",
             )
         ]
-
-    def get_hidden_cases(self, problem_id: str) -> list[CompiledTestCase]:
-        if problem_id != self.problem_id:
-            raise FileNotFoundError(problem_id)
-        return [
+        self._hidden_cases = [
             CompiledTestCase(
                 id="case-hidden",
                 input_code="a = 5\nb = 6\n",
@@ -76,151 +73,126 @@ class _ProblemRepositoryStub:
             )
         ]
 
+    def get_problem_spec(self, problem_id: str) -> ProblemSpec:
+        if problem_id != self.problem_id:
+            raise FileNotFoundError(problem_id)
+        return self._spec
+
+    def get_compiled_public_cases(self, problem_id: str) -> list[CompiledTestCase]:
+        if problem_id != self.problem_id:
+            raise FileNotFoundError(problem_id)
+        return self._public_cases
+
+    def get_hidden_cases(self, problem_id: str) -> list[CompiledTestCase]:
+        if problem_id != self.problem_id:
+            raise FileNotFoundError(problem_id)
+        return self._hidden_cases
+
 
 class ServicesFlowTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        # One store, queue, and pair of services serve the whole class; tests only
+        # pick the job id and execution-plan function they need.
+        cls.store = ResultsStore.in_memory()
+        cls.queue = _InMemoryQueue()
+        cls.problems = _ProblemRepositoryStub(PROBLEM_ID)
+        cls.submission = SubmissionService(
+            queue=cls.queue,
+            results=cls.store,
+            problems=cls.problems,
+            queue_maxlen=100,
+            stream_routing=DEFAULT_STREAM_ROUTING,
+            now_factory=lambda: 1700000000,
+        )
+        cls.execution = WorkerExecutionService(
+            results=cls.store,
+            problems=cls.problems,
+            isolate=_ISOLATE,
+            max_output_chars=2000,
+        )
+
+    def setUp(self) -> None:
+        self.queue.enqueued.clear()
+
+    def tearDown(self) -> None:
+        with self.store._connect() as conn:
+            conn.execute("DELETE FROM jobs")
+
     def test_submit_then_execute_persists_done_result(self) -> None:
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            store = ResultsStore(Path(tmp_dir) / "judge.db")
-            queue = _InMemoryQueue()
-            problems = _ProblemRepositoryStub("sample/01-basics/01-add")
-
-            submission = SubmissionService(
-                queue=queue,
-                results=store,
-                problems=problems,
-                queue_maxlen=100,
-                stream_routing=DEFAULT_STREAM_ROUTING,
-                job_id_factory=lambda: "job-accepted",
-                now_factory=lambda: 1700000000,
-            )
+        self.submission.job_id_factory = lambda: "job-accepted"
 
-            submitted = submission.enqueue_submit(
-                problem_id="sample/01-basics/01-add",
-                code="def add(a, b):\n    return a + b\n",
-            )
+        submitted = self.submission.enqueue_submit(
+            problem_id=PROBLEM_ID,
+            code=ADD_CODE,
+        )
 
-            self.assertEqual(submitted.job_id, "job-accepted")
-            self.assertEqual(submitted.status, "queued")
-            self.assertEqual(len(queue.enqueued), 1)
-
-            _, payload = queue.enqueued[0]
-
-            def _run_execution_plan_ok(*_args, **_kwargs):
-                return {
-                    "status": "Accepted",
-                    "summary": {
-                        "total": 2,
-                        "passed": 2,
-                        "failed": 0,
-                    },
-                    "tests": [],
-                    "error": None,
-                }
-
-            execution = WorkerExecutionService(
-                results=store,
-                problems=problems,
-                isolate=IsolateConfig(executable="/usr/bin/isolate", box_id=1),
-                max_output_chars=2000,
-                run_execution_plan_fn=_run_execution_plan_ok,
-            )
+        self.assertEqual(submitted.job_id, "job-accepted")
+        self.assertEqual(submitted.status, "queued")
+        self.assertEqual(len(self.queue.enqueued), 1)
 
-            started = {"called": False}
+        _, payload = self.queue.enqueued[0]
 
-            outcome = execution.execute(
-                WorkerJob(
-                    job_id=str(payload["job_id"]),
-                    problem_id=str(payload["problem_id"]),
-                    operation=str(payload["operation"]),
-                    code=str(payload["code"]),
-                ),
-                on_started=lambda: started.__setitem__("called", True),
-            )
+        def _run_execution_plan_ok(*_args, **_kwargs):
+            return accepted_result()
 
-            self.assertTrue(started["called"])
-            self.assertTrue(outcome.executed)
-            self.assertEqual(outcome.status, "done")
-            self.assertEqual(outcome.error_kind, "none")
-            self.assertTrue(outcome.should_ack)
+        self.execution.run_execution_plan_fn = _run_execution_plan_ok
+        started = {"called": False}
 
-            job = store.get_job("job-accepted")
+        outcome = self.execution.execute(
+            WorkerJob(
+                job_id=str(payload["job_id"]),
+                problem_id=str(payload["problem_id"]),
+                operation=str(payload["operation"]),
+                code=str(payload["code"]),
+            ),
+            on_started=lambda: started.__setitem__("called", True),
+        )
+
+        self.assertTrue(started["called"])
+        self.assertTrue(outcome.executed)
+        self.assertEqual(outcome.status, "done")
+        self.assertEqual(outcome.error_kind, "none")
+        self.assertTrue(outcome.should_ack)
+
+        job = self.store.get_job("job-accepted")
 
         self.assertIsNotNone(job)
         assert job is not None
         self.assertEqual(job["status"], "done")
         self.assertEqual(job["attempts"], 1)
-        self.assertEqual(
-            job["result"],
-            {
-                "status": "Accepted",
-                "summary": {
-                    "total": 2,
-                    "passed": 2,
-                    "failed": 0,
-                },
-                "tests": [],
-                "error": None,
-            },
-        )
+        self.assertEqual(job["result"], accepted_result())
 
     def test_submit_then_execute_persists_runner_error(self) -> None:
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            store = ResultsStore(Path(tmp_dir) / "judge.db")
-            queue = _InMemoryQueue()
-            problems = _ProblemRepositoryStub("sample/01-basics/01-add")
-
-            submission = SubmissionService(
-                queue=queue,
-                results=store,
-                problems=problems,
-                queue_maxlen=100,
-                stream_routing=DEFAULT_STREAM_ROUTING,
-                job_id_factory=lambda: "job-error",
-                now_factory=lambda: 1700000000,
-            )
+        self.submission.job_id_factory = lambda: "job-error"
 
-            submission.enqueue_submit(
-                problem_id="sample/01-basics/01-add",
-                code="def add(a, b):\n    raise RuntimeError('bad')\n",
-            )
-            _, payload = queue.enqueued[0]
-
-            def _run_execution_plan_error(*_args, **_kwargs):
-                return {
-                    "status": "Runtime Error",
-                    "summary": {
-                        "total": 2,
-                        "passed": 0,
-                        "failed": 2,
-                    },
-                    "tests": [],
-                    "error": "Line 2: RuntimeError: bad",
-                    "error_kind": "user",
-                }
-
-            execution = WorkerExecutionService(
-                results=store,
-                problems=problems,
-                isolate=IsolateConfig(executable="/usr/bin/isolate", box_id=1),
-                max_output_chars=2000,
-                run_execution_plan_fn=_run_execution_plan_error,
-            )
+        self.submission.enqueue_submit(
+            problem_id=PROBLEM_ID,
+            code=BAD_CODE,
+        )
+        _, payload = self.queue.enqueued[0]
 
-            outcome = execution.execute(
-                WorkerJob(
-                    job_id=str(payload["job_id"]),
-                    problem_id=str(payload["problem_id"]),
-                    operation=str(payload["operation"]),
-                    code=str(payload["code"]),
-                )
+        def _run_execution_plan_error(*_args, **_kwargs):
+            return runtime_error_result()
+
+        self.execution.run_execution_plan_fn = _run_execution_plan_error
+
+        outcome = self.execution.execute(
+            WorkerJob(
+                job_id=str(payload["job_id"]),
+                problem_id=str(payload["problem_id"]),
+                operation=str(payload["operation"]),
+                code=str(payload["code"]),
             )
+        )
 
-            self.assertTrue(outcome.executed)
-            self.assertEqual(outcome.status, "error")
-            self.assertEqual(outcome.error_kind, "user")
-            self.assertTrue(outcome.should_ack)
+        self.assertTrue(outcome.executed)
+        self.assertEqual(outcome.status, "error")
+        self.assertEqual(outcome.error_kind, "user")
+        self.assertTrue(outcome.should_ack)
 
-            job = store.get_job("job-error")
+        job = self.store.get_job("job-error")
 
         self.assertIsNotNone(job)
         assert job is not None
@@ -229,35 +201,22 @@ class ServicesFlowTests(TestCase):
         self.assertEqual(job["error_kind"], "user")
 
     def test_execution_skips_terminal_job_without_reprocessing(self) -> None:
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            store = ResultsStore(Path(tmp_dir) / "judge.db")
-            problems = _ProblemRepositoryStub("sample/01-basics/01-add")
-
-            store.create_job(
-                job_id="job-terminal",
-                problem_id="sample/01-basics/01-add",
-                profile="light",
-                operation="submit",
-                created_at=1700000000,
-            )
-            self.assertTrue(store.mark_running("job-terminal"))
-            self.assertTrue(store.mark_done("job-terminal", {"status": "Accepted"}))
-
-            execution = WorkerExecutionService(
-                results=store,
-                problems=problems,
-                isolate=IsolateConfig(executable="/usr/bin/isolate", box_id=1),
-                max_output_chars=2000,
-            )
+        self.store.create_job(
+            job_id="job-terminal",
+            problem_id=PROBLEM_ID,
+            profile="light",
+            operation="submit",
+            created_at=1700000000,
+        )
+        self.assertTrue(self.store.mark_running("job-terminal"))
+        self.assertTrue(self.store.mark_done("job-terminal", {"status": "Accepted"}))
 
-            outcome = execution.execute(
-                WorkerJob(
-                    job_id="job-terminal",
-                    problem_id="sample/01-basics/01-add",
-                    operation="submit",
-                    code="def add(a, b):\n    return a + b\n",
-                )
-            )
+        def _run_execution_plan_unexpected(*_args, **_kwargs):
+            raise AssertionError("terminal job must not be executed again")
+
+        self.execution.run_execution_plan_fn = _run_execution_plan_unexpected
+
+        outcome = self.execution.execute(make_job("job-terminal"))
 
         self.assertFalse(outcome.executed)
         self.assertEqual(outcome.status, "skipped")
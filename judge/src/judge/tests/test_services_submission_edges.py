@@ -2,34 +2,49 @@
 
 from __future__ import annotations
 
+import json
+import sys
 from unittest import TestCase
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
-from judge.problems import ArgumentSpec, Comparison, ProblemSpec, TestCaseCompiler
+from judge.models import SubmitRequest
+from judge.problems import (
+    ArgumentSpec,
+    Comparison,
+    CompiledTestCase,
+    ProblemSpec,
+    TestCaseCompiler,
+)
 from judge.problems import TestCase as ProblemTestCase
 from judge.services import (
     DEFAULT_STREAM_ROUTING,
+    BacklogEstimator,
     InvalidProblemError,
     InvalidRunRequestError,
     ProblemNotFoundError,
     QueueFullError,
     QueueUnavailableError,
+    StreamRouting,
+    SubmissionAccepted,
     SubmissionService,
+    _IdPool,
+    _serialize_compiled_cases,
 )
+from judge.tests._helpers import ADD_CODE, PROBLEM_ID
 
+# ProblemSpec is frozen, so every test can share one instance.
+_PROBLEM = ProblemSpec(
+    problem_id=PROBLEM_ID,
+    arguments=(ArgumentSpec("a"), ArgumentSpec("b")),
+    runner="add(a, b)",
+    execution_profile="light",
+    comparison=Comparison(type="exact"),
+    time_limit_s=5,
+    memory_mb=1024,
+)
 
-class SubmissionServiceEdgeTests(TestCase):
-    def _problem(self) -> ProblemSpec:
-        return ProblemSpec(
-            problem_id="sample/01-basics/01-add",
-            arguments=(ArgumentSpec("a"), ArgumentSpec("b")),
-            runner="add(a, b)",
-            execution_profile="light",
-            comparison=Comparison(type="exact"),
-            time_limit_s=5,
-            memory_mb=1024,
-        )
 
+class SubmissionServiceEdgeTests(TestCase):
     def test_submit_raises_problem_not_found(self) -> None:
         queue = Mock()
         results = Mock()
@@ -73,7 +88,7 @@ class SubmissionServiceEdgeTests(TestCase):
         queue.backlog.side_effect = RuntimeError("redis down")
         results = Mock()
         problems = Mock()
-        problems.get_problem_spec.return_value = self._problem()
+        problems.get_problem_spec.return_value = _PROBLEM
         service = SubmissionService(
             queue=queue,
             results=results,
@@ -84,8 +99,8 @@ class SubmissionServiceEdgeTests(TestCase):
 
         with self.assertRaises(QueueUnavailableError):
             service.enqueue_submit(
-                problem_id="sample/01-basics/01-add",
-                code="def add(a, b):\n    return a + b\n",
+                problem_id=PROBLEM_ID,
+                code=ADD_CODE,
             )
 
         results.create_job.assert_not_called()
@@ -96,7 +111,7 @@ class SubmissionServiceEdgeTests(TestCase):
         queue.backlog.return_value = 100
         results = Mock()
         problems = Mock()
-        problems.get_problem_spec.return_value = self._problem()
+        problems.get_problem_spec.return_value = _PROBLEM
         service = SubmissionService(
             queue=queue,
             results=results,
@@ -107,8 +122,8 @@ class SubmissionServiceEdgeTests(TestCase):
 
         with self.assertRaises(QueueFullError):
             service.enqueue_submit(
-                problem_id="sample/01-basics/01-add",
-                code="def add(a, b):\n    return a + b\n",
+                problem_id=PROBLEM_ID,
+                code=ADD_CODE,
             )
 
         results.create_job.assert_not_called()
@@ -120,7 +135,7 @@ class SubmissionServiceEdgeTests(TestCase):
         queue.enqueue.side_effect = RuntimeError("enqueue failed")
         results = Mock()
         problems = Mock()
-        problems.get_problem_spec.return_value = self._problem()
+        problems.get_problem_spec.return_value = _PROBLEM
         service = SubmissionService(
             queue=queue,
             results=results,
@@ -133,13 +148,13 @@ class SubmissionServiceEdgeTests(TestCase):
 
         with self.assertRaises(QueueUnavailableError):
             service.enqueue_submit(
-                problem_id="sample/01-basics/01-add",
-                code="def add(a, b):\n    return a + b\n",
+                problem_id=PROBLEM_ID,
+                code=ADD_CODE,
             )
 
         results.create_job.assert_called_once_with(
             "job-enqueue-fail",
-            "sample/01-basics/01-add",
+            PROBLEM_ID,
             "light",
             "submit",
             created_at=1700000000,
@@ -154,7 +169,7 @@ class SubmissionServiceEdgeTests(TestCase):
         queue = Mock()
         results = Mock()
         problems = Mock()
-        problems.get_problem_spec.return_value = self._problem()
+        problems.get_problem_spec.return_value = _PROBLEM
         problems.compiler = TestCaseCompiler()
         service = SubmissionService(
             queue=queue,
@@ -166,8 +181,8 @@ class SubmissionServiceEdgeTests(TestCase):
 
         with self.assertRaises(InvalidRunRequestError):
             service.enqueue_run(
-                problem_id="sample/01-basics/01-add",
-                code="def add(a, b):\n    return a + b\n",
+                problem_id=PROBLEM_ID,
+                code=ADD_CODE,
                 cases=[
                     ProblemTestCase(
                         id="case1",
@@ -179,3 +194,223 @@ class SubmissionServiceEdgeTests(TestCase):
 
         results.create_job.assert_not_called()
         queue.enqueue.assert_not_called()
+
+    def _batch_service(self, queue: Mock, results: Mock, *, queue_maxlen: int = 100):
+        problems = Mock()
+        problems.get_problem_spec.return_value = _PROBLEM
+        job_ids = iter(["job-1", "job-2", "job-3"])
+        return SubmissionService(
+            queue=queue,
+            results=results,
+            problems=problems,
+            queue_maxlen=queue_maxlen,
+            stream_routing=DEFAULT_STREAM_ROUTING,
+            job_id_factory=lambda: next(job_ids),
+            now_factory=lambda: 1700000000,
+        )
+
+    def _batch(self, size: int) -> list[SubmitRequest]:
+        return [
+            SubmitRequest(
+                problem_id=PROBLEM_ID,
+                code=ADD_CODE,
+            )
+            for _ in range(size)
+        ]
+
+    def test_submit_batch_checks_backlog_once_and_pipelines_enqueue(self) -> None:
+        queue = Mock()
+        queue.backlog.return_value = 0
+        queue.enqueue_pipeline.return_value = ["1-0", "2-0", "3-0"]
+        results = Mock()
+        service = self._batch_service(queue, results)
+
+        accepted = service.enqueue_submit_batch(self._batch(3))
+
+        self.assertEqual([item.job_id for item in accepted], ["job-1", "job-2", "job-3"])
+        self.assertEqual({item.status for item in accepted}, {"queued"})
+        queue.backlog.assert_called_once_with("queue:light", "workers-light")
+        queue.enqueue_pipeline.assert_called_once()
+        entries = queue.enqueue_pipeline.call_args.args[0]
+        self.assertEqual([stream for stream, _ in entries], ["queue:light"] * 3)
+        self.assertEqual(results.create_job.call_count, 3)
+        queue.enqueue.assert_not_called()
+
+    def test_submit_batch_rejects_whole_batch_when_it_would_overflow(self) -> None:
+        queue = Mock()
+        queue.backlog.return_value = 98
+        results = Mock()
+        service = self._batch_service(queue, results)
+
+        with self.assertRaises(QueueFullError):
+            service.enqueue_submit_batch(self._batch(3))
+
+        results.create_job.assert_not_called()
+        queue.enqueue_pipeline.assert_not_called()
+
+    def test_submit_batch_marks_failed_entries_as_errors(self) -> None:
+        queue = Mock()
+        queue.backlog.return_value = 0
+        queue.enqueue_pipeline.return_value = ["1-0", RuntimeError("WRONGTYPE")]
+        results = Mock()
+        service = self._batch_service(queue, results)
+
+        accepted = service.enqueue_submit_batch(self._batch(2))
+
+        self.assertEqual([item.status for item in accepted], ["queued", "error"])
+        results.mark_error.assert_called_once_with(
+            "job-2",
+            "Failed to enqueue job",
+            error_kind="internal",
+        )
+
+    def test_submit_batch_persists_errors_when_pipeline_fails(self) -> None:
+        queue = Mock()
+        queue.backlog.return_value = 0
+        queue.enqueue_pipeline.side_effect = RuntimeError("redis down")
+        results = Mock()
+        service = self._batch_service(queue, results)
+
+        with self.assertRaises(QueueUnavailableError):
+            service.enqueue_submit_batch(self._batch(2))
+
+        self.assertEqual(results.mark_error.call_count, 2)
+
+
+class IdPoolTests(TestCase):
+    def test_ids_are_unique_across_refills(self) -> None:
+        pool = _IdPool(burst=4)
+
+        ids = [pool.next() for _ in range(10)]
+
+        self.assertEqual(len(set(ids)), 10)
+        for job_id in ids:
+            self.assertRegex(job_id, r"^[a-z2-7]{26}$")
+
+
+class SerializeCompiledCasesTests(TestCase):
+    def test_output_matches_compact_stdlib_encoding(self) -> None:
+        cases = [
+            CompiledTestCase(
+                id="case-π",
+                input_code="a = 'héllo'\nb = 2\n",
+                expected_literal="'héllo2'",
+            )
+        ]
+
+        serialized = _serialize_compiled_cases(cases)
+        with patch("judge.services._orjson", None):
+            fallback = _serialize_compiled_cases(cases)
+
+        self.assertEqual(serialized, fallback)
+        self.assertIn("héllo", serialized)
+        self.assertEqual(json.loads(serialized)[0]["id"], "case-π")
+
+
+class BacklogEstimatorTests(TestCase):
+    def _estimator(self) -> tuple[BacklogEstimator, list[float]]:
+        now = [100.0]
+        return BacklogEstimator(refresh_interval_s=0.25, clock=lambda: now[0]), now
+
+    def test_admits_only_with_fresh_reading_below_headroom(self) -> None:
+        estimator, now = self._estimator()
+
+        self.assertFalse(estimator.admits("queue:light", 1, 100))
+        estimator.observe("queue:light", 80)
+        self.assertTrue(estimator.admits("queue:light", 1, 100))
+        self.assertFalse(estimator.admits("queue:light", 10, 100))
+
+        now[0] += 0.5
+        self.assertFalse(estimator.admits("queue:light", 1, 100))
+
+    def test_local_enqueues_count_against_estimate(self) -> None:
+        estimator, _ = self._estimator()
+        estimator.observe("queue:light", 88)
+
+        estimator.record_enqueued("queue:light")
+        estimator.record_enqueued("queue:light")
+
+        self.assertFalse(estimator.admits("queue:light", 1, 100))
+
+    def test_service_skips_backlog_round_trip_while_estimate_is_fresh(self) -> None:
+        queue = Mock()
+        queue.backlog.return_value = 5
+        problems = Mock()
+        problems.get_problem_spec.return_value = ProblemSpec(
+            problem_id=PROBLEM_ID,
+            arguments=(ArgumentSpec("a"), ArgumentSpec("b")),
+            runner="add(a, b)",
+            execution_profile="light",
+            comparison=Comparison(type="exact"),
+            time_limit_s=5,
+            memory_mb=1024,
+        )
+        estimator, now = self._estimator()
+        service = SubmissionService(
+            queue=queue,
+            results=Mock(),
+            problems=problems,
+            queue_maxlen=100,
+            stream_routing=DEFAULT_STREAM_ROUTING,
+            backlog_estimator=estimator,
+        )
+
+        for _ in range(3):
+            service.enqueue_submit(problem_id=PROBLEM_ID, code="pass")
+        self.assertEqual(queue.backlog.call_count, 1)
+
+        now[0] += 1.0
+        service.enqueue_submit(problem_id=PROBLEM_ID, code="pass")
+        self.assertEqual(queue.backlog.call_count, 2)
+        self.assertEqual(queue.enqueue.call_count, 4)
+
+
+class StreamRoutingCompileTests(TestCase):
+    def test_compiled_route_matches_uncompiled_lookups(self) -> None:
+        route = DEFAULT_STREAM_ROUTING.compile()
+
+        for profile in DEFAULT_STREAM_ROUTING.by_profile:
+            stream = DEFAULT_STREAM_ROUTING.stream_for_profile(profile)
+            self.assertEqual(
+                route(profile),
+                (stream, DEFAULT_STREAM_ROUTING.group_for_stream(stream)),
+            )
+
+    def test_compiled_route_raises_for_unroutable_profiles(self) -> None:
+        route = StreamRouting(
+            by_profile={"light": "queue:light", "gpu": "queue:gpu"},
+            by_stream_group={"queue:light": "workers-light"},
+        ).compile()
+
+        with self.assertRaisesRegex(ValueError, "Unknown worker profile"):
+            route("torch")
+        with self.assertRaisesRegex(ValueError, "Unknown queue stream"):
+            route("gpu")
+
+
+    def test_routing_tables_are_copied_with_interned_strings(self) -> None:
+        source = {"".join(["li", "ght"]): "".join(["queue:", "light"])}
+        routing = StreamRouting(
+            by_profile=source,
+            by_stream_group={"queue:light": "workers-light"},
+        )
+
+        ((profile, stream),) = routing.by_profile.items()
+        self.assertIsNot(routing.by_profile, source)
+        self.assertIs(profile, sys.intern("light"))
+        self.assertIs(stream, sys.intern("queue:light"))
+        self.assertEqual(routing.compile()("light"), ("queue:light", "workers-light"))
+
+class SlottedValueObjectTests(TestCase):
+    def test_service_value_objects_have_no_instance_dict(self) -> None:
+        from judge.services import WorkerExecutionOutcome, WorkerJob
+
+        instances = [
+            SubmissionAccepted(job_id="job-1", status="queued"),
+            WorkerJob(job_id="job-1", problem_id="p", operation="submit", code="pass"),
+            WorkerExecutionOutcome(executed=True, status="done", error_kind="none", should_ack=True),
+            DEFAULT_STREAM_ROUTING,
+        ]
+
+        for instance in instances:
+            self.assertFalse(hasattr(instance, "__dict__"), type(instance).__name__)
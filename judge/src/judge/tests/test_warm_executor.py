@@ -5,6 +5,7 @@ from __future__ import annotations
 import ctypes.util
 import os
 import sys
+from contextlib import ExitStack
 from pathlib import Path
 from unittest import TestCase
 from unittest.mock import patch
@@ -19,55 +20,49 @@ from judge.warm_executor import (
     _CgroupV2Sandbox,
 )
 
-
-def _plan(*, time_limit_s: int = 1) -> ExecutionPlan:
-    return ExecutionPlan(
-        problem_id="sample/01-basics/01-add",
-        runner="add(a, b)",
-        execution_profile="light",
-        comparison=Comparison(type="exact"),
-        time_limit_s=time_limit_s,
-        memory_mb=256,
-        cases=(
-            CompiledTestCase(
-                id="case-public",
-                input_code="a = 1\nb = 2\n",
-                expected_literal="3",
-            ),
+# Plans and the isolate config are frozen dataclasses, so every test shares one
+# instance. The one-second limit also bounds how long the timeout tests run.
+_PLAN = ExecutionPlan(
+    problem_id="sample/01-basics/01-add",
+    runner="add(a, b)",
+    execution_profile="light",
+    comparison=Comparison(type="exact"),
+    time_limit_s=1,
+    memory_mb=256,
+    cases=(
+        CompiledTestCase(
+            id="case-public",
+            input_code="a = 1\nb = 2\n",
+            expected_literal="3",
         ),
-        detail_mode="all",
-    )
-
-
-def _env_plan() -> ExecutionPlan:
-    return ExecutionPlan(
-        problem_id="sample/01-basics/01-env",
-        runner="read_env()",
-        execution_profile="light",
-        comparison=Comparison(type="exact"),
-        time_limit_s=1,
-        memory_mb=256,
-        cases=(
-            CompiledTestCase(
-                id="case-env",
-                input_code="",
-                expected_literal="None",
-            ),
+    ),
+    detail_mode="all",
+)
+_ENV_PLAN = ExecutionPlan(
+    problem_id="sample/01-basics/01-env",
+    runner="read_env()",
+    execution_profile="light",
+    comparison=Comparison(type="exact"),
+    time_limit_s=1,
+    memory_mb=256,
+    cases=(
+        CompiledTestCase(
+            id="case-env",
+            input_code="",
+            expected_literal="None",
         ),
-        detail_mode="all",
-    )
-
-
-def _isolate_config() -> IsolateConfig:
-    return IsolateConfig(
-        executable="/usr/bin/isolate",
-        box_id=1,
-        use_cgroups=True,
-        process_limit=32,
-        wall_time_extra_s=0,
-        timeout_grace_s=0,
-        fsize_kb=1024,
-    )
+    ),
+    detail_mode="all",
+)
+_ISOLATE = IsolateConfig(
+    executable="/usr/bin/isolate",
+    box_id=1,
+    use_cgroups=True,
+    process_limit=32,
+    wall_time_extra_s=0,
+    timeout_grace_s=0,
+    fsize_kb=1024,
+)
 
 
 def _executor(**overrides: object) -> WarmForkExecutor:
@@ -82,15 +77,41 @@ def _executor(**overrides: object) -> WarmForkExecutor:
     return WarmForkExecutor(**defaults)
 
 
+# Validation raises before libc, libseccomp, cgroup or torch are touched, so these
+# tests need no shared executor.
+class ConstructorValidationTests(TestCase):
+    def test_seccomp_requires_no_new_privs_on_linux(self) -> None:
+        if not sys.platform.startswith("linux"):
+            self.skipTest("seccomp requirement is Linux-only")
+        with self.assertRaisesRegex(
+            ValueError,
+            "enable_no_new_privs must be true when enable_seccomp is true",
+        ):
+            _executor(enable_no_new_privs=False, enable_seccomp=True)
+
+    def test_constructor_rejects_root_execution_by_default(self) -> None:
+        with patch("judge.warm_executor.os.geteuid", return_value=0):
+            with self.assertRaisesRegex(
+                WarmForkUnavailableError,
+                "must not run as root",
+            ):
+                WarmForkExecutor(preload_torch=False)
+
+
 class WarmForkExecutorTests(TestCase):
-    def test_run_execution_plan_returns_accepted_for_valid_solution(self) -> None:
-        executor = _executor()
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        # Every job runs in its own forked child, so the tests share one executor;
+        # its defaults already clear the env. Job counter checks compare deltas.
+        cls.executor = _executor()
 
-        result = executor.run_execution_plan(
-            _plan(),
+    def test_run_execution_plan_returns_accepted_for_valid_solution(self) -> None:
+        result = self.executor.run_execution_plan(
+            _PLAN,
             "def add(a, b):\n    return a + b\n",
             max_output_chars=2000,
-            isolate=_isolate_config(),
+            isolate=_ISOLATE,
         )
 
         self.assertEqual(result.get("status"), "Accepted")
@@ -98,17 +119,54 @@ class WarmForkExecutorTests(TestCase):
         self.assertEqual(result.get("summary", {}).get("passed"), 1)
         self.assertEqual(result.get("summary", {}).get("failed"), 0)
 
+    def test_job_count_increments_per_execution(self) -> None:
+        before = self.executor.job_count
+
+        self.executor.run_execution_plan(
+            _PLAN,
+            "def add(a, b):\n    return a + b\n",
+            max_output_chars=2000,
+            isolate=_ISOLATE,
+        )
+        self.assertEqual(self.executor.job_count, before + 1)
+
+    def test_needs_recycle_false_when_unlimited(self) -> None:
+        # The shared executor is built with max_jobs=0.
+        self.assertFalse(self.executor.needs_recycle)
+
+        self.executor.run_execution_plan(
+            _PLAN,
+            "def add(a, b):\n    return a + b\n",
+            max_output_chars=2000,
+            isolate=_ISOLATE,
+        )
+        self.assertFalse(self.executor.needs_recycle)
+
     def test_run_execution_plan_times_out_for_slow_solution(self) -> None:
-        executor = _executor()
+        # A busy loop exhausts RLIMIT_CPU and is killed before the wall-clock deadline.
+        result = self.executor.run_execution_plan(
+            _PLAN,
+            "def add(a, b):\n"
+            "    while True:\n"
+            "        pass\n",
+            max_output_chars=2000,
+            isolate=_ISOLATE,
+        )
 
-        result = executor.run_execution_plan(
-            _plan(time_limit_s=1),
+        self.assertEqual(result.get("status"), "Time Limit Exceeded")
+        self.assertEqual(result.get("error_kind"), "user")
+        self.assertIn("Time Limit Exceeded", result.get("error", ""))
+
+    def test_run_execution_plan_times_out_for_blocked_solution(self) -> None:
+        # A sleeping child burns no CPU, so only the wall-clock deadline stops it.
+        result = self.executor.run_execution_plan(
+            _PLAN,
             "import time\n"
             "def add(a, b):\n"
             "    time.sleep(5)\n"
             "    return a + b\n",
             max_output_chars=2000,
-            isolate=_isolate_config(),
+            isolate=_ISOLATE,
         )
 
         self.assertEqual(result.get("status"), "Time Limit Exceeded")
@@ -116,13 +174,11 @@ class WarmForkExecutorTests(TestCase):
         self.assertIn("Time Limit Exceeded", result.get("error", ""))
 
     def test_run_execution_plan_reports_syntax_error_for_invalid_user_code(self) -> None:
-        executor = _executor()
-
-        result = executor.run_execution_plan(
-            _plan(),
+        result = self.executor.run_execution_plan(
+            _PLAN,
             "def add(a, b)\n    return a + b\n",
             max_output_chars=2000,
-            isolate=_isolate_config(),
+            isolate=_ISOLATE,
         )
 
         self.assertEqual(result.get("status"), "Syntax Error")
@@ -131,52 +187,33 @@ class WarmForkExecutorTests(TestCase):
         self.assertEqual(result.get("tests", [{}])[0].get("status"), "Syntax Error")
 
     def test_abrupt_child_exit_is_reported_as_user_runtime_error(self) -> None:
-        executor = _executor()
-
-        result = executor.run_execution_plan(
-            _plan(time_limit_s=1),
+        result = self.executor.run_execution_plan(
+            _PLAN,
             "import os\n"
             "def add(a, b):\n"
             "    os._exit(7)\n",
             max_output_chars=2000,
-            isolate=_isolate_config(),
+            isolate=_ISOLATE,
         )
 
         self.assertEqual(result.get("status"), "Runtime Error")
         self.assertEqual(result.get("error_kind"), "user")
 
     def test_run_execution_plan_does_not_expose_parent_env(self) -> None:
-        executor = _executor(enable_seccomp=False, clear_env=True)
+        self.assertTrue(self.executor.clear_env)
         with patch.dict(os.environ, {"JUDGE_SECRET_TOKEN": "should-not-leak"}, clear=False):
-            result = executor.run_execution_plan(
-                _env_plan(),
+            result = self.executor.run_execution_plan(
+                _ENV_PLAN,
                 "import os\n"
                 "def read_env():\n"
                 "    return os.getenv('JUDGE_SECRET_TOKEN')\n",
                 max_output_chars=2000,
-                isolate=_isolate_config(),
+                isolate=_ISOLATE,
             )
 
         self.assertEqual(result.get("status"), "Accepted")
         self.assertEqual(result.get("error"), None)
 
-    def test_seccomp_requires_no_new_privs_on_linux(self) -> None:
-        if not sys.platform.startswith("linux"):
-            self.skipTest("seccomp requirement is Linux-only")
-        with self.assertRaisesRegex(
-            ValueError,
-            "enable_no_new_privs must be true when enable_seccomp is true",
-        ):
-            _executor(enable_no_new_privs=False, enable_seccomp=True)
-
-    def test_constructor_rejects_root_execution_by_default(self) -> None:
-        with patch("judge.warm_executor.os.geteuid", return_value=0):
-            with self.assertRaisesRegex(
-                WarmForkUnavailableError,
-                "must not run as root",
-            ):
-                WarmForkExecutor(preload_torch=False)
-
     def test_seccomp_deny_filesystem_blocks_host_file_reads(self) -> None:
         if not sys.platform.startswith("linux"):
             self.skipTest("seccomp is Linux-only")
@@ -192,7 +229,7 @@ class WarmForkExecutorTests(TestCase):
         )
 
         result = executor.run_execution_plan(
-            _env_plan(),
+            _ENV_PLAN,
             "def read_env():\n"
             "    try:\n"
             "        with open('/etc/passwd', 'r'):\n"
@@ -200,7 +237,7 @@ class WarmForkExecutorTests(TestCase):
             "    except Exception:\n"
             "        return None\n",
             max_output_chars=2000,
-            isolate=_isolate_config(),
+            isolate=_ISOLATE,
         )
         self.assertEqual(result.get("status"), "Accepted")
 
@@ -221,84 +258,51 @@ class WarmForkExecutorTests(TestCase):
             clear_env=True,
         )
         calls: list[str] = []
-
-        with (
-            patch("judge.warm_executor.os.setsid", return_value=None),
-            patch.object(executor, "_set_no_new_privs", side_effect=lambda: calls.append("nnp")),
-            patch.object(
-                executor,
-                "_apply_resource_limits",
-                side_effect=lambda **_kwargs: calls.append("limits"),
-            ),
-            patch.object(
-                executor,
-                "_apply_seccomp_filter",
-                side_effect=lambda: calls.append("seccomp"),
-            ),
-            patch.object(
-                executor,
-                "_close_inherited_fds",
-                side_effect=lambda: calls.append("fds"),
-            ),
-        ):
+        steps = {
+            "_set_no_new_privs": "nnp",
+            "_apply_resource_limits": "limits",
+            "_apply_seccomp_filter": "seccomp",
+            "_close_inherited_fds": "fds",
+        }
+
+        with ExitStack() as stack:
+            # Setup that would otherwise mutate the test process itself.
+            stack.enter_context(patch("judge.warm_executor.os.setsid", return_value=None))
+            stack.enter_context(patch("judge.warm_executor.os.umask", return_value=0o022))
+            stack.enter_context(patch.object(executor, "_apply_child_env", return_value=None))
+            for name, label in steps.items():
+                stack.enter_context(
+                    patch.object(
+                        executor,
+                        name,
+                        side_effect=lambda *_args, _label=label, **_kwargs: calls.append(_label),
+                    )
+                )
             executor._prepare_child_sandbox(  # noqa: SLF001
-                plan=_plan(),
-                isolate=_isolate_config(),
+                plan=_PLAN,
+                isolate=_ISOLATE,
             )
 
         self.assertEqual(calls, ["nnp", "limits", "seccomp", "fds"])
 
-    def test_job_count_increments_per_execution(self) -> None:
-        executor = _executor()
-        self.assertEqual(executor.job_count, 0)
-
-        executor.run_execution_plan(
-            _plan(),
-            "def add(a, b):\n    return a + b\n",
-            max_output_chars=2000,
-            isolate=_isolate_config(),
-        )
-        self.assertEqual(executor.job_count, 1)
-
-    def test_needs_recycle_false_when_unlimited(self) -> None:
-        executor = _executor(max_jobs=0)
-        self.assertFalse(executor.needs_recycle)
-
-        executor.run_execution_plan(
-            _plan(),
-            "def add(a, b):\n    return a + b\n",
-            max_output_chars=2000,
-            isolate=_isolate_config(),
-        )
-        self.assertFalse(executor.needs_recycle)
 
+# The recycle budget is per executor, so this check builds its own.
+class WarmForkExecutorRecycleTests(TestCase):
     def test_needs_recycle_true_after_max_jobs_reached(self) -> None:
+        # Also covers back-to-back jobs on one warm parent all succeeding.
         executor = _executor(max_jobs=2)
         self.assertFalse(executor.needs_recycle)
 
-        for _ in range(2):
-            executor.run_execution_plan(
-                _plan(),
-                "def add(a, b):\n    return a + b\n",
-                max_output_chars=2000,
-                isolate=_isolate_config(),
-            )
-        self.assertTrue(executor.needs_recycle)
-        self.assertEqual(executor.job_count, 2)
-
-    def test_multiple_sequential_jobs_all_succeed(self) -> None:
-        executor = _executor()
-
-        for i in range(3):
+        for i in range(2):
             result = executor.run_execution_plan(
-                _plan(),
+                _PLAN,
                 "def add(a, b):\n    return a + b\n",
                 max_output_chars=2000,
-                isolate=_isolate_config(),
+                isolate=_ISOLATE,
             )
             self.assertEqual(result.get("status"), "Accepted", f"job {i + 1} failed")
-
-        self.assertEqual(executor.job_count, 3)
+        self.assertTrue(executor.needs_recycle)
+        self.assertEqual(executor.job_count, 2)
 
 
 class CgroupV2SandboxTests(TestCase):
@@ -5,14 +5,15 @@ from __future__ import annotations
 import os
 import socket
 import tempfile
+from types import SimpleNamespace
 from unittest import TestCase
 from unittest.mock import patch
 
+from judge.worker import _notify_systemd, _parse_queue_message, _read_count, _watchdog_enabled
+
 
 class WorkerMessageParsingTests(TestCase):
     def _parse(self, fields: dict[str, str]) -> tuple[dict[str, object], str | None]:
-        from judge.worker import _parse_queue_message
-
         return _parse_queue_message(fields)
 
     def test_parse_queue_message_accepts_valid_payload(self) -> None:
@@ -70,25 +71,29 @@ class WorkerMessageParsingTests(TestCase):
 
 
 class WorkerSystemdNotifyTests(TestCase):
-    def test_notify_systemd_writes_datagram(self) -> None:
-        from judge.worker import _notify_systemd
-
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            socket_path = os.path.join(tmp_dir, "notify.sock")
-            server = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
-            server.bind(socket_path)
-            self.addCleanup(server.close)
-            server.settimeout(1.0)
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        # One bound datagram socket serves every notify test; each test reads its own message.
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls._server = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        cls._server.bind(os.path.join(cls._tmp.name, "notify.sock"))
+        cls._server.settimeout(1.0)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._server.close()
+        cls._tmp.cleanup()
+        super().tearDownClass()
 
-            with patch.dict(os.environ, {"NOTIFY_SOCKET": socket_path}):
-                _notify_systemd("READY=1")
+    def test_notify_systemd_writes_datagram(self) -> None:
+        with patch.dict(os.environ, {"NOTIFY_SOCKET": self._server.getsockname()}):
+            _notify_systemd("READY=1")
 
-            payload = server.recv(128).decode("utf-8")
-            self.assertEqual(payload, "READY=1")
+        payload = self._server.recv(128).decode("utf-8")
+        self.assertEqual(payload, "READY=1")
 
     def test_watchdog_enabled_checks_watchdog_usec(self) -> None:
-        from judge.worker import _watchdog_enabled
-
         with patch.dict(os.environ, {"WATCHDOG_USEC": "60000000"}, clear=True):
             self.assertTrue(_watchdog_enabled())
 
@@ -97,3 +102,9 @@ class WorkerSystemdNotifyTests(TestCase):
 
         with patch.dict(os.environ, {"WATCHDOG_USEC": "abc"}, clear=True):
             self.assertFalse(_watchdog_enabled())
+
+    def test_read_count_stops_at_warm_executor_recycle_budget(self) -> None:
+        self.assertEqual(_read_count(16, None), 16)
+        self.assertEqual(_read_count(16, SimpleNamespace(jobs_until_recycle=None)), 16)
+        self.assertEqual(_read_count(16, SimpleNamespace(jobs_until_recycle=3)), 3)
+        self.assertEqual(_read_count(16, SimpleNamespace(jobs_until_recycle=0)), 1)
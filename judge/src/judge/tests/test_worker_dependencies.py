@@ -16,18 +16,21 @@ from judge.worker import build_worker_dependencies
 def _settings(*, torch_execution_mode: str, warm_fork_max_jobs: int = 0) -> Settings:
     return Settings(
         redis_url="redis://localhost:6379/0",
+        redis_max_connections=32,
         results_db=Path("/tmp/judge-deps-test.db"),
         problems_root=Path("/tmp/problems"),
         max_output_chars=2000,
         queue_maxlen=10000,
         job_claim_idle_ms=30000,
         job_claim_count=10,
+        worker_read_count=1,
         isolate_bin="/usr/bin/isolate",
         isolate_use_cgroups=True,
         isolate_process_limit=64,
         isolate_wall_time_extra_s=2,
         isolate_timeout_grace_s=5,
         isolate_fsize_kb=1024,
+        isolate_reuse_box=False,
         python_bin=sys.executable,
         torch_execution_mode=torch_execution_mode,
         warm_fork_enable_no_new_privs=True,
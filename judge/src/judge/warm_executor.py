@@ -16,7 +16,6 @@ from __future__ import annotations
 import ctypes
 import ctypes.util
 import errno
-import json
 import logging
 import os
 import resource
@@ -33,10 +32,11 @@ from judge.problems import ExecutionPlan
 from judge.runner import (
     HARNESS_CODE,
     IsolateConfig,
-    _build_error_summary,
     _build_test_config,
-    _sanitize_item,
-    _summarize_results,
+    _error_response,
+    _harness_output_response,
+    _memory_limit_response,
+    _time_limit_response,
 )
 
 logger = logging.getLogger(__name__)
@@ -159,6 +159,8 @@ _MAX_CHILD_OUTPUT_BYTES = 2 * 1024 * 1024  # 2 MB
 # Interval between retry attempts during cgroup teardown.
 _CGROUP_DESTROY_POLL_S = 0.005
 _CGROUP_DESTROY_ATTEMPTS = 10
+# Reaped CPU time is tick-sampled and can read a few ms under the RLIMIT_CPU that killed the child.
+_CPU_LIMIT_SLACK_S = 0.05
 
 
 # ---------------------------------------------------------------------------
@@ -381,6 +383,13 @@ class WarmForkExecutor:
         """True when the executor has reached its max_jobs limit and should be replaced."""
         return self._max_jobs > 0 and self._job_seq >= self._max_jobs
 
+    @property
+    def jobs_until_recycle(self) -> int | None:
+        """Jobs left before recycling, or None when max_jobs is unlimited."""
+        if self._max_jobs <= 0:
+            return None
+        return max(self._max_jobs - self._job_seq, 0)
+
     # ------------------------------------------------------------------
     # Public entry point
     # ------------------------------------------------------------------
@@ -395,7 +404,7 @@ class WarmForkExecutor:
         if isolate is None:
             raise ValueError("isolate configuration is required")
 
-        config = _build_test_config(plan)
+        config = _build_test_config(plan, max_output_chars)
         total_cases = len(config["cases"])
         wall_time = max(plan.time_limit_s + isolate.wall_time_extra_s, plan.time_limit_s + 1)
         timeout_s = wall_time + isolate.timeout_grace_s
@@ -409,31 +418,18 @@ class WarmForkExecutor:
                 timeout_s=timeout_s,
             )
         except Exception as exc:
-            return {
-                "status": "Runtime Error",
-                "summary": _build_error_summary(total_cases),
-                "tests": [],
-                "error": f"Warm executor failed: {exc}",
-                "error_kind": "internal",
-            }
+            return _error_response(
+                "Runtime Error",
+                total_cases,
+                f"Warm executor failed: {exc}",
+                "internal",
+            )
 
         if child.oom_killed:
-            return {
-                "status": "Memory Limit Exceeded",
-                "summary": _build_error_summary(total_cases),
-                "tests": [],
-                "error": f"Memory Limit Exceeded ({plan.memory_mb}MB)",
-                "error_kind": "user",
-            }
+            return _memory_limit_response(plan, total_cases)
 
         if child.timed_out:
-            return {
-                "status": "Time Limit Exceeded",
-                "summary": _build_error_summary(total_cases),
-                "tests": [],
-                "error": f"Time Limit Exceeded ({plan.time_limit_s}s)",
-                "error_kind": "user",
-            }
+            return _time_limit_response(plan, total_cases)
 
         if child.returncode != 0:
             infra_error = _INFRA_ERROR_MARKER in child.stderr
@@ -441,55 +437,24 @@ class WarmForkExecutor:
             detail = child.stderr.strip() or "Runner failed"
             if child.signum is not None and not detail:
                 detail = f"Runner killed by signal {child.signum}"
-            return {
-                "status": "Runtime Error",
-                "summary": _build_error_summary(total_cases),
-                "tests": [],
-                "error": detail,
-                "error_kind": error_kind,
-            }
+            return _error_response("Runtime Error", total_cases, detail, error_kind)
 
         if child.output_truncated:
             cap_mb = _MAX_CHILD_OUTPUT_BYTES // (1024 * 1024)
-            return {
-                "status": "Runtime Error",
-                "summary": _build_error_summary(total_cases),
-                "tests": [],
-                "error": f"Output Limit Exceeded ({cap_mb}MB)",
-                "error_kind": "user",
-            }
-
-        try:
-            tests_raw = json.loads(child.stdout)
-        except json.JSONDecodeError:
-            return {
-                "status": "Runtime Error",
-                "summary": _build_error_summary(total_cases),
-                "tests": [],
-                "error": f"Invalid runner output. Stdout: {child.stdout}\nStderr: {child.stderr}",
-                "error_kind": "internal",
-            }
-
-        summary, first_failed = _summarize_results(tests_raw)
-        status = "Accepted"
-        if summary["failed"] > 0 and first_failed is not None:
-            status = first_failed.get("status", "Wrong Answer")
-
-        if plan.detail_mode == "first_failure":
-            tests = (
-                [_sanitize_item(first_failed, max_output_chars)]
-                if first_failed is not None
-                else []
+            return _error_response(
+                "Runtime Error",
+                total_cases,
+                f"Output Limit Exceeded ({cap_mb}MB)",
+                "user",
             )
-        else:
-            tests = [_sanitize_item(item, max_output_chars) for item in tests_raw]
 
-        return {
-            "status": status,
-            "summary": summary,
-            "tests": tests,
-            "error": None,
-        }
+        return _harness_output_response(
+            plan,
+            total_cases,
+            child.stdout,
+            child.stderr,
+            max_output_chars,
+        )
 
     # ------------------------------------------------------------------
     # Fork lifecycle
@@ -555,6 +520,7 @@ class WarmForkExecutor:
                 stdout_fd=stdout_r,
                 stderr_fd=stderr_r,
                 timeout_s=timeout_s,
+                cpu_limit_s=max(plan.time_limit_s, 1),
                 cgroup_path=cgroup_path,
             )
         finally:
@@ -696,6 +662,7 @@ class WarmForkExecutor:
         stdout_fd: int,
         stderr_fd: int,
         timeout_s: float,
+        cpu_limit_s: int,
         cgroup_path: Path | None,
     ) -> _ChildRunResult:
         pidfd = self._open_pidfd(pid)
@@ -714,7 +681,17 @@ class WarmForkExecutor:
         if timed_out:
             self._kill_child_process_group(pid)
 
-        _, status = os.waitpid(pid, 0)
+        _, status, rusage = os.wait4(pid, 0)
+
+        # RLIMIT_CPU (soft == hard) kills a CPU-bound child before the wall-clock
+        # deadline; a child signalled after spending its CPU budget timed out too.
+        if (
+            not timed_out
+            and os.WIFSIGNALED(status)
+            and os.WTERMSIG(status) in (signal.SIGKILL, signal.SIGXCPU)
+            and rusage.ru_utime + rusage.ru_stime >= cpu_limit_s - _CPU_LIMIT_SLACK_S
+        ):
+            timed_out = True
 
         # Drain any data written between the last poll and child exit.
         if not output_truncated:
@@ -20,7 +20,7 @@ from judge.metrics import (
     register_process_exit,
     worker_heartbeat,
 )
-from judge.runner import IsolateConfig
+from judge.runner import IsolateConfig, prewarm_isolate_box
 from judge.services import WorkerExecutionService, WorkerJob
 from judge.warm_executor import WarmForkExecutor
 
@@ -185,6 +185,7 @@ def build_worker_dependencies(
         wall_time_extra_s=resolved_settings.isolate_wall_time_extra_s,
         timeout_grace_s=resolved_settings.isolate_timeout_grace_s,
         fsize_kb=resolved_settings.isolate_fsize_kb,
+        reuse_box=resolved_settings.isolate_reuse_box,
         python_bin=resolved_settings.python_bin,
     )
 
@@ -231,6 +232,16 @@ def build_worker_dependencies(
     )
 
 
+def _read_count(configured: int, warm_executor: WarmForkExecutor | None) -> int:
+    # Never claim entries a recycling warm executor would leave pending until autoclaim.
+    if warm_executor is None:
+        return configured
+    remaining = warm_executor.jobs_until_recycle
+    if remaining is None:
+        return configured
+    return max(1, min(configured, remaining))
+
+
 def _process_queue_entry(
     *,
     stream: str,
@@ -343,6 +354,14 @@ def main() -> None:
     _emit_liveness(worker_profile, args.consumer, status=f"worker loop active ({args.consumer})")
 
     warm_executor = dependencies.warm_executor
+    if warm_executor is None:
+        try:
+            prewarm_isolate_box(execution.isolate)
+        except Exception:
+            logger.warning(
+                "Failed to prewarm isolate box; the first job will initialize it",
+                exc_info=True,
+            )
     last_reclaim = 0.0
 
     while True:
@@ -376,22 +395,24 @@ def main() -> None:
                 break
             last_reclaim = now
 
-        entry = queue.read(args.stream, args.group, args.consumer)
-        if entry is None:
-            continue
-
-        msg_id, fields = entry
-        _process_queue_entry(
-            stream=args.stream,
-            group=args.group,
-            consumer=args.consumer,
-            worker_profile=worker_profile,
-            msg_id=msg_id,
-            fields=fields,
-            queue=queue,
-            results=results,
-            execution=execution,
+        entries = queue.read_many(
+            args.stream,
+            args.group,
+            args.consumer,
+            count=_read_count(dependencies.settings.worker_read_count, warm_executor),
         )
+        for msg_id, fields in entries:
+            _process_queue_entry(
+                stream=args.stream,
+                group=args.group,
+                consumer=args.consumer,
+                worker_profile=worker_profile,
+                msg_id=msg_id,
+                fields=fields,
+                queue=queue,
+                results=results,
+                execution=execution,
+            )
         if warm_executor is not None and warm_executor.needs_recycle:
             logger.info(
                 "Warm executor reached max_jobs=%d, exiting for recycle",